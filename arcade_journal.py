@@ -0,0 +1,123 @@
+"""
+    Append-only journal of arcade game events used to recover a game in progress after a daemon crash/restart.
+    Mission log files are deleted as soon as they are read, so every mission log line which changed the arcade game
+    state is appended (and flushed to disk) to the journal before its log file is deleted.  Replaying the journaled
+    lines through the arcade log line parser rebuilds the ArcadeMission state.
+
+    Journal file format (UTF-8 text):
+        #start <dserver slot> <mission base file name>  -- first line; written when arcade mission is initialized
+        #slot <dserver slot>                            -- mission files were staged to the other slot for a reset
+        #pid <process id>                               -- DServer.exe process running the game (started/restarted)
+        <mission log line>                              -- e.g., 'T:1234 AType:2 DMG:0.250 AID:...'
+        #unlock                                         -- player earned a new air spawn
+
+    The dserver slot is the set of mission files (0 or 1) DServer.exe runs; the last one journaled wins.  The mission
+    is journaled by its base file name (e.g., kuban_main) since mission indices change as missions are added.  The
+    process id lets a recovered daemon stop its own DServer.exe without touching other server instances' ones.
+"""
+
+import contextlib
+import io
+import os
+
+START_TAG = '#start'
+SLOT_TAG = '#slot'
+PID_TAG = '#pid'
+UNLOCK_TAG = '#unlock'
+
+
+class SilentConsole:
+    """ Stand-in for RemoteConsoleClient which sends nothing; messages were already sent before the crash """
+    def send(self, msg, debug=False):
+        pass
+
+    def send_msg(self, message, *args, **kwargs):
+        pass
+
+
+class ArcadeJournal:
+    """ Writes arcade journal file """
+    def __init__(self, filename):
+        self.filename = filename
+        self.active = False  # whether an arcade game is being journaled
+        self.dserver_pid = None  # process id of the running DServer.exe (None if not known)
+
+    def start(self, mission_name, dserver_slot):
+        """ Start new journal (overwriting any old one) for a newly initialized arcade mission """
+        with open(self.filename, 'w', encoding="UTF-8") as file:
+            file.write(f"{START_TAG} {dserver_slot} {mission_name}\n")
+            if self.dserver_pid is not None:
+                file.write(f"{PID_TAG} {self.dserver_pid}\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.active = True
+
+    def set_dserver_pid(self, pid):
+        """ Notes the process id of a newly started DServer.exe (journaled if a game is being journaled) """
+        self.dserver_pid = pid
+        if self.active:
+            self.append([f"{PID_TAG} {pid}"])
+
+    def append(self, entries):
+        """ Append list of journal entries (log lines or tags) and make sure they are on disk before returning """
+        if not entries:
+            return
+        with open(self.filename, 'a', encoding="UTF-8") as file:
+            for e in entries:
+                file.write(e if e.endswith('\n') else e + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def clear(self):
+        """ Remove journal; game is over or mission is no longer an arcade """
+        self.active = False
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
+
+
+def read_arcade_journal(filename):
+    """
+        Returns (mission base file name, dserver slot, DServer process id (None if not journaled), list of journal
+        entries) of journal filename or None if there is no journal (i.e., no arcade game was in progress)
+    """
+    try:
+        with open(filename, 'r', encoding="UTF-8") as file:
+            lines = file.readlines()
+    except FileNotFoundError:
+        return None
+
+    if not lines or not lines[0].startswith(START_TAG):
+        return None
+    try:
+        tag, slot, mission_name = lines[0].rstrip('\n').split(' ', 2)
+        slot = int(slot)
+    except ValueError:
+        return None
+    if not lines[-1].endswith('\n'):  # partially written last line due to crash
+        lines.pop()
+    pid = None
+    for line in lines[1:]:
+        if line.startswith(SLOT_TAG):
+            slot = int(line.split()[1])
+        elif line.startswith(PID_TAG):
+            pid = int(line.split()[1])
+    return mission_name, slot, pid, lines[1:]
+
+
+def replay_arcade_journal(arcade, entries):
+    """ Rebuilds arcade (ArcadeMission) game state from journal entries """
+    from arcade_stuka import process_log_line, unlock_airspawn
+
+    console = SilentConsole()
+    with contextlib.redirect_stdout(io.StringIO()):  # suppress the (many) log line processing prints
+        for e in entries:
+            if e.startswith(UNLOCK_TAG):
+                unlock_airspawn(arcade)
+            elif e.startswith((SLOT_TAG, PID_TAG)):
+                continue
+            else:
+                process_log_line(arcade, e, console, 'journal', debug=True)
+    print(f"Recovered arcade game from {len(entries)} journal entries: player"
+          f" {arcade.player.alias if arcade.player else None}, started = {arcade.started}, game over = {arcade.game_over}")
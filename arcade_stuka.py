@@ -8,6 +8,7 @@ from constants import MISSION_LOG_BACKUP_DIR, points, FAKE_PREFIX, \
     HIGHSCORES_URL, SCORING_MILESTONES, AIR_SPAWNS,  SCORES_DB, HTML_FILE
 from highscores import compute_score, enter_score, html_write_scores
 from mission_objectives import get_mission_objectives, print_mission_objectives
+from arcade_journal import UNLOCK_TAG
 
 
 def delete_log_file(copy_file, log_file, backup_dir=MISSION_LOG_BACKUP_DIR, do_not_delete=False):
@@ -151,19 +152,19 @@ class Vehicle:
         print(f"Vehicle: {self.name}, {self.full_name}, ID:{self.run_id}, Value: {self.score}")
 
 
-def read_vehicles(mission_filename):
+def parse_vehicles(mission_filename):
     """
-        Creates the vehicles instances from the mission file
+        Parses the vehicles of interest from the mission file
         Vehicle objects of interest are identified with m[num]_name  (e.g., 'm03_t34')
 
-        Returns vehicle objects list and a lookup table to those objects
+        Returns list of (name, type, object id, linked id, counting id) tuples
     """
 
     with open(mission_filename, 'r', encoding="UTF-8") as file:
         mission_str = file.read()
 
     vehicles_str = re.findall(r'\nVehicle\n{[\s\S]+?}', mission_str)  # return all 'Vehicle {...}' blocks of text
-    vehicles = []
+    vehicle_specs = []
     vehicle_count = 0
     for v in vehicles_str:
         search_result = re.search(r'(?<=Name = ")m\d\d_.+(?=";)', v)
@@ -173,7 +174,13 @@ def read_vehicles(mission_filename):
             vtype = re.search(r'(?<=vehicles\\).+(?=\.txt";)', v).group()
             obj_id = int(re.search(r'(?<=Index = )\d+(?=;)', v).group())
             linked_id = int(re.search(r'(?<=LinkTrId = )\d+(?=;)', v).group())
-            vehicles.append(Vehicle(name, vtype, obj_id, linked_id, vehicle_count))
+            vehicle_specs.append((name, vtype, obj_id, linked_id, vehicle_count))
+    return vehicle_specs
+
+
+def create_vehicles(vehicle_specs):
+    """ Creates fresh vehicle instances from parse_vehicles() tuples; returns vehicles list and a lookup table to them """
+    vehicles = [Vehicle(*spec) for spec in vehicle_specs]
 
     veh_lookup = {}  # associate vehicle name with its index in vehicles objects for quick dictionary lookup in future
     for v in vehicles:
@@ -183,11 +190,29 @@ def read_vehicles(mission_filename):
     return vehicles, veh_lookup
 
 
+def get_vehicle_specs(mission_filename, cache=None):
+    """ Returns parse_vehicles() tuples; if cache (MissionCache) is given the mission file is only parsed if its content changed """
+    if cache is not None:
+        return cache.lookup('vehicles', [mission_filename], parse_vehicles)
+    return parse_vehicles(mission_filename)
+
+
+def read_vehicles(mission_filename, cache=None):
+    """
+        Creates the vehicles instances from the mission file
+        Returns vehicle objects list and a lookup table to those objects
+    """
+    return create_vehicles(get_vehicle_specs(mission_filename, cache))
+
+
 class ArcadeMission:
     """ Contains data and methods associated with the current arcade game """
-    def __init__(self, mission_name, mission_briefing):
+    def __init__(self, mission_name, mission_briefing, cache=None, journal=None):
         # mission objectives with lookup table to them
-        self.m_objs, self.m_objs_lookup = get_mission_objectives(mission_name, mission_briefing)
+        self.m_objs, self.m_objs_lookup = get_mission_objectives(mission_name, mission_briefing, cache=cache)
+
+        # parsed target vehicle data so game start only needs to create fresh vehicle objects
+        self.vehicle_specs = get_vehicle_specs(mission_name, cache)
 
         self.vehicles = None  # vehicles that can be dsetroyed by player
         self.vehicle_lookup = {}  # lookup table to these vehicles
@@ -203,14 +228,198 @@ class ArcadeMission:
         self.player_exited = True  # whether player in lobby (true) or in plane (false)
         self.score = 0
         self.old_time = time.time()
+        self.journal = journal  # ArcadeJournal which records game events for crash recovery (None for no journal)
+
+
+def unlock_airspawn(arcade):
+    """ Updates arcade state for a newly earned air spawn; returns name of spawn to unlock in mission """
+    spawn_name = arcade.spawn_names[0]
+    arcade.airfield_available += 1
+    del arcade.new_airspawn_scores[0]  # update queue
+    del arcade.spawn_names[0]
+    return spawn_name
 
 def short_filename(filename):
     """ returns shortened log filename without directory path and file extension """
     return re.search(r'(?<=missionReport\()[\s\S]+(?=.txt)', filename).group()
 
-def process_arcade_game(arcade, mission_log_file_wildcard, mission_filename, r_con=None,
+def process_log_line(arcade, line, r_con, log_name, debug=False):
+    """
+        Updates arcade game state with one mission log file line.  log_name is only used for console prints.
+        Returns whether line was an arcade event (i.e., one that needs to be journaled for game recovery)
+    """
+    #  ignore log activity unless player has spawned in for first time which starts game
+    if not ('AType:10 ' in line) and not arcade.started:
+        return False
+
+    # Player spawned in
+    if 'AType:10 ' in line:
+        """
+            player spawned in a plane; if player spawned is in the PlayerStart as defined by a mission objective
+            'PlayerStart' then create player and vehicles objects and start arcade game
+        """
+
+        position_str = get_position_str(line)  # coordinates of spawn in
+        found, index = find_mission_objective(position_str, arcade.m_objs, 50.0)  # determine if near registered spawn point
+        # print(f"airfield found?  {found}, {index}")
+
+        if not found:  # spawned in something like a spectator spawn so ignore
+            return False
+
+        print(f"Spawned in location: '{arcade.m_objs[index].name}'")
+        arcade.player_exited = False
+
+        if not arcade.started:  # first time spawned in; init several variables
+            print(f"START GAME in file ======{log_name}=====")
+            arcade.started = True
+            # init player and vehicle objects
+            arcade.vehicles, arcade.veh_lookup = create_vehicles(arcade.vehicle_specs)  # get enemy target vehicles define in mission file with lookup
+            arcade.player = create_player(line)
+            arcade.old_time = time.time()
+
+        else:  # spawned in second and subsequent times
+            update_player(line, arcade.player)  # pilot will have a new plane and pilot ID on subsequent spawns
+            arcade.airfield_available += -1
+            # print(f"before spawn IDs: {get_player_id_str(line)} {arcade.player.il2_player_id}")
+            # check to see that another player is taking the spawn from the first spawn
+            if get_player_id_str(line) != arcade.player.il2_player_id:
+                arcade.game_over = True
+                print("Arcade error:  Not the same player spawned in subsequent spawn compared to the first spawn")
+                r_con.send_msg(f"Error: Different players playing game!  Game over. Reset mission to try again.")
+
+        arcade.player_planes_id_list.append(arcade.player.plane_id)
+        print(f"Player {arcade.player.alias} (PID={arcade.player.char_id}) started mission flying {arcade.player.plane_type} (ID={arcade.player.plane_id}) in file: ====={log_name}=====")
+        print(f"Allplane ids: {arcade.player_planes_id_list}")
+
+
+    # Exited: Player left aircraft in mission
+    elif 'AType:4' in line:
+        pilot_char_id = int(re.search(r'(?<= PID:)\d+(?= BUL)', line).group())
+        if pilot_char_id == arcade.player.char_id:
+            print(f"Player {arcade.player.alias} (pid={pilot_char_id}) exited mission with {arcade.airfield_available} airspawns available in log file: ====={log_name}======")
+            arcade.player_exited = True  # make sure all messages in this file continue to be processed
+            if arcade.airfield_available == 0:
+                arcade.game_over = True
+
+
+    elif 'AType:8 ' in line:  # mission objective events triggered (e.g. game over)
+        # mobj_id = int(re.search(r'(?<= OBJID:)\d+(?= POS)', line).group())  # gets OBJID (object ID?) but this is a useless ID #
+        """ must determine objective fired based on its position in mission """
+        print(line)
+        ps = get_position_str(line)
+        print(f"atype 8 pos string = {ps}")
+        found, index = find_mission_objective(ps, arcade.m_objs)
+        if found and arcade.m_objs[index].name == "gameover":
+            print(f"Game over triggered in mission")
+            r_con.send_msg(f"GAME OVER.")
+            arcade.game_over = True
+
+    elif 'AType:18 ' in line:  # Ejection by pilot
+        pilot_id = int(re.search(r'(?<= BOTID:)\d+(?= )', line).group())
+        if pilot_id == arcade.player.char_id:
+            arcade.player.ejected = True
+            arcade.player.plane_destroyed = True
+            arcade.game_over = True
+
+    elif 'AType:12 ' in line:  # vehicle spawned in
+        v_id = int(re.search(r'(?<= ID:)\d+(?= TY)', line).group())
+        v_type = re.search(r'(?<= TYPE:).+(?= CO)', line).group()
+        v_name = re.search(r'(?<= NAME:).+(?= PID)', line).group()
+        try:
+            vehicle = arcade.veh_lookup[v_name]
+        except KeyError:
+            #  other vehicle; just associate id and name for kill report (atype = 3)
+            print(f"Other vehicle found: {v_id}:{v_name}")
+            arcade.other_vehicle_dict[v_id] = v_name
+        else:
+            vehicle.full_name = v_type
+            vehicle.run_id = v_id
+            arcade.veh_runtime_lookup[v_id] = vehicle
+            print("Spawned ", end='')
+            vehicle.short_print()
+
+    elif 'AType:2 ' in line:  # Damaged: attacker ID damaged target ID
+        # print(f"damage string: {line}")
+        dmg_amount = float(re.search(r'(?<= DMG:)\d+\.\d+(?= AID)', line).group())  # damage percentage from 0.0 to 1.0
+        attacker_id = int(re.search(r'(?<= AID:)-*\d+(?= TID)', line).group())
+        target_id = int(re.search(r'(?<= TID:)\d+(?= POS)', line).group())
+        # print(f"Damage--amount: {dmg_amount} attacker_id: {attacker_id}  target_id: {target_id} in file {m}")
+
+        if arcade.started:
+            if target_id == arcade.player.plane_id:  # player plane received damage -- only update player damage
+                if not arcade.player_exited:  # IL-2 damages/destroys plane upon player exitso we must ignore this condition
+                    arcade.player.plane_damaged += dmg_amount
+                    print(f"PLayer plane #{arcade.player.plane_id} damaged by: {dmg_amount}. Total damage: {arcade.player.plane_damaged}")
+            elif target_id == arcade.player.char_id:  # player human pilot character received damage
+                arcade.player.damaged += dmg_amount
+                print(f"PLayer PILOT #{arcade.player.char_id} damaged by: {dmg_amount}. Total damage: {arcade.player.plane_damaged}")
+            else:  # process vehicle damage
+                try:
+                    vehicle = arcade.veh_runtime_lookup[target_id]
+                except KeyError:  # vehicle is not one we care to score like a friendly unit -- this condition unlikely to be True
+                    print(f"****** KeyError trying to use vehicle key in AType:2 (damage): {target_id} *****")
+                else:
+                    if attacker_id in arcade.player_planes_id_list: #  == arcade.player.plane_id:  # player did damage to a vehicle
+                        vehicle.damage += dmg_amount
+                        vehicle.damage_by_player += dmg_amount
+                        vehicle.player_damaged = True
+                        #print(f"======= Player (#{attacker_id}) damaged  {vehicle.type} (#{target_id}) by {dmg_amount}.  Total damage is {vehicle.damage:.2}.=========")
+                    elif attacker_id == -1:  # vehicle is doing self damage based on a previous attack
+                        # print(f"==Self damage: {vehicle.type} (#{target_id}) by {dmg_amount}.  Total damage is {vehicle.damage:.2}.==")
+                        vehicle.damage += dmg_amount
+                        vehicle.damage_self += dmg_amount
+                    else:  # another unit is doing damage to vehicle -- apparently, this condition never reached as it seems to not logged in IL-2
+                        vehicle.damage += dmg_amount
+                        vehicle.damage_by_other += dmg_amount
+                        print(f"Error: =======Attacker ID = {attacker_id} damaged {target_id} of type {vehicle.type} by {dmg_amount}=========")
+
+    elif 'AType:3 ' in line:  # Killed:  attacker ID killed target ID
+        print(f"kill log string: {line}", end='')
+        attacker_id = int(re.search(r'(?<= AID:)-*\d+(?= TID)', line).group())
+        target_id = int(re.search(r'(?<= TID:)\d+(?= POS)', line).group())
+        if target_id == arcade.player.plane_id:  # il-2 destroyed player's plane
+            if not arcade.player_exited:  # il-2 destroys play plane on exit so ignore
+                print(f"player's plane (#{target_id}_ was killed by #{attacker_id}) in file {log_name}.")
+                arcade.player.plane_destroyed = True
+                arcade.game_over = True
+            else:
+                print("Ignoring player plane destruction due to mission exit.")
+        elif target_id == arcade.player.char_id:
+            # print(f"Player {arcade.player.char_id} killed.")
+            arcade.player.killed = True
+            arcade.game_over = True
+            print("Player was killed.")
+        else:
+            try:
+                vehicle = arcade.veh_runtime_lookup[target_id]
+            except KeyError:  # mission object that is not scored (e.g., friendly vehicles to player)
+                print(f"Ignoring kill of {arcade.other_vehicle_dict[target_id]} (#{target_id})")
+            else:
+                vehicle.destroyed = True
+                if attacker_id in arcade.player_planes_id_list:  # player dealt killing blow -- check current plane (common) and previous planes (rare if ever)
+                    vehicle.player_damaged = True
+                    vehicle.killed_by_player = True
+                    # r_con.send(f"serverinput {vehicle.type}", debug=debug) # send kill message to mission
+                    print(f"player killed vehicle (#{target_id}) of type: {vehicle.full_name}/{vehicle.name}")
+                else:
+                    if attacker_id == -1 and vehicle.player_damaged:
+                        vehicle.killed_by_player = True
+                        print(f"Vehicle {vehicle.full_name} (#{target_id}) was killed by self damage but giving player kill credit for doing partial damage in file ====={log_name}=====")
+                        r_con.send(f"serverinput {vehicle.type}", debug=debug)  # send kill message to mission
+                    else:  # other type
+                        print(f"OTHER KILL: {arcade.other_vehicle_dict[attacker_id]} (#{attacker_id}) killed vehicle {vehicle.full_name} (#{target_id}) in file {log_name}")
+    else:
+        return False
+    return True
+
+
+def process_arcade_game(arcade, mission_log_file_wildcard, r_con=None,
                         copy_log_files=True, do_not_delete=False, backup_dir=MISSION_LOG_BACKUP_DIR, debug=False,
-                        write_score=True, db_file=SCORES_DB, html_file=HTML_FILE):
+                        write_score=True, db_file=SCORES_DB, html_file=HTML_FILE, score_worker=None):
+    """
+        Parses mission log files and runs the arcade game.  If score_worker (ScoreWorker) is given, game results
+        are saved and uploaded in the background; otherwise they are processed before returning.
+    """
 
     if arcade.game_over:  # so ignore and copy/delete mission logfiles
         delete_multiple_logs_files(copy_log_files, mission_log_file_wildcard, backup_dir=backup_dir,
@@ -228,169 +437,10 @@ def process_arcade_game(arcade, mission_log_file_wildcard, mission_filename, r_c
         with open(current_logfile, 'r', encoding="UTF-8") as file:
             lines = file.readlines()
 
+        journal_entries = []  # lines which changed game state
         for line in lines:
-            #  ignore log activity unless player has spawned in for first time which starts game
-            if not ('AType:10 ' in line) and not arcade.started:
-                continue
-
-            # Player spawned in
-            if 'AType:10 ' in line:
-                """
-                    player spawned in a plane; if player spawned is in the PlayerStart as defined by a mission objective
-                    'PlayerStart' then create player and vehicles objects and start arcade game
-                """
-
-                position_str = get_position_str(line)  # coordinates of spawn in
-                found, index = find_mission_objective(position_str, arcade.m_objs, 50.0)  # determine if near registered spawn point
-                # print(f"airfield found?  {found}, {index}")
-
-                if not found:  # spawned in something like a spectator spawn so ignore
-                    continue
-
-                print(f"Spawned in location: '{arcade.m_objs[index].name}'")
-                arcade.player_exited = False
-
-                if not arcade.started:  # first time spawned in; init several variables
-                    print(f"START GAME in file ======{short_filename(current_logfile)}=====")
-                    arcade.started = True
-                    # init player and vehicle objects
-                    arcade.vehicles, arcade.veh_lookup = read_vehicles(mission_filename)  # get enemy target vehicles define in mission file with lookup
-                    arcade.player = create_player(line)
-                    arcade.old_time = time.time()
-
-                else:  # spawned in second and subsequent times
-                    update_player(line, arcade.player)  # pilot will have a new plane and pilot ID on subsequent spawns
-                    arcade.airfield_available += -1
-                    # print(f"before spawn IDs: {get_player_id_str(line)} {arcade.player.il2_player_id}")
-                    # check to see that another player is taking the spawn from the first spawn
-                    if get_player_id_str(line) != arcade.player.il2_player_id:
-                        arcade.game_over = True
-                        print("Arcade error:  Not the same player spawned in subsequent spawn compared to the first spawn")
-                        r_con.send_msg(f"Error: Different players playing game!  Game over. Reset mission to try again.")
-
-                arcade.player_planes_id_list.append(arcade.player.plane_id)
-                print(f"Player {arcade.player.alias} (PID={arcade.player.char_id}) started mission flying {arcade.player.plane_type} (ID={arcade.player.plane_id}) in file: ====={short_filename(current_logfile)}=====")
-                print(f"Allplane ids: {arcade.player_planes_id_list}")
-
-
-            # Exited: Player left aircraft in mission
-            elif 'AType:4' in line:
-                pilot_char_id = int(re.search(r'(?<= PID:)\d+(?= BUL)', line).group())
-                if pilot_char_id == arcade.player.char_id:
-                    print(f"Player {arcade.player.alias} (pid={pilot_char_id}) exited mission with {arcade.airfield_available} airspawns available in log file: ====={short_filename(current_logfile)}======")
-                    arcade.player_exited = True  # make sure all messages in this file continue to be processed
-                    if arcade.airfield_available == 0:
-                        arcade.game_over = True
-
-
-            elif 'AType:8 ' in line:  # mission objective events triggered (e.g. game over)
-                # mobj_id = int(re.search(r'(?<= OBJID:)\d+(?= POS)', line).group())  # gets OBJID (object ID?) but this is a useless ID #
-                """ must determine objective fired based on its position in mission """
-                print(line)
-                ps = get_position_str(line)
-                print(f"atype 8 pos string = {ps}")
-                found, index = find_mission_objective(ps, arcade.m_objs)
-                if found and arcade.m_objs[index].name == "gameover":
-                    print(f"Game over triggered in mission")
-                    r_con.send_msg(f"GAME OVER.")
-                    arcade.game_over = True
-
-            elif 'AType:18 ' in line:  # Ejection by pilot
-                pilot_id = int(re.search(r'(?<= BOTID:)\d+(?= )', line).group())
-                if pilot_id == arcade.player.char_id:
-                    arcade.player.ejected = True
-                    arcade.player.plane_destroyed = True
-                    arcade.game_over = True
-
-            elif 'AType:12 ' in line:  # vehicle spawned in
-                v_id = int(re.search(r'(?<= ID:)\d+(?= TY)', line).group())
-                v_type = re.search(r'(?<= TYPE:).+(?= CO)', line).group()
-                v_name = re.search(r'(?<= NAME:).+(?= PID)', line).group()
-                try:
-                    vehicle = arcade.veh_lookup[v_name]
-                except KeyError:
-                    #  other vehicle; just associate id and name for kill report (atype = 3)
-                    print(f"Other vehicle found: {v_id}:{v_name}")
-                    arcade.other_vehicle_dict[v_id] = v_name
-                else:
-                    vehicle.full_name = v_type
-                    vehicle.run_id = v_id
-                    arcade.veh_runtime_lookup[v_id] = vehicle
-                    print("Spawned ", end='')
-                    vehicle.short_print()
-
-            elif 'AType:2 ' in line:  # Damaged: attacker ID damaged target ID
-                # print(f"damage string: {line}")
-                dmg_amount = float(re.search(r'(?<= DMG:)\d+\.\d+(?= AID)', line).group())  # damage percentage from 0.0 to 1.0
-                attacker_id = int(re.search(r'(?<= AID:)-*\d+(?= TID)', line).group())
-                target_id = int(re.search(r'(?<= TID:)\d+(?= POS)', line).group())
-                # print(f"Damage--amount: {dmg_amount} attacker_id: {attacker_id}  target_id: {target_id} in file {m}")
-
-                if arcade.started:
-                    if target_id == arcade.player.plane_id:  # player plane received damage -- only update player damage
-                        if not arcade.player_exited:  # IL-2 damages/destroys plane upon player exitso we must ignore this condition
-                            arcade.player.plane_damaged += dmg_amount
-                            print(f"PLayer plane #{arcade.player.plane_id} damaged by: {dmg_amount}. Total damage: {arcade.player.plane_damaged}")
-                    elif target_id == arcade.player.char_id:  # player human pilot character received damage
-                        arcade.player.damaged += dmg_amount
-                        print(f"PLayer PILOT #{arcade.player.char_id} damaged by: {dmg_amount}. Total damage: {arcade.player.plane_damaged}")
-                    else:  # process vehicle damage
-                        try:
-                            vehicle = arcade.veh_runtime_lookup[target_id]
-                        except KeyError:  # vehicle is not one we care to score like a friendly unit -- this condition unlikely to be True
-                            print(f"****** KeyError trying to use vehicle key in AType:2 (damage): {target_id} *****")
-                        else:
-                            if attacker_id in arcade.player_planes_id_list: #  == arcade.player.plane_id:  # player did damage to a vehicle
-                                vehicle.damage += dmg_amount
-                                vehicle.damage_by_player += dmg_amount
-                                vehicle.player_damaged = True
-                                #print(f"======= Player (#{attacker_id}) damaged  {vehicle.type} (#{target_id}) by {dmg_amount}.  Total damage is {vehicle.damage:.2}.=========")
-                            elif attacker_id == -1:  # vehicle is doing self damage based on a previous attack
-                                # print(f"==Self damage: {vehicle.type} (#{target_id}) by {dmg_amount}.  Total damage is {vehicle.damage:.2}.==")
-                                vehicle.damage += dmg_amount
-                                vehicle.damage_self += dmg_amount
-                            else:  # another unit is doing damage to vehicle -- apparently, this condition never reached as it seems to not logged in IL-2
-                                vehicle.damage += dmg_amount
-                                vehicle.damage_by_other += dmg_amount
-                                print(f"Error: =======Attacker ID = {attacker_id} damaged {target_id} of type {vehicle.type} by {dmg_amount}=========")
-
-            elif 'AType:3 ' in line:  # Killed:  attacker ID killed target ID
-                print(f"kill log string: {line}", end='')
-                attacker_id = int(re.search(r'(?<= AID:)-*\d+(?= TID)', line).group())
-                target_id = int(re.search(r'(?<= TID:)\d+(?= POS)', line).group())
-                if target_id == arcade.player.plane_id:  # il-2 destroyed player's plane
-                    if not arcade.player_exited:  # il-2 destroys play plane on exit so ignore
-                        print(f"player's plane (#{target_id}_ was killed by #{attacker_id}) in file {short_filename(current_logfile)}.")
-                        arcade.player.plane_destroyed = True
-                        arcade.game_over = True
-                    else:
-                        print("Ignoring player plane destruction due to mission exit.")
-                elif target_id == arcade.player.char_id:
-                    # print(f"Player {arcade.player.char_id} killed.")
-                    arcade.player.killed = True
-                    arcade.game_over = True
-                    print("Player was killed.")
-                else:
-                    try:
-                        vehicle = arcade.veh_runtime_lookup[target_id]
-                    except KeyError:  # mission object that is not scored (e.g., friendly vehicles to player)
-                        print(f"Ignoring kill of {arcade.other_vehicle_dict[target_id]} (#{target_id})")
-                    else:
-                        vehicle.destroyed = True
-                        if attacker_id in arcade.player_planes_id_list:  # player dealt killing blow -- check current plane (common) and previous planes (rare if ever)
-                            vehicle.player_damaged = True
-                            vehicle.killed_by_player = True
-                            # r_con.send(f"serverinput {vehicle.type}", debug=debug) # send kill message to mission
-                            print(f"player killed vehicle (#{target_id}) of type: {vehicle.full_name}/{vehicle.name}")
-                        else:
-                            if attacker_id == -1 and vehicle.player_damaged:
-                                vehicle.killed_by_player = True
-                                print(f"Vehicle {vehicle.full_name} (#{target_id}) was killed by self damage but giving player kill credit for doing partial damage in file ====={short_filename(current_logfile)}=====")
-                                r_con.send(f"serverinput {vehicle.type}", debug=debug)  # send kill message to mission
-                            else:  # other type
-                                print(f"OTHER KILL: {arcade.other_vehicle_dict[attacker_id]} (#{attacker_id}) killed vehicle {vehicle.full_name} (#{target_id}) in file {short_filename(current_logfile)}")
-
-        delete_log_file(copy_log_files, current_logfile, do_not_delete=do_not_delete)  # removes mission log file from active log directory and copies to backup directory if copy_log_files=True
+            if process_log_line(arcade, line, r_con, short_filename(current_logfile), debug=debug):
+                journal_entries.append(line)
 
         # check to see if new life granted
         if arcade.started and arcade.spawn_names and not arcade.player.killed and not arcade.player.ejected and not arcade.player.plane_destroyed and not arcade.game_over:
@@ -398,15 +448,20 @@ def process_arcade_game(arcade, mission_log_file_wildcard, mission_filename, r_c
             # print(f"Running score = {arcade.score}; available spawns = {arcade.airfield_available}; airspawns = {arcade.spawn_names}; score = {arcade.new_airspawn_scores}")
             # check to see if new life earned
             if arcade.score >= arcade.new_airspawn_scores[0]:
-                print(f"New spawn available; unlocking airfield: '{arcade.spawn_names[0]}'")
+                spawn_name = unlock_airspawn(arcade)
+                journal_entries.append(UNLOCK_TAG)
+                print(f"New spawn available; unlocking airfield: '{spawn_name}'")
                 time.sleep(.1)
-                r_con.send(f"serverinput {arcade.spawn_names[0]}", debug=debug)  # send server message to open next airfield
+                r_con.send(f"serverinput {spawn_name}", debug=debug)  # send server message to open next airfield
                 time.sleep(.3)
-                r_con.send(f"serverinput {arcade.spawn_names[0]}", debug=debug)  # send twice in case first one missed by il-2
+                r_con.send(f"serverinput {spawn_name}", debug=debug)  # send twice in case first one missed by il-2
                 r_con.send_msg(f"New air spawn available!")
-                arcade.airfield_available += 1
-                del arcade.new_airspawn_scores[0]  # update queue
-                del arcade.spawn_names[0]
+
+        # journal game events before the log file is deleted so game can be recovered after a daemon crash
+        if arcade.journal is not None and arcade.started and not arcade.game_over:
+            arcade.journal.append(journal_entries)
+
+        delete_log_file(copy_log_files, current_logfile, backup_dir, do_not_delete=do_not_delete)  # removes mission log file from active log directory and copies to backup directory if copy_log_files=True
 
         if arcade.game_over:
             """ send mission to close all airfields """
@@ -440,8 +495,14 @@ def process_arcade_game(arcade, mission_log_file_wildcard, mission_filename, r_c
             r_con.send_msg(f"Type {FAKE_PREFIX}reset to play another round.")
 
             if not debug or write_score:
-                enter_score(score, message, arcade.player, db_file=db_file)  # store score in scoring database
-                html_write_scores(db_file=db_file, html_file=html_file, unique=True)  # write scores to html file and upload to web
+                if score_worker is not None:  # hand over to background thread so daemon keeps processing commands
+                    score_worker.submit(score, message, arcade.player, db_file=db_file, html_file=html_file)
+                else:
+                    enter_score(score, message, arcade.player, db_file=db_file)  # store score in scoring database
+                    html_write_scores(db_file=db_file, html_file=html_file, unique=True)  # write scores to html file and upload to web
+
+            if arcade.journal is not None:  # finished game no longer needs to be recovered
+                arcade.journal.clear()
 
             break  # break out of top for loop as no more file processing needed
 
@@ -465,7 +526,7 @@ def main():
     mission_basename = 'scg_training'
     html_dir = il2_mission_dir + 'high scores' + '\\'
     html_file = html_dir + r'index.html'
-    db_scores = html_dir + r'highscores.pickle'
+    db_scores = html_dir + r'highscores.sqlite'
 
     mission = Mission(il2_base_dir, il2_mission_dir, mission_basename)
     mission.init_new_mission(4)
@@ -475,7 +536,7 @@ def main():
 
     print_mission_objectives(mission.arcade.m_objs, short=True)
 
-    process_arcade_game(mission.arcade, file_wildcard, mission.mission_filename, r_con=rcon,
+    process_arcade_game(mission.arcade, file_wildcard, r_con=rcon,
                         backup_dir=backup_dir, do_not_delete=True, debug=True, write_score=True, db_file=db_scores,
                         html_file=html_file)
 
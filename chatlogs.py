@@ -5,7 +5,7 @@ import time
 
 from constants import FAKE_PREFIX, IL2_PLAYER_LIST_FILE, MY_LOG_FILE, KEEP_CHAT_LOGS, CHATLOG_DIR_BACKUP,\
     CHATLOG_FILES_WILDCARD
-from player import Player, print_player_list, update_player_list, write_player_list
+from player import Player, print_player_list, update_player_list, write_player_list, player_list_lock
 
 
 def remove_chat_log_file(f):
@@ -18,35 +18,36 @@ def remove_chat_log_file(f):
         pass
 
 
-def remove_chat_logs():
+def remove_chat_logs(files_wildcard=CHATLOG_FILES_WILDCARD, backup_dir=CHATLOG_DIR_BACKUP):
     """ Deletes and/or copies all chat log files """
 
-    files = glob.glob(CHATLOG_FILES_WILDCARD)
+    files = glob.glob(files_wildcard)
 
     # time.sleep(.5)  # pause to ensure file lockout has time to be released for deletion
     for f in files:
         if KEEP_CHAT_LOGS:  # copy chatlogs files to bak dir
             if os.path.getsize(f) > 0:  # preserve only logs with content in them
                 try:
-                    shutil.copy(f, CHATLOG_DIR_BACKUP)
+                    shutil.copy(f, backup_dir)
                 except shutil.Error:
                     pass
         remove_chat_log_file(f)
 
 
-def write_pilot_connections(pilot_connections):
+def write_pilot_connections(pilot_connections, log_filename=MY_LOG_FILE):
     """ Append log text data of pilot connections and exits to my personal connections log file """
-    with open(MY_LOG_FILE, 'a') as file_object:
+    with open(log_filename, 'a') as file_object:
         for p in pilot_connections:
             file_object.write(p)
 
 
-def process_chatlogs(files_wildcard, r_con, mission, player_list):
+def process_chatlogs(files_wildcard, r_con, mission, player_list, backup_dir=CHATLOG_DIR_BACKUP,
+                     log_filename=MY_LOG_FILE):
     """
         Reads, processes, and deletes IL-2 chat log files.
         Extracts pilot inputted commands.
         Also detects when pilots connect and disconnect and saves that info to the player database and
-        pilot connection log file.
+        pilot connection log file.  player_list may be shared with other server instances' threads.
         Notes and updates any player activity.
         Returns inputted user commands (list of strings)
     """
@@ -76,11 +77,12 @@ def process_chatlogs(files_wildcard, r_con, mission, player_list):
                 except ValueError as e:
                     print(e)
                 else:
-                    if update_player_list(player, player_list):
-                        write_player_list(player_list, IL2_PLAYER_LIST_FILE)
-                        print_player_list(player_list)
-                    else:
-                        print(f"Player {player.name} found in database.")
+                    with player_list_lock:
+                        if update_player_list(player, player_list):
+                            write_player_list(player_list, IL2_PLAYER_LIST_FILE)
+                            print_player_list(player_list)
+                        else:
+                            print(f"Player {player.name} found in database.")
 
             elif "sysPilotExit;" in line:
                 mission.old_time = time.time()  # note player activity.
@@ -98,6 +100,6 @@ def process_chatlogs(files_wildcard, r_con, mission, player_list):
                 mission.old_time = time.time()  # note player activity; chatlog displays time of event (e.g., 12:04) for significant events
                 print("Player activity noted:", line)
 
-    write_pilot_connections(pilot_connections)
-    remove_chat_logs()
+    write_pilot_connections(pilot_connections, log_filename)
+    remove_chat_logs(files_wildcard, backup_dir)
     return user_commands
@@ -33,12 +33,57 @@ MY_LOG_FILE = IL2_MISSION_DIR + r'python\scg_pilot_log.txt'  # text file to stor
 
 CLOUD_FILES_WILDCARD = IL2_MISSION_DIR + r'clouds\*.txt'  # cloud data is stored in files clouds00.text, etc.
 IL2_PLAYER_LIST_FILE = IL2_MISSION_DIR + r'python\player_list.pickle'  # permanently holds player IDs
+MISSION_CACHE_FILE = IL2_MISSION_DIR + r'python\mission_cache.pickle'  # parsed mission data keyed by file content hash
+MISSION_CATALOG_FILE = IL2_MISSION_DIR + r'python\mission_catalog.pickle'  # available missions' descriptions
+ARCADE_JOURNAL_FILE = IL2_MISSION_DIR + r'python\arcade_journal.txt'  # arcade game events for crash recovery
+RESAVER_CACHE_DIR = IL2_MISSION_DIR + r'python\resaver_cache' + '\\'  # MissionResaver.exe outputs by mission hash
+RESAVER_CACHE_ENTRIES = 40  # number of resaved missions kept in RESAVER_CACHE_DIR (least recently used are removed)
+PRESET_STATS_FILE = IL2_MISSION_DIR + r'python\preset_stats.pickle'  # how often each mission/clouds/time was resaved
+PREBUILD_DIR = IL2_MISSION_DIR + r'python\prebuild' + '\\'  # work directories of idle time resaver builds
+PREBUILD_IDLE_TIME = 300  # seconds without player activity before popular presets are resaved in the background
+PREBUILD_WORKERS = 1  # resaver processes run at the same time while idle (0 disables pre-building)
+PREBUILD_PRESETS = 10  # number of most requested presets kept pre-built
+PREBUILD_MIN_REQUESTS = 2  # requests of a preset before it is pre-built
+PRESTAGE_DELAY = 10  # seconds after a reset before the slot dserver just left is pre-staged for the next reset
+
+# timed mission rotation (see rotation.py)
+ROTATION_ENABLED = False  # whether missions are rotated on a timer
+ROTATION_INTERVAL = 60 * 60  # seconds each mission runs before rotating to the next one
+ROTATION_MISSIONS = ()  # mission indices rotated through in order (empty: all available missions in order)
+ROTATION_PRESTAGE_TIME = 120  # seconds before a rotation that the next mission's files are pre-staged
+ROTATION_WARNINGS = (5, 1)  # minute marks before a rotation at which players are warned
 
 # TCP/IP values of server and login credentials
 DSERVER_IP = '192.168.0.99'
 DSERVER_PORT = 8991
 DSERVER_USERNAME = 'scg'
 DSERVER_PASSWORD = 's1'
+DSERVER_START_TIMEOUT = 60  # seconds to wait for a started DServer.exe to answer its remote console
+DSERVER_STOP_TIMEOUT = 15  # seconds to wait for DServer.exe to exit after terminating it before killing it
+DSERVER_REBOOT_TIMEOUT = 8  # seconds to wait after 'serverinput reboot' for players to be kicked before stopping
+DSERVER_PROBE_INTERVAL = 1  # seconds between remote console probes while waiting on DServer.exe
+
+# hot-standby DServer (see dserver_standby.py)
+STANDBY_DSERVER = False  # whether a standby DServer.exe is started ahead of a server settings restart
+IL2_DSERVER_STANDBY_CONFIG = IL2_DSERVER_DIR + 'scg_standby.sds'  # sds file of the standby DServer
+DSERVER_RCON_PORT_KEY = 'rconPort'  # sds key of the remote console port
+DSERVER_PORT_SETTINGS = {DSERVER_RCON_PORT_KEY: (DSERVER_PORT, 8992), 'port': (28000, 28001)}  # sds port keys: the two ports running and standby DServers alternate between
+
+# DServer.exe resource monitor (see process_monitor.py); DServer is restarted at the next empty-server moment once a
+# threshold is crossed (0 disables a threshold)
+DSERVER_MONITOR_INTERVAL = 60  # seconds between samples of DServer's memory, CPU and handles (0 disables the monitor)
+DSERVER_MONITOR_SAMPLES = 24 * 60  # samples kept (a day at one per minute)
+DSERVER_MAX_RSS_MB = 8000  # resident memory of DServer
+DSERVER_MAX_RSS_GROWTH_MB = 3000  # growth of DServer's resident memory above its lowest since it started
+DSERVER_MAX_HANDLES = 20000  # open handles of DServer
+DSERVER_MAX_CPU = 90  # average CPU use (percent of one core) over DSERVER_CPU_WINDOW
+DSERVER_CPU_WINDOW = 15 * 60  # seconds
+
+# DServer instances run by this daemon (see server_instance.py): one dict of ServerConfig settings per instance.
+# Settings left out default to the constants above, with paths moved to the instance's il2_base_dir/mission_dir, e.g.,
+# SERVER_INSTANCES = [{}, {'name': 'scg2', 'il2_base_dir': r'F:\il2' + '\\', 'rcon_port': 8993,
+#                          'port_settings': {DSERVER_RCON_PORT_KEY: (8993, 8994), 'port': (28002, 28003)}}]
+SERVER_INSTANCES = [{}]
 
 
 # log file booleans
@@ -47,6 +92,12 @@ KEEP_CHAT_LOGS = True  # whether to preserve the chat log files
 
 # misc constants
 SLEEP_TIME = 3  # amount of seconds for this script between each iteration (before dumping chatlog)
+# seconds between runs of each of the daemon's tasks (see server_instance.py)
+CHAT_INTERVAL = 1  # chat logs and user commands
+ARCADE_INTERVAL = 1  # arcade game mission logs
+SERVER_CHECK_INTERVAL = SLEEP_TIME  # DServer restarts (pending settings, inactivity, resource monitor)
+HOUSEKEEPING_INTERVAL = 5  # hot standby, mission rotation and pre-building
+TASK_TIMEOUT = 60  # seconds a step may run before where it is stuck is printed (again every TASK_TIMEOUT)
 RESET_TIME = 2 * 60 * 60  # time in seconds to possibly reload the default mission after player inactivity; 2 hours
 # RESET_TIME = 2 * 60  # debug reset time -- very short time
 CMD_PREFIX = '$$'  # the command character sequence indicating a user command has been entered (e.g., $$time 23)
@@ -63,9 +114,11 @@ MISSION_LOG_BACKUP_DIR = MISSION_LOG_DIR + r'bak'
 HTML_DIR = IL2_MISSION_DIR + 'high scores' + '\\'
 HTML_FILE = HTML_DIR + r'index.html'
 CSS_FILE = HTML_DIR + r'style.css'
-SCORES_DB = HTML_DIR + r'highscores.pickle'
+SCORES_DB = HTML_DIR + r'highscores.sqlite'  # an old highscores.pickle in the same directory is migrated on first use
 NUM_LAST_PLAYERS = 5  # number of scores to list for the last unique player table
 NUM_HIGH_SCORES = 20  # number of high scores to show for the other high scores tables
+LEADERBOARD_DIR = HTML_DIR + 'leaderboards' + '\\'  # JSON period leaderboards (daily.json, weekly.json, ...)
+LEADERBOARD_WEB_DIR = 'leaderboards/'  # Neocities directory the JSON leaderboards are uploaded to
 arcade_planes = ['Ju 87 D-3']
 AIR_SPAWNS = ['spawn2', 'spawn3', 'spawn4']  # air spawns which can be unlocked
 # arcade_planes = ('Ju 87 D-3', 'Hs 129 B-2', 'Bf 110 G-2')
@@ -98,3 +151,14 @@ points = {
 SCORING_MILESTONES = [600, 1400, 2400]  # points need to unlock air spawn (i.e., new life)
 
 HIGHSCORES_URL = 'https://il2arcade.neocities.org'
+SCORE_RETRY_DELAYS = (5, 30, 120, 600)  # seconds to wait before retrying a failed high score save/render
+
+# Neocities web site the high scores page is uploaded to
+NEOCITIES_API_URL = 'https://neocities.org/api'  # e.g., 'http://localhost:8080/api' for utilities/neocities_standin.py
+NEOCITIES_USER = 'il2arcade'
+NEOCITIES_PASSWORD = 'arcade1!A'
+UPLOAD_DEBOUNCE = 20  # seconds without new upload requests before queued uploads are sent
+UPLOAD_MAX_DELAY = 120  # maximum seconds an upload request waits while requests keep arriving
+UPLOAD_RETRY_DELAYS = (10, 30, 90, 270, 600)  # seconds to wait before retrying a failed upload
+UPLOAD_TIMEOUT = 30  # seconds to wait for Neocities to respond
+UPLOAD_HASHES_FILE = HTML_DIR + r'uploaded_hashes.pickle'  # content hashes of the last successful uploads
@@ -3,21 +3,25 @@
     unlimited ammo, invulnerability, bombing assist, and object icons.
 """
 
+import signal
 import subprocess
+import sys
 import time
 import os
 import shutil
 from constants import IL2_DSERVER_DIR, IL2_DSERVER_EXE, IL2_DSERVER_BASE_CONFIG, IL2_DSERVER_WORKING_CONFIG, \
-    DSERVER_AIM, DSERVER_ICONS, DSERVER_AMMO, DSERVER_INVULN, STUKA_DSERVER_SETTINGS
+    DSERVER_AIM, DSERVER_ICONS, DSERVER_AMMO, DSERVER_INVULN, STUKA_DSERVER_SETTINGS, DSERVER_START_TIMEOUT, \
+    DSERVER_STOP_TIMEOUT, DSERVER_PROBE_INTERVAL, DSERVER_RCON_PORT_KEY
+from sds_config import read_sds_config
 
 
 class ServerSettings:
     """Class to hold dserver sds config toggleable vars like unlimited ammo, object icons, etc. """
 
-    def __init__(self, key, description, string_list):
+    def __init__(self, key, description, config):
         self.description = description
         self.key = key
-        self.line_num, self.bool_value = get_bool_value(key, string_list)
+        self.bool_value = config.get_bool(key)  # KeyError if key is missing from the SdsConfig
         self.original_bool_value = self.bool_value  # var to remember original state after read
         self.updated = False  # flag to indicate in print if value has been changed
 
@@ -38,59 +42,117 @@ class ServerSettings:
         self.updated = True if self.bool_value != self.original_bool_value else False
 
 
-def start_dserver(config_filename):
+dserver_durations = {'start': [], 'stop': []}  # measured seconds of recent dserver starts and stops
+
+
+def record_duration(kind, seconds, keep=20):
+    """ Remembers how long a dserver start or stop (kind) took """
+    durations = dserver_durations[kind]
+    durations.append(seconds)
+    del durations[:-keep]
+    print(f"DServer {kind} took {seconds:.1f} secs (average of last {len(durations)}:"
+          f" {sum(durations) / len(durations):.1f} secs).")
+
+
+def start_dserver(config_filename, r_con=None, timeout=DSERVER_START_TIMEOUT, dserver_dir=IL2_DSERVER_DIR):
     """
         starts dserver.exe
         config_filename = name of configuration file to pass into dserver.exe
+        r_con = RemoteConsoleClient used to wait until dserver answers its remote console (up to timeout seconds);
+                None returns right after starting the process.  Its port is set to the config's remote console port.
+        dserver_dir = directory of the IL-2 installation's dserver.exe
     """
-    os.chdir(IL2_DSERVER_DIR)  # change the directory to where dserver.exe is located since dserver cannot handle sds path and/or filenames containing spaces (yes...this is lame)
-    sp = subprocess.Popen([IL2_DSERVER_EXE, config_filename])
-    time.sleep(15)  # wait some time for dserver to start and log into master il-2 server
+    if r_con is not None:
+        r_con.port = read_sds_config(config_filename).get_int(DSERVER_RCON_PORT_KEY, r_con.port)
+    exe = os.path.join(dserver_dir, IL2_DSERVER_EXE)
+    command = [sys.executable, exe] if exe.endswith('.py') else [exe]  # .py: stand-in for testing (e.g., utilities/fake_dserver.py)
+    # run in the directory where dserver.exe is located since dserver cannot handle sds path and/or filenames containing spaces (yes...this is lame);
+    # cwd instead of os.chdir() as the daemon's directory is shared by all server instances
+    sp = subprocess.Popen(command + [config_filename], cwd=dserver_dir)
+    if r_con is not None:
+        seconds = r_con.wait_until_ready(timeout, DSERVER_PROBE_INTERVAL)
+        if seconds is None:
+            print(f"Warning: DServer did not answer its remote console within {timeout} secs.")
+        else:
+            r_con.comm_flag = True  # sends that failed while dserver was down no longer count as lost communication
+            record_duration('start', seconds)
     return sp
 
 
-def stop_dserver(dserver_process):
-    return dserver_process.terminate()
-
-
-def open_sds_file(filename):
-    """ Opens server configuration file and returns list of lines """
-    with open(filename, 'r', encoding="UTF-8") as file:
-        sds_data = file.read()
-    return sds_data.split('\n')
+class PreviousDServer:
+    """
+        Stands in for the subprocess.Popen of a dserver.exe started by a previous run of this daemon, known only by
+        its process id (e.g., from the arcade journal).  Stopping it kills that one process, not every dserver.exe.
+    """
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        if sys.platform == 'win32':  # image name filter guards against the process id having been reused
+            self.returncode = subprocess.call(['taskkill', '/F', '/PID', str(self.pid),
+                                               '/FI', f"IMAGENAME eq {os.path.basename(IL2_DSERVER_EXE)}"])
+        else:  # e.g., utilities/fake_dserver.py
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self.returncode = 0
+
+    kill = terminate
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+def stop_dserver(dserver_process, timeout=DSERVER_STOP_TIMEOUT):
+    """ Stops dserver.exe (subprocess.Popen or PreviousDServer) and waits (up to timeout seconds) for it to exit;
+        dserver_process is None if no dserver process is known (nothing is stopped then) """
+    start = time.time()
+    if dserver_process is None:
+        print("No DServer process known to stop.")
+        return None
+    dserver_process.terminate()
+    try:
+        result = dserver_process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        print(f"DServer did not exit within {timeout} secs of terminate; killing it.")
+        dserver_process.kill()
+        result = dserver_process.wait()
+    record_duration('stop', time.time() - start)
+    return result
+
+
+def write_sds_file(filename, server_vars, config):
+    """
+        Sets server_vars in config (SdsConfig) and writes it to filename if anything changed; server_vars are the
+        running settings from then on.  Returns whether the file was written.
+    """
+    for s in server_vars.values():
+        update_config_data(s, config)
+        s.original_bool_value, s.updated = s.bool_value, False
+    return config.write(filename)
 
 
-def write_sds_file(filename, server_vars, lines):
+def applied_config(server_vars, config):
+    """ Returns a copy of config (SdsConfig) with server_vars set, i.e., what write_sds_file() would write """
+    config = config.copy()
     for s in server_vars.values():
-        update_config_data(s, lines)
-    """ Writes lines (list of strings) to sds file """
-    with open(filename, 'w', encoding="UTF-8") as file:
-        file.write('\n'.join(lines))
+        update_config_data(s, config)
+    return config
 
 
-def copy_sds_config_base_to_working():
+def copy_sds_config_base_to_working(base_config=IL2_DSERVER_BASE_CONFIG, working_config=IL2_DSERVER_WORKING_CONFIG):
     """ Copy base sds to working sds which can be modified """
-    shutil.copy(IL2_DSERVER_BASE_CONFIG, IL2_DSERVER_WORKING_CONFIG)
+    shutil.copy(base_config, working_config)
 
 
-def update_config_data(s, lines):
-    """ updates the lines data with the boolean value of server class object """
-    lines[s.line_num] = s.key + ' = ' + ('true' if s.bool_value else 'false')
-
-
-def get_bool_value(key, str_list):
-    """
-        Returns whether key has value of '= true' and returns Boolean True or False and returns line_number
-        in str_list
-    """
-    for i, s in enumerate(str_list):
-        if key in s:
-            if '= true' in s:
-                return i, True
-            else:
-                return i, False
-    print(f"Error: {key} not found in sds config file.")
-    exit(-1)
+def update_config_data(s, config):
+    """ updates the config (SdsConfig) with the boolean value of server class object """
+    config.set(s.key, s.bool_value)
 
 
 def onoff_str(bool_value):
@@ -101,13 +163,13 @@ def onoff_str(bool_value):
 
 
 def read_sds_file(filename):
-    """ Reads sds config file and initiates server class instance and returns both """
-    lines = open_sds_file(filename)  # read sds config file
-    server_dict = {DSERVER_AIM: ServerSettings('aimingHelp', 'Aiming help', lines),
-                   DSERVER_ICONS: ServerSettings('objectIcons', 'Object icons', lines),
-                   DSERVER_AMMO: ServerSettings('unlimitAmmo', "Unlimited ammo", lines),
-                   DSERVER_INVULN: ServerSettings('invulnerability', 'Plane invulnerablity', lines)}
-    return server_dict, lines
+    """ Reads sds config file and initiates server class instance and returns both (dict, SdsConfig) """
+    config = read_sds_config(filename)  # read sds config file
+    server_dict = {DSERVER_AIM: ServerSettings('aimingHelp', 'Aiming help', config),
+                   DSERVER_ICONS: ServerSettings('objectIcons', 'Object icons', config),
+                   DSERVER_AMMO: ServerSettings('unlimitAmmo', "Unlimited ammo", config),
+                   DSERVER_INVULN: ServerSettings('invulnerability', 'Plane invulnerablity', config)}
+    return server_dict, config
 
 
 def check_if_server_vars_updated(server_vars):
@@ -0,0 +1,123 @@
+"""
+    Hot-standby DServer.exe.  Toggling a server setting (aim, icons, ammo, invuln) needs a DServer restart, which
+    kicks every player and takes a full DServer start.  With STANDBY_DSERVER set, a second DServer is started as soon
+    as a restart becomes pending, using the pending settings, the other set of ports (DSERVER_PORT_SETTINGS, or the
+    server instance's port_settings) and the mission slot the running DServer is not using.  When the restart is due
+    and the standby answers its remote console, the running DServer is stopped and the remote console switches to the
+    standby, so players only have to rejoin.  If the standby is not ready, or was started for other settings, the
+    normal restart is used instead.
+
+    Test with utilities/fake_dserver.py as IL2_DSERVER_EXE (tests/test_dserver_standby.py does).
+"""
+
+from constants import IL2_DSERVER_STANDBY_CONFIG, DSERVER_PORT_SETTINGS, DSERVER_RCON_PORT_KEY, DSERVER_START_TIMEOUT, \
+    DSERVER_PROBE_INTERVAL, MISSION_BASENAME, IL2_DSERVER_DIR
+from dserver_run_functions import start_dserver, stop_dserver, applied_config
+from sds_config import SdsConfig
+from remote_console import RemoteConsoleClient
+
+
+def other_port(config, key, port_settings=DSERVER_PORT_SETTINGS):
+    """ Returns the port of port_settings key not used by config (SdsConfig) """
+    ports = port_settings[key]
+    return ports[1] if config.get(key) == str(ports[0]) else ports[0]
+
+
+def first_slot_config(config, slot, mission_basename=MISSION_BASENAME):
+    """ Returns copy of config (SdsConfig) with the mission rotation reordered to start with dserver slot (0 or 1) """
+    lines = list(config.lines)
+    slot_lines = [i for i, line in enumerate(lines) if f"{mission_basename}0" in line or f"{mission_basename}1" in line]
+    if len(slot_lines) == 2 and f"{mission_basename}{slot}" not in lines[slot_lines[0]]:
+        first, second = slot_lines
+        lines[first], lines[second] = lines[second], lines[first]
+    return SdsConfig('\n'.join(lines))
+
+
+class StandbyDServer:
+    """ Standby DServer process with its own remote console client; owned by the main loop """
+    def __init__(self, r_con, config_filename=IL2_DSERVER_STANDBY_CONFIG, port_settings=DSERVER_PORT_SETTINGS,
+                 mission_basename=MISSION_BASENAME, dserver_dir=IL2_DSERVER_DIR):
+        self.r_con = r_con  # remote console client of the running DServer (switched to the standby on switchover)
+        self.config_filename = config_filename
+        self.port_settings = port_settings  # {sds port key: (port, other port)}
+        self.mission_basename = mission_basename
+        self.dserver_dir = dserver_dir
+        self.process = None  # standby DServer process (None if no standby is running)
+        self.config = None  # SdsConfig the standby was started with
+        self.slot = None  # mission slot the standby loaded
+        self.mission = None  # Mission the standby was started for (its standby_slot is kept up to date)
+        self.standby_r_con = None
+
+    def standby_config(self, server_vars, sds_config, slot):
+        """ Returns SdsConfig of a standby with server_vars on the other ports starting with mission slot """
+        config = first_slot_config(applied_config(server_vars, sds_config), slot, self.mission_basename)
+        for key in self.port_settings:
+            config.set(key, other_port(config, key, self.port_settings))
+        return config
+
+    def prepare(self, server_vars, sds_config, mission):
+        """ Starts a standby for server_vars and the current mission unless one is already running for them """
+        try:
+            config = self.standby_config(server_vars, sds_config, mission.dserver_write_index)
+        except KeyError as e:  # port setting missing in sds file
+            print(f"Standby DServer error: {e}")
+            return
+        if self.process is not None and config.text() == self.config.text():
+            return
+        self.discard()
+        print(f"Starting standby DServer on mission slot #{mission.dserver_write_index}...")
+        try:
+            rcon_port = config.get_int(DSERVER_RCON_PORT_KEY)
+            mission.wait_for_prestage()
+            mission.stage_dserver_slot(mission.dserver_write_index)
+            config.write(self.config_filename)
+        except (OSError, ValueError) as e:
+            print(f"Standby DServer error: {e}")
+            return
+        self.config, self.slot = config, mission.dserver_write_index
+        self.mission, mission.standby_slot = mission, self.slot  # pre-stages must not rewrite the standby's slot
+        self.standby_r_con = RemoteConsoleClient(self.r_con.host, rcon_port, self.r_con.login, self.r_con.password)
+        self.process = start_dserver(self.config_filename, dserver_dir=self.dserver_dir)  # readiness is probed at switchover
+
+    def discard(self):
+        """ Stops the standby (e.g., settings toggled back or mission replaced) """
+        if self.process is not None:
+            print("Stopping standby DServer...")
+            stop_dserver(self.process)
+            self.release()
+
+    def release(self):
+        """ Forgets the standby process (stopped or now the running DServer) """
+        if self.mission is not None:
+            self.mission.standby_slot = None
+        self.process = self.config = self.slot = self.standby_r_con = self.mission = None
+
+    def switch_over(self, active_process, server_vars, sds_config, mission, working_config):
+        """
+            Replaces the running DServer with the standby if it runs server_vars and answers its remote console.
+            Returns the new running process, or None if the standby cannot be used (nothing was changed then).
+        """
+        if self.process is None or self.process.poll() is not None:
+            return None
+        config = self.standby_config(server_vars, sds_config, self.slot)
+        if config.text() != self.config.text() or \
+                self.standby_r_con.wait_until_ready(DSERVER_START_TIMEOUT, DSERVER_PROBE_INTERVAL) is None:
+            print("Standby DServer is not ready for the pending settings; restarting normally.")
+            self.discard()
+            return None
+
+        stop_dserver(active_process)
+        self.r_con.port = self.standby_r_con.port
+        self.r_con.connect()
+        # working config describes the running DServer (with the mission rotation in its usual order)
+        first_slot_config(self.config, 0, self.mission_basename).write(working_config)
+        process, slot = self.process, self.slot
+        self.release()
+
+        # standby loaded the mission as it was when the standby started; reset it if the mission changed since
+        mission.dserver_write_index = (slot + 1) % 2  # slot the stopped DServer used is next
+        if not mission.slot_matches(slot):
+            mission.reset_mission(self.r_con)
+        else:
+            mission.prestage_dserver_slot()
+        return process
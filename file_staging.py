@@ -0,0 +1,108 @@
+"""
+    Mission file staging with as little disk I/O as possible.  A file is only staged (copied) if the destination's
+    content differs from the source's, and the destination is then created as a hard link to the source where the file
+    system supports it (a plain copy otherwise).  Every write goes to a temporary file that replaces the destination
+    in one step, so a destination is never truncated and rewritten in place: a file hard linked elsewhere (e.g., an
+    "available missions" file linked into the main mission directory) is never
+    changed through one of its other names.  Programs that do write files in place (MissionResaver.exe) must be
+    given private copies first with unshare_file().  Files DServer.exe runs (its two mission slots) are always
+    staged as copies (link=False): other tools may rewrite the available missions in place, and a slot linked to
+    them would change under the running DServer.
+
+    Content is compared by size and then by SHA-1; digests are cached by file identity (inode, size, modification
+    time), so comparing unchanged files costs a stat() call each.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+
+_digests = {}  # {filename: ((inode, size, mtime), sha1 digest)}
+
+
+def file_digest(filename, st=None):
+    """ Returns SHA-1 digest of file's content (cached until the file changes) """
+    st = st if st else os.stat(filename)
+    identity = (st.st_ino, st.st_size, st.st_mtime_ns)
+    cached = _digests.get(filename)
+    if cached and cached[0] == identity:
+        return cached[1]
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    _digests[filename] = (identity, digest.digest())
+    return digest.digest()
+
+
+def same_content(source, destination):
+    """ Returns whether destination exists and has the same content as source """
+    try:
+        dst = os.stat(destination)
+    except FileNotFoundError:
+        return False
+    src = os.stat(source)
+    if (src.st_dev, src.st_ino) == (dst.st_dev, dst.st_ino) and src.st_ino:  # already the same (hard linked) file
+        return True
+    return src.st_size == dst.st_size and file_digest(source, src) == file_digest(destination, dst)
+
+
+def temporary_name(filename):
+    """ Returns a temporary file name next to filename unique to this process and thread """
+    return f"{filename}.tmp{os.getpid()}.{threading.get_ident()}"
+
+
+def stage_file(source, destination, link=True):
+    """
+        Makes destination a copy of source unless it already is one; returns whether destination was replaced.
+        link=False: destination is never a hard link of source (an existing link is replaced by a copy).
+    """
+    if same_content(source, destination) and (link or not os.path.samefile(source, destination)):
+        return False
+    tmp = temporary_name(destination)
+    try:
+        os.remove(tmp)
+    except FileNotFoundError:
+        pass
+    try:
+        if not link:
+            raise OSError
+        os.link(source, tmp)
+    except OSError:  # hard links not supported (e.g., other drive or file system)
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, destination)
+    return True
+
+
+def write_file(filename, text, encoding=None):
+    """ Writes text to filename by replacing it in one step """
+    tmp = temporary_name(filename)
+    with open(tmp, 'w', encoding=encoding) as file:
+        file.write(text)
+    os.replace(tmp, filename)
+
+
+def write_if_changed(filename, text, encoding=None):
+    """ Writes text to filename unless filename already contains it; returns whether the file was written """
+    try:
+        with open(filename, 'r', encoding=encoding) as file:
+            if file.read() == text:
+                return False
+    except (FileNotFoundError, UnicodeError):
+        pass
+    write_file(filename, text, encoding)
+    return True
+
+
+def unshare_file(filename):
+    """ Replaces a hard linked file with a private copy so it can be written in place without changing its links """
+    try:
+        if os.stat(filename).st_nlink < 2:
+            return False
+    except FileNotFoundError:
+        return False
+    tmp = temporary_name(filename)
+    shutil.copyfile(filename, tmp)
+    os.replace(tmp, filename)
+    return True
@@ -0,0 +1,70 @@
+"""
+    Exports the period leaderboards of the high scores database (see ScoresDB.period_leaderboard) as compact JSON
+    files, one per period, which the high scores web site loads client side:
+        daily.json, weekly.json, monthly.json, alltime.json
+
+    File format (without whitespace):
+        {"period": "weekly", "start": "2024-03-11",
+         "boards": {"all": [{"rank": 1, "alias": "...", "plane": "Ju 87 D-3", "score": 4200, "date": "2024-03-12"}, ...],
+                    "Ju 87 D-3": [...]}}
+    "all" is the leaderboard of all planes combined followed by one leaderboard for each plane in arcade_planes.
+    A file is only rewritten (and queued for upload) when its content changed.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from constants import LEADERBOARD_DIR, LEADERBOARD_WEB_DIR, NUM_HIGH_SCORES, arcade_planes
+from highscores import open_scores_db
+from scores_db import PERIODS, period_start
+
+
+class LeaderboardExporter:
+    """ Writes JSON leaderboard files; keep one instance alive so unchanged files are not re-read """
+    def __init__(self, json_dir=LEADERBOARD_DIR, num_scores=NUM_HIGH_SCORES, uploader=None):
+        self.json_dir = json_dir
+        self.num_scores = num_scores  # number of scores in each leaderboard
+        self.uploader = uploader  # UploadQueue changed files are queued to (not uploaded if None)
+        self.written = {}  # {json filename: file content last read or written}
+
+    @staticmethod
+    def board(scores):
+        return [{'rank': i + 1, 'alias': s.alias, 'plane': s.plane, 'score': s.score, 'date': s.date_str}
+                for i, s in enumerate(scores)]
+
+    def period_json(self, db, period, now):
+        """ Returns compact JSON string of all leaderboards of the current period """
+        boards = {'all': self.board(db.period_leaderboard(period, self.num_scores, minimum=0, now=now))}
+        for p in arcade_planes:
+            boards[p] = self.board(db.period_leaderboard(period, self.num_scores, plane=p, minimum=0, now=now))
+        data = {'period': period, 'start': period_start(period, now), 'boards': boards}
+        return json.dumps(data, separators=(',', ':'))
+
+    def read(self, filename):
+        if filename not in self.written:
+            try:
+                with open(filename, 'r', encoding="UTF-8") as f:
+                    self.written[filename] = f.read()
+            except FileNotFoundError:
+                self.written[filename] = None
+        return self.written[filename]
+
+    def export(self, db_file, now=None):
+        """ Writes leaderboard files whose content changed and queues them for upload; returns number written """
+        now = now if now else datetime.now()
+        num_written = 0
+        with open_scores_db(db_file) as db:
+            for period in PERIODS:
+                json_str = self.period_json(db, period, now)
+                filename = os.path.join(self.json_dir, f"{period}.json")
+                if self.read(filename) == json_str:
+                    continue
+                os.makedirs(self.json_dir, exist_ok=True)
+                with open(filename, 'w', encoding="UTF-8") as f:
+                    f.write(json_str)
+                self.written[filename] = json_str
+                num_written += 1
+                if self.uploader is not None:
+                    self.uploader.request(filename, f"{LEADERBOARD_WEB_DIR}{period}.json")
+        return num_written
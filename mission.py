@@ -1,11 +1,18 @@
 import glob
-import shutil
+import threading
 import os
-import subprocess
 import time
 from missionenvironment import MissionEnvironment  # handles weather info (e.g., winds, clouds, mission time, etc. )
-from constants import CLOUD_FILES_WILDCARD, STUKA_DSERVER_SETTINGS
+from constants import CLOUD_FILES_WILDCARD, STUKA_DSERVER_SETTINGS, MISSION_CACHE_FILE, ARCADE_JOURNAL_FILE, \
+    MISSION_CATALOG_FILE, PRESTAGE_DELAY, PRESET_STATS_FILE, PREBUILD_DIR
 from arcade_stuka import ArcadeMission
+from arcade_journal import ArcadeJournal, replay_arcade_journal, SLOT_TAG
+from mission_cache import MissionCache
+from mission_catalog import MissionCatalog
+from resaver import ResaverCache, ResaverJob, mission_key, resaver_command
+from file_staging import stage_file, same_content, unshare_file, write_if_changed
+from prebuild import PresetPrebuilder
+from score_worker import ScoreWorker
 from dserver_run_functions import check_arcade_dserver_setting
 
 
@@ -14,7 +21,10 @@ class Mission:
         Class which hold mission data and methods including mission file handling and
         methods associated with inputted user commands.
     """
-    def __init__(self, base_dir, mission_dir, mission_basename):
+    def __init__(self, base_dir, mission_dir, mission_basename, cache_file=MISSION_CACHE_FILE,
+                 catalog_file=MISSION_CATALOG_FILE, journal_file=ARCADE_JOURNAL_FILE, preset_stats_file=PRESET_STATS_FILE,
+                 prebuild_dir=PREBUILD_DIR, score_worker=None):
+        """ score_worker = ScoreWorker shared with other server instances (None starts one for this mission) """
         self.base_dir = base_dir  # IL-2 base directory
         self.main_mission_dir = mission_dir  # main directory where Dserver runs the mission
         self.mission_basename = mission_basename  # base name of the mission DServer will call and run repeatedly
@@ -37,17 +47,28 @@ class Mission:
         """ Environmental weather data is held in this class var env"""
         self.env = MissionEnvironment(CLOUD_FILES_WILDCARD)
 
+        """ Parsed mission data (arcade vehicles, objectives, etc.) cached by file content to avoid re-parsing """
+        self.cache = MissionCache(cache_file)
+
+        """ Outputs of MissionResaver.exe cached by mission and briefing text so repeated settings are not resaved """
+        self.resaver_cache = ResaverCache((self.binfile_ext, self.list_ext, self.briefing_file_ext) + self.language_exts)
+
         """ boolean reset vars: (1) reset mission only, (2) reset requires resaver.exe action, (3) new mission """
         self.user_initiated_reset = False  # whether user inputted the reset command
         self.load_new_mission_flag = False  # whether a new map needs to reloaded (or reset to its intial state)
         self.run_resaver = False  # whether resasver.exe needs to be run to create a mission binary file
+        self.resaver_job = None  # ResaverJob running in the background (None if the resaver is not running)
+        self.resaver_key = None  # resaver cache key of the mission being resaved
+        self.resaver_msg_time = 0  # seconds into the resaver job of the last progress message
         self.restart_dserver = False  # whether the dserver needs to be restarted due to server variable being toggled liking aiming assist, invulnerability, unlimited ammo, etc.
 
         self.old_time = time.time()  # time stamp for whether mission needs to be reset back to mission index 0
 
         """ The raw IL-2 mission files are stored in the "available missions" sub directory.  Parse this directory
-         and store in teh AvailableMissions class object """
+         and store in teh AvailableMission class objects (the catalog keeps them up to date) """
         self.available_mission_dir = self.main_mission_dir + "available missions" "\\"
+        self.catalog = MissionCatalog(self.available_mission_dir, catalog_file, self.mission_file_ext,
+                                      self.description_ext)
         self.available_missions = self.get_available_missions()
         self.num_missions = len(self.available_missions)
 
@@ -55,22 +76,24 @@ class Mission:
 
         self.description_filename = None
         # self.mission_index = self.get_current_mission_index()  # index of the current and possibly next mission
-        self.mission_index = None  # index of the current mission as specified in all available missions
+        self.mission_index = None  # index of the current (or pending) mission in available missions; None if removed
+        self.current_mission = None  # AvailableMission loaded (kept when it is removed from available missions)
 
         self.arcade_game = None  # will hold data after mission files loaded
         self.arcade = None
+        # saves and uploads finished arcade game results in the background
+        self.score_worker = score_worker if score_worker is not None else ScoreWorker()
+        self.dserver_monitor = None  # ProcessMonitor of the running DServer.exe (set by its server instance)
+        self.journal = ArcadeJournal(journal_file)  # records arcade game events for crash recovery
+        self.prebuilder = PresetPrebuilder(self, preset_stats_file, prebuild_dir)  # resaves popular weather presets while server is idle
 
         self.dserver_write_index = 0  # dserver.exe alternates between filenames ending in 0 or 1 (e.g., scg_training0 and scg_training1); this var keeps track of that
+        self.prestage_thread = None  # thread staging the slot dserver will use next (see prestage_dserver_slot)
+        self.prestage_cancel = threading.Event()  # set to cancel a delayed pre-stage
+        self.standby_slot = None  # slot a hot-standby dserver runs (None if there is no standby; see dserver_standby.py)
 
         self.time_warnings = [5, 4, 3, 2, 1]  # minute marks before end of mission used to warn players that mission is ending
 
-    class AvailableMissions:
-        """ simple class containing string data associated with the available missions """
-        def __init__(self, filename_, description_, sort_key_):
-            self.filename = filename_  # string representing base file name without any extensions
-            self.description = description_  # string representing the description of the mission
-            self.sort_key = sort_key_  # string to dictate sort order of the entire list of Missions
-
     def get_sortkey_description(self, filename):
         """ Assign and return the first line of a file to the sort key
             and the second+ lines to the description """
@@ -81,9 +104,7 @@ class Mission:
 
     def is_current_mission_arcade(self):
         """ Returns whether the current mission is an arcade game """
-        with open(self.description_filename, 'r') as f:
-            file_str = f.read()
-        if 'Arcade Game:' in file_str:
+        if self.current_mission.arcade:
             print("Mission is arcade game.")
             return True
         else:
@@ -93,9 +114,35 @@ class Mission:
         """ Check to see if current mission is an arcade and defines arcade class object if so """
         self.arcade_game = self.is_current_mission_arcade()  # reads from .txt mission file
         if self.arcade_game:
-            self.arcade = ArcadeMission(self.mission_filename, self.briefing_filename)
+            self.arcade = ArcadeMission(self.mission_filename, self.briefing_filename, cache=self.cache,
+                                        journal=self.journal)
+            self.journal.start(os.path.basename(self.current_mission.filename),
+                               (self.dserver_write_index + 1) % 2)  # slot last staged; a pending reset journals its own
         else:
             self.arcade = None
+            self.journal.clear()
+
+    def recover_arcade(self, mission_name, dserver_slot, dserver_pid, journal_entries):
+        """
+            Restores mission variables and arcade game in progress from an arcade journal after a daemon restart.
+            Assumes DServer.exe (process dserver_pid) is still running the journaled mission (i.e., mission files are
+            still in place) from dserver_slot.  Returns False if the mission is no longer available.
+        """
+        mission_index = self.catalog.find(os.path.join(self.catalog.mission_dir, mission_name))
+        if mission_index is None:
+            print(f"Unable to recover arcade game: mission '{mission_name}' is no longer available.")
+            return False
+        print(f"Recovering arcade game in progress on mission #{mission_index} ({mission_name})....")
+        self.mission_index = mission_index
+        self.current_mission = self.available_missions[mission_index]
+        self.description_filename = self.current_mission.filename + self.description_ext
+        self.dserver_write_index = (dserver_slot + 1) % 2  # next reset stages the slot DServer is not running
+        self.journal.dserver_pid = dserver_pid
+        self.update_mission_vars()  # starts a new arcade object and journal
+        if self.arcade_game:
+            replay_arcade_journal(self.arcade, journal_entries)
+            self.journal.append(journal_entries)  # journal was restarted above so write entries back
+        return True
 
     def get_current_mission_index(self):
         """ Function to get the current working mission index on program startup """
@@ -107,27 +154,40 @@ class Mission:
         return i
 
     def get_available_missions(self):
-        """ Return a list of the available missions (list of AvilableMission objects) tored in the available
+        """ Return a list of the available missions (list of AvailableMission objects) stored in the available
             missions directory """
-        av_mis = []  # av_mis = available missions
-        mission_filenames = glob.glob(self.available_mission_dir + r"\*"
-                                      + self.mission_file_ext)  # find all mission files using mission extension
-        for filename_ in mission_filenames:
-            file_base_name = filename_.replace(self.mission_file_ext, "")
-            sort_key, description = self.get_sortkey_description(file_base_name + self.description_ext)
-            av_mis.append(self.AvailableMissions(file_base_name, description, sort_key))
-        av_mis.sort(key=lambda x: x.sort_key)  # sort missions based on each mission's sort_key
-        return av_mis
+        self.catalog.refresh()
+        return self.catalog.missions
+
+    def refresh_available_missions(self):
+        """ Picks up missions added to, removed from or changed in the available missions directory """
+        if not self.catalog.refresh():
+            return
+        selected = self.available_missions[self.mission_index].filename if self.mission_index is not None else None
+        self.available_missions = self.catalog.missions
+        self.num_missions = len(self.available_missions)
+        if selected is not None:
+            # None if the mission was removed: a running mission keeps running (see current_mission)
+            self.mission_index = self.catalog.find(selected)
+            if self.mission_index is None and self.load_new_mission_flag:
+                self.load_new_mission_flag = False
+                print(f"Mission load cancelled: '{os.path.basename(selected)}' was removed.")
+        print(f"Mission catalog updated: {self.num_missions} missions available.")
 
     def list_missions(self, unused_arg):
         """ Sends to remote console (rc) a listing of the missions available for selection """
+        self.refresh_available_missions()
         self.console_msg = "The following missions are available:\n"
         for i, mis in enumerate(self.available_missions):
             self.console_msg += f"{i:3}: {mis.description}\n"
-        self.console_msg += f"(Note: Current mission is #{self.mission_index}.)"
+        if self.mission_index is not None:
+            self.console_msg += f"(Note: Current mission is #{self.mission_index}.)"
+        elif self.current_mission is not None:
+            self.console_msg += f"(Note: Current mission is no longer available: {self.current_mission.description})"
 
     def user_load_mission(self, mission_index_str):
         """ Changes the scenario to the one selected by user.  """
+        self.refresh_available_missions()
         try:
             index_ = int(mission_index_str)
         except ValueError:
@@ -142,8 +202,17 @@ class Mission:
             self.console_msg = f"Next mission will be scenario #{index_}: {self.available_missions[index_].description}"
             self.mission_index = index_
             self.load_new_mission_flag = True
+            self.prestage_dserver_slot(self.available_missions[index_].filename)  # stage while load is pending
             return
 
+    def score_status(self, unused_arg):
+        """ Sends to remote console the state of background high score saving and uploading """
+        self.console_msg = self.score_worker.status()
+
+    def dserver_status(self, unused_arg):
+        """ Sends to remote console the running DServer's resource use (see process_monitor.py) """
+        self.console_msg = self.dserver_monitor.status() if self.dserver_monitor else "DServer monitor: not running."
+
     def reset_cmd(self, unused_str):
         """ User initiated reset command """
         self.user_initiated_reset = True
@@ -158,6 +227,7 @@ class Mission:
 
     def init_new_mission(self, index):
         """ Initiates a new mission in preparation for new DServer startup """
+        self.cancel_resaver()
         self.mission_index = index  # mission to be loaded from available missions
         self.dserver_write_index = 0
         self.load_new_mission()
@@ -178,67 +248,176 @@ class Mission:
             mission .lst file
         """
 
-        # Copy and rename mission files
+        # Stage and rename mission files (unchanged files are skipped; others are hard linked where possible)
+        if self.mission_index is not None:  # otherwise the current mission's files are restaged (e.g., after a resaver failure)
+            self.current_mission = self.available_missions[self.mission_index]
         print(f"Loading mission #{self.mission_index}....")
-        mission_files = glob.glob(self.available_missions[self.mission_index].filename + ".*")  # e.g., kuban_main.Mission, kuban_main.eng, etc. and this includes full absolute path
-        basename = os.path.basename(self.available_missions[self.mission_index].filename)  # e.g., ...\available_mission\kuban_main.Mission -> kuban_main
+        mission_files = glob.glob(self.current_mission.filename + ".*")  # e.g., kuban_main.Mission, kuban_main.eng, etc. and this includes full absolute path
+        basename = os.path.basename(self.current_mission.filename)  # e.g., ...\available_mission\kuban_main.Mission -> kuban_main
+        list_source = None
+        num_staged = 0
         for filename in mission_files:
             original_basename = os.path.basename(filename)  # get only the filename without directory path to it
-            if self.description_ext not in filename:  # don't copy a file ending in ".txt" since it is not part of an official il-2 mission file set
-                shutil.copyfile(filename, self.main_mission_dir + original_basename.replace(basename, self.mission_basename))  # e.g., kuban_main.Mission -> scg_training.Mission
-            else:
+            if self.description_ext in filename:  # don't copy a file ending in ".txt" since it is not part of an official il-2 mission file set
                 self.description_filename = filename
+            elif filename.endswith(self.list_ext):  # list file is rewritten below
+                list_source = filename
+            else:
+                num_staged += stage_file(filename, self.main_mission_dir + original_basename.replace(basename, self.mission_basename))  # e.g., kuban_main.Mission -> scg_training.Mission
+        print(f"Staged {num_staged} of {len(mission_files)} mission files (others unchanged).")
 
-        # modify mission's list file to contain correct mission basename and rewrite it
+        # modify mission's list file to contain correct mission basename and rewrite it if changed
         list_file = self.main_mission_dir + self.mission_basename + self.list_ext
-        with open(list_file, 'r') as file_object_:
+        with open(list_source if list_source else list_file, 'r') as file_object_:
             file_str = file_object_.read()
         file_str = file_str.replace(basename.lower(), self.mission_basename)
-        with open(list_file, 'w') as file:
-            file.write(file_str)
+        write_if_changed(list_file, file_str)
 
         # Update new missions variables
         self.update_mission_vars()
 
     def resaver(self, rc):
-        """ calls MissionResaver.exe (in il2 bin/resaver directory) and does necessary mission file handling
-            rc var is needed for extensive remote console messaging """
+        """ starts MissionResaver.exe (in il2 bin/resaver directory) in the background and does necessary mission file
+            handling; returns True if the mission files are ready now (restored from cache), otherwise check_resaver()
+            finishes the job.  rc var is needed for extensive remote console messaging """
 
         # copy .eng over all other foreign language briefing files  -- my missions only support english language
         for file_ext in self.language_exts:
-            shutil.copy(self.briefing_filename, self.main_mission_dir + self.mission_basename + file_ext)
+            stage_file(self.briefing_filename, self.main_mission_dir + self.mission_basename + file_ext, link=False)
 
-        # change current system directory where missionresaver.exe is held because that program fails to work otherwise
-        os.chdir(self.il2_resaver_dir)
-        mission_text_filename = self.main_mission_dir + self.mission_basename + self.mission_file_ext
-        print(f"mission text file name = {mission_text_filename}; current working dir = {os.getcwd()}")
+        self.prebuilder.record(os.path.basename(self.current_mission.filename),
+                               self.env.changed_settings)
+
+        # same mission and briefing text was resaved before so restore its outputs instead
+        self.resaver_key = mission_key(self.mission_basename, self.env.mission_data, self.env.briefing_data)
+        if self.resaver_cache.restore(self.resaver_key, self.main_mission_dir, self.mission_basename):
+            print(f"System: Restored resaved mission files from cache ({self.resaver_key}).")
+            rc.send_msg(f"Restored mission binary file from cache.  Mission resetting...")
+            return True
 
-        # and run MissionResaver.exe (aka "rs") and capture its output
-        print('resaver command:' "MissionResaver.exe", "-t", "-d", self.base_dir + "data",  "-f", mission_text_filename)
-        rs_process = subprocess.Popen(["MissionResaver.exe", "-t", "-d", self.base_dir + "data",  "-f",
-                                       mission_text_filename], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                      universal_newlines=True)
+        # run MissionResaver.exe (aka "rs") from its own directory because that program fails to work otherwise
+        mission_text_filename = self.main_mission_dir + self.mission_basename + self.mission_file_ext
+        for ext in (self.mission_file_ext,) + self.resaver_cache.exts:  # resaver may write its files in place
+            unshare_file(self.main_mission_dir + self.mission_basename + ext)
+        command = resaver_command(self.il2_resaver_dir, self.base_dir, mission_text_filename)
+        print('resaver command:', *command)
+        self.resaver_job = ResaverJob(command, self.il2_resaver_dir)
+        self.resaver_msg_time = 0
         rc.send_msg(f"Creating new mission binary file.  This may take a while...")
-        i = 0
-        while rs_process.poll() is None:
-            time.sleep(5)
-            i += 5
-            if not (i % 20):  # print every 10 seconds
-                # print(f"System ({i} secs):...processing mission files")
-                rc.send_msg(f"System ({i} secs):...processing mission files")
-
-        output, errors = rs_process.communicate()
-        print('out = ', output, ' errors = ', errors)
-        # check for correct completion of resaver
-        if "Saving localisation data DONE" in output and "Saving binary data DONE" in output \
-           and "Saving .list DONE" in output:
-            print("System: Processing complete.  Mission resetting...")
+        return False
+
+    def check_resaver(self, rc):
+        """ Reports progress of the background resaver job; returns None while it is running, otherwise whether it
+            succeeded (the mission files are then ready to be copied to dserver's files) """
+        job = self.resaver_job
+        for stage in job.new_stages():
+            rc.send_msg(f"System ({job.elapsed():.0f} secs): {stage}")
+        if not job.done():
+            if job.elapsed() - self.resaver_msg_time >= 20:  # print every 20 seconds
+                self.resaver_msg_time = job.elapsed()
+                rc.send_msg(f"System ({job.elapsed():.0f} secs):...processing mission files")
+            return None
+
+        self.resaver_job = None
+        print('out = ', job.text())
+        if job.succeeded():
+            print(f"System: Processing complete in {job.elapsed():.0f} secs.  Mission resetting...")
             rc.send_msg(f"Processing complete.  Mission resetting...")
-        else:
-            rc.send_msg(f"rc, System Error: MissionResaver.exe failed processing....stopping server."
-                        f" Please report error to SCG_Limbo.")
-            print("System error executing MissionResaver.exe:", output, errors)
-            exit(-1)
+            try:
+                self.resaver_cache.store(self.resaver_key, self.main_mission_dir, self.mission_basename)
+            except OSError as e:
+                print(f"Resaver cache error: unable to store resaved mission files: {e}")
+            return True
+        rc.send_msg(f"System Error: MissionResaver.exe failed processing....environmental changes cancelled."
+                    f" Please report error to SCG_Limbo.")
+        print("System error executing MissionResaver.exe:", job.text())
+        self.load_new_mission()  # restore files of the current mission the resaver may have partially written
+        return False
+
+    def cancel_resaver(self):
+        """ Stops a running background resaver job (e.g., when the mission is replaced) """
+        if self.resaver_job is not None:
+            self.resaver_job.cancel()
+            self.resaver_job = None
+
+    def dserver_slot_files(self, slot, source_base=None):
+        """
+            Returns ([(source file, slot file), ...], slot list file, slot list text) of dserver slot (0 or 1) for the
+            current mission in the main mission directory, or for an available mission's base file name (source_base)
+            when pre-staging a mission not yet loaded.  For example, scg_training.eng -> scg_training1.eng
+        """
+        slot_base = self.main_mission_dir + self.mission_basename + str(slot)
+        if source_base is None:
+            source_base = self.main_mission_dir + self.mission_basename
+            list_names = [(self.mission_basename + '.', self.mission_basename + str(slot) + '.')]
+        else:  # available mission's list file names its own files (e.g., kuban_main.msnbin)
+            basename = os.path.basename(source_base)
+            list_names = [(basename.lower(), self.mission_basename),
+                          (self.mission_basename + '.', self.mission_basename + str(slot) + '.')]
+
+        filenames = glob.glob(glob.escape(source_base) + '.*')
+        filenames = [i for i in filenames if not (i.endswith(self.mission_file_ext) or i.endswith(self.list_ext)
+                                                  or i.endswith(self.description_ext) or '.tmp' in i)]  # .Mission and .txt files are not used by dserver
+        pairs = [(source, slot_base + source[len(source_base):]) for source in filenames]
+
+        """ modify filenames in list file to correspond with mission being used by dserver """
+        with open(source_base + self.list_ext, 'r') as file_object_:
+            file_str = file_object_.read()
+        for old, new in list_names:
+            file_str = file_str.replace(old, new)
+        return pairs, slot_base + self.list_ext, file_str
+
+    def stage_dserver_slot(self, slot, source_base=None):
+        """ Stages mission files into dserver slot (see dserver_slot_files); unchanged files are skipped.
+            Slot files are copies, never hard links, so nothing written to another name of a mission file reaches
+            the slots.  Returns number of files staged. """
+        pairs, list_file, list_str = self.dserver_slot_files(slot, source_base)
+        num_staged = sum(stage_file(source, destination, link=False) for source, destination in pairs)
+        return num_staged + write_if_changed(list_file, list_str)
+
+    def slot_matches(self, slot):
+        """ Returns whether dserver slot already holds the current mission files """
+        pairs, list_file, list_str = self.dserver_slot_files(slot)
+        if not all(same_content(source, destination) for source, destination in pairs):
+            return False
+        try:
+            with open(list_file, 'r') as file_object_:
+                return file_object_.read() == list_str
+        except FileNotFoundError:
+            return False
+
+    def prestage_dserver_slot(self, source_base=None, delay=0):
+        """
+            Stages the slot dserver will use next in a background thread (after delay seconds) so the next reset
+            finds its files already in place.  Errors are only reported; the reset stages the slot again anyway.
+            A slot a hot-standby dserver runs is left alone (the switch over resets to the other slot if needed).
+        """
+        self.wait_for_prestage()
+        self.prestage_cancel.clear()
+        slot = self.dserver_write_index
+        if slot == self.standby_slot:
+            print(f"\nNot pre-staging #{slot} slot: the standby DServer is running it.")
+            return
+
+        def prestage():
+            if self.prestage_cancel.wait(delay):
+                return
+            try:
+                start = time.time()
+                num_staged = self.stage_dserver_slot(slot, source_base)
+                print(f"\nPre-staged {num_staged} mission files to #{slot} slot in {time.time() - start:.1f} secs.")
+            except OSError as e:  # e.g., dserver still has the slot's files open
+                print(f"\nPre-staging #{slot} slot failed: {e}")
+
+        self.prestage_thread = threading.Thread(target=prestage, name="slot-prestage", daemon=True)
+        self.prestage_thread.start()
+
+    def wait_for_prestage(self):
+        """ Waits for a running pre-stage (a delayed one that has not started is cancelled) """
+        if self.prestage_thread is not None:
+            self.prestage_cancel.set()
+            self.prestage_thread.join()
+            self.prestage_thread = None
 
     def copy_mission_to_dserver_files(self):
         """
@@ -246,43 +425,37 @@ class Mission:
             two sets of mission files to prevent read/write permission errors caused by (very rare)
             copying/writing to just one set of files.
             For example, scg_training.eng -> scg_training1.eng
+            Files pre-staged by prestage_dserver_slot() are unchanged so are skipped here.
 
             Function also updates the mission .lst file to contain the correct file names.
         """
-
-        # init vars
-        basename = self.mission_basename  # shorthand var to make code more readable below
         mission_num = str(self.dserver_write_index)
         print(f"copying mission to #{mission_num} slot")
-
-        # change to mission directory to avoid working with full file path names
-        os.chdir(self.main_mission_dir)
-
-        """ copy all necessary mission files located in mission directory """
-        filenames = glob.glob(basename + '.*')
-        filenames = [i for i in filenames if not ('.Mission' in i)]  # remove .Mission file from list so it is not copied
-        for source in filenames:
-            destination = source[:len(basename)] + mission_num + source[len(basename):]
-            shutil.copy(source, destination)
-        # print('$$$$$$$ copying mission files to ', basename + mission_num)
-
-        """ modify filenames in list file to correspond with mission being used by dserver  """
-        list_file = basename + mission_num + ".list"
-        with open(list_file, 'r') as file_object_:
-            file_str = file_object_.read()
-        file_str = file_str.replace(basename + '.', basename + mission_num + '.')
-        with open(list_file, 'w') as file:
-            file.write(file_str)
+        self.wait_for_prestage()
+        num_staged = self.stage_dserver_slot(self.dserver_write_index)
+        print(f"Staged {num_staged} mission files to #{mission_num} slot (others unchanged).")
 
         self.dserver_write_index = (1 + self.dserver_write_index) % 2  # cycle between 0 and 1 for next dserver mission copy
+        if self.arcade_game:
+            self.journal.append([f"{SLOT_TAG} {mission_num}"])  # slot DServer runs from the next reset/start on
 
     def reset_mission(self, rc):
-        """ Copy mission files to next file set that dserver will use"""
-        self.copy_mission_to_dserver_files()
+        """ Copy mission files to next file set that dserver will use; returns False if they could not be staged
+            (the reset is not sent then) """
+        try:
+            self.copy_mission_to_dserver_files()
+        except OSError as e:  # e.g., a slot file is still open
+            print(f"Staging mission files failed: {e}")
+            rc.send_msg("System error: unable to stage the mission files; mission was not reset.  Please try again.")
+            return False
 
         """ tell dserver to issue a serverinput command to reset in mission """
         rc.send("serverinput reset")
 
+        """ prepare the other slot for the next reset once dserver has let go of its files """
+        self.prestage_dserver_slot(delay=PRESTAGE_DELAY)
+        return True
+
     def check_reset_to_base_mission(self, rc, reset_time_amount, tick_delay):
         """ Checks whether there is too much inactivity on server.
             Sends warning messages to console if too much inactivity detected.
@@ -0,0 +1,76 @@
+"""
+    Persistent cache of data parsed from IL-2 mission files (arcade target vehicle specs and mission objectives) so
+    that mission resets and arcade game starts do not re-read and re-parse the same files.  Whether a mission is an
+    arcade game is kept by the mission catalog (see mission_catalog.py), not here.
+
+    Cache entries are keyed by the content hash of the files they were parsed from.  A file's hash is in turn
+    remembered by the file's size and modification time so an unchanged file is not even re-read for hashing.
+"""
+
+import hashlib
+import os
+import pickle
+
+
+class MissionCache:
+    """ Pickle backed cache of parsed mission data keyed by the content hash of the source files """
+    def __init__(self, filename, max_entries=100):
+        self.filename = filename  # pickle file the cache is stored in
+        self.max_entries = max_entries  # oldest entries are discarded past this count
+        self.digests = {}  # {file path: ((size, mtime), content hash)}
+        self.entries = {}  # {(kind, content hash, ...): parsed data}
+        self.updated = False  # whether cache needs to be written back to file
+        self.load()
+
+    def load(self):
+        """ Read cache from its pickle file; start with an empty cache if file is missing or unreadable """
+        try:
+            with open(self.filename, 'rb') as f:
+                self.digests, self.entries = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError):
+            self.digests, self.entries = {}, {}
+        if any(key[0] == 'arcade' for key in self.entries):  # arcade flags cached by earlier versions
+            self.entries = {key: data for key, data in self.entries.items() if key[0] != 'arcade'}
+            self.updated = True
+
+    def save(self):
+        """ Write cache to its pickle file if anything changed since the last save """
+        if not self.updated:
+            return
+        try:
+            with open(self.filename, 'wb') as f:
+                pickle.dump((self.digests, self.entries), f)
+        except OSError as e:
+            print(f"Mission cache error: unable to write '{self.filename}': {e}")
+        self.updated = False
+
+    def file_digest(self, filename):
+        """ Returns content hash of filename; file is only re-read if its size or modification time changed """
+        stat = os.stat(filename)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self.digests.get(filename)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with open(filename, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        self.digests[filename] = (signature, digest)
+        self.updated = True
+        return digest
+
+    def lookup(self, kind, filenames, parse_function):
+        """
+            Returns data of type 'kind' ('vehicles' or 'objectives') parsed from filenames (list of strings).
+            parse_function(*filenames) is only called when the content of filenames has not been seen before.
+        """
+        key = (kind,) + tuple(self.file_digest(f) for f in filenames)
+        try:
+            data = self.entries[key]
+        except KeyError:
+            data = parse_function(*filenames)
+            self.entries[key] = data
+            while len(self.entries) > self.max_entries:  # dicts keep insertion order so first key is the oldest
+                del self.entries[next(iter(self.entries))]
+            self.updated = True
+        self.save()
+        return data
@@ -0,0 +1,101 @@
+"""
+    Catalog of the missions in the "available missions" directory: each mission's sort key, description and arcade
+    flag read from its description (.txt) file, whose first line is the sort key and remaining lines the description.
+
+    The catalog is persisted with the modification times it was read at, so the description files are only re-read
+    when they change.  refresh() re-lists the directory only when the directory itself changed (a mission was added,
+    removed or renamed) and re-reads only description files whose size or modification time changed, so new missions
+    show up without restarting the daemon at the cost of a few stat() calls.
+"""
+
+import glob
+import os
+import pickle
+
+
+class AvailableMission:
+    """ simple class containing string data associated with the available missions """
+    def __init__(self, filename, description, sort_key, arcade):
+        self.filename = filename  # string representing base file name without any extensions
+        self.description = description  # string representing the description of the mission
+        self.sort_key = sort_key  # string to dictate sort order of the entire list of Missions
+        self.arcade = arcade  # whether the mission is an arcade game ('Arcade Game:' in description file)
+
+
+def read_description(filename):
+    """ Returns AvailableMission read from description file filename (base file name + '.txt') """
+    with open(filename, 'r') as f:
+        file_str = f.read()
+    sort_key, sep, description = file_str.partition('\n')
+    return AvailableMission(os.path.splitext(filename)[0], description, sort_key, 'Arcade Game:' in file_str)
+
+
+class MissionCatalog:
+    """ Pickle backed index of available missions; call refresh() to pick up changes of the missions directory """
+    def __init__(self, mission_dir, filename, mission_ext=".Mission", description_ext=".txt"):
+        self.mission_dir = mission_dir
+        self.filename = filename  # pickle file the catalog is stored in
+        self.mission_ext = mission_ext
+        self.description_ext = description_ext
+        self.dir_mtime = None  # modification time of mission_dir when it was last listed
+        self.entries = {}  # {base file name: ((size, mtime) of description file, AvailableMission)}
+        self.missions = []  # AvailableMission list sorted by sort key
+        self.load()
+
+    def load(self):
+        """ Read catalog from its pickle file; start with an empty catalog if file is missing or unreadable """
+        try:
+            with open(self.filename, 'rb') as f:
+                self.dir_mtime, self.entries = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError, AttributeError):
+            self.dir_mtime, self.entries = None, {}
+
+    def save(self):
+        try:
+            with open(self.filename, 'wb') as f:
+                pickle.dump((self.dir_mtime, self.entries), f)
+        except OSError as e:
+            print(f"Mission catalog error: unable to write '{self.filename}': {e}")
+
+    def list_directory(self):
+        """ Returns base file names of all missions in mission_dir """
+        mission_filenames = glob.glob(os.path.join(self.mission_dir, '*' + self.mission_ext))
+        return [f[:-len(self.mission_ext)] for f in mission_filenames]
+
+    def revalidate(self, base_filename, old_entry):
+        """ Returns catalog entry of mission base_filename; its description file is only read if it changed """
+        description_filename = base_filename + self.description_ext
+        try:
+            stat = os.stat(description_filename)
+        except FileNotFoundError:
+            print(f"Mission catalog warning: '{description_filename}' not found.")
+            signature, mission = None, AvailableMission(base_filename, os.path.basename(base_filename), '', False)
+        else:
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if old_entry is not None and old_entry[0] == signature:
+                return old_entry
+            mission = read_description(description_filename)
+        return signature, mission
+
+    def refresh(self):
+        """ Brings catalog up to date with the missions directory; returns whether any mission changed """
+        dir_mtime = os.stat(self.mission_dir).st_mtime_ns
+        base_filenames = self.list_directory() if dir_mtime != self.dir_mtime or not self.missions \
+            else [m.filename for m in self.missions]
+
+        entries = {f: self.revalidate(f, self.entries.get(f)) for f in base_filenames}
+        changed = dir_mtime != self.dir_mtime or entries.keys() != self.entries.keys() \
+            or any(entries[f] is not self.entries[f] for f in entries)
+        if changed or not self.missions:
+            self.dir_mtime, self.entries = dir_mtime, entries
+            self.missions = sorted((mission for signature, mission in entries.values()), key=lambda m: m.sort_key)
+        if changed:
+            self.save()
+        return changed
+
+    def find(self, base_filename):
+        """ Returns index in missions of mission base_filename (None if it is no longer available) """
+        for i, m in enumerate(self.missions):
+            if m.filename == base_filename:
+                return i
+        return None
@@ -12,14 +12,14 @@ class MissionObjectives:
         return f"Mission Objective: name = {self.name}, index = {self.index}, coordinates = {self.coordinates}"
 
 
-def get_mission_objectives(mission_filename, briefing_filename):
+def parse_mission_objectives(mission_filename, briefing_filename):
     """
         Get mission objective MCU (mission control unit) names and their position
         Mission MCUs (Mission Control Unit, c.f., IL-2 scenario editor, can act as variables and signal this daemon when executed in mission
         Unfortunately, the mission objective's name is not stored in the  mission text file but the english briefing text file instead.
         To get this name, lookup the 'LCName = ' index value defined in the mission objective and use that to obtain
         the name in the briefing file as it would be showed in the IL-2 mission editor
-        Store the results in a mission objective objective {name: position} dictionary
+        Returns a list of (name, index, position string) tuples
     """
 
     with open(briefing_filename, 'r', encoding="UTF-16") as file:
@@ -43,7 +43,21 @@ def get_mission_objectives(mission_filename, briefing_filename):
         lcname = re.search(r'(?<=LCName = )\d+(?=;)', m).group()
         mobj_name_regex = r'(?<=\n' + lcname + r':)\w+(?=\n)'
         name = re.search(mobj_name_regex, briefing_str).group()
-        m_objs.append(MissionObjectives(name, index, pos_str))
+        m_objs.append((name, index, pos_str))
+
+    return m_objs
+
+
+def get_mission_objectives(mission_filename, briefing_filename, cache=None):
+    """
+        Returns mission objective objects and a {name: mission objective} lookup table.
+        If cache (MissionCache) is given, the mission and briefing files are only parsed if their content changed.
+    """
+    if cache is not None:
+        objectives = cache.lookup('objectives', [mission_filename, briefing_filename], parse_mission_objectives)
+    else:
+        objectives = parse_mission_objectives(mission_filename, briefing_filename)
+    m_objs = [MissionObjectives(name, index, pos_str) for name, index, pos_str in objectives]
 
     lookup = {}
     for m in m_objs:
@@ -0,0 +1,172 @@
+"""
+    Line based parser of IL-2 text mission (.Mission) files and of the mission briefing text.
+
+    A mission file is a tree of blocks:
+        Options
+        {
+          Time = 12:0:0;
+          WindLayers
+          {
+            0 :     0 :     0;
+          }
+        }
+    MissionFile splits the text into lines once and finds the top level blocks; the items (fields, blocks and other
+    lines) inside a block are only parsed when the block is first accessed, so the thousands of mission object blocks
+    are never parsed.  Fields and block bodies are edited in place and the text is only rebuilt by text(); unparsed and
+    unchanged lines are output as read so an unchanged file round trips byte for byte.
+
+    BriefingText finds the spans of the editable values of a briefing (e.g., 'Temperature (0m):</b> 15 C') once when
+    loaded; edits replace the values and the text is rebuilt once by text().
+"""
+
+import re
+
+FIELD_RE = re.compile(r'(\s*(\w+)\s*=\s*)(.*?)(;\s*)$', re.DOTALL)
+
+
+def split_lines(text):
+    """ Returns list of lines of text (each line keeps its '\n'); ''.join(split_lines(text)) == text """
+    lines = text.split('\n')
+    last = lines.pop()
+    lines = [line + '\n' for line in lines]
+    if last:
+        lines.append(last)
+    return lines
+
+
+def block_end(lines, open_index, end):
+    """ Returns index of the line after the '}' line closing the '{' line at open_index """
+    depth = 0
+    for i in range(open_index, end):
+        stripped = lines[i].strip()
+        if stripped == '{':
+            depth += 1
+        elif stripped == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    raise ValueError(f"Mission file block starting at line {open_index} is not closed")
+
+
+def parse_items(lines, start, end):
+    """ Returns list of items (MissionField, MissionBlock, or line string) of lines[start:end] """
+    items = []
+    i = start
+    while i < end:
+        line = lines[i]
+        if line.strip() == '{' and items and isinstance(items[-1], str):  # previous line is the block's name
+            items.pop()
+            close = block_end(lines, i, end)
+            items.append(MissionBlock(lines, i - 1, close))
+            i = close
+            continue
+        match = FIELD_RE.fullmatch(line)
+        if match:
+            items.append(MissionField(match.group(1), match.group(2), match.group(3), match.group(4)))
+        else:
+            items.append(line)
+        i += 1
+    return items
+
+
+class MissionField:
+    """ 'name = value;' line of a mission block """
+    __slots__ = ('prefix', 'name', 'value', 'suffix')
+
+    def __init__(self, prefix, name, value, suffix):
+        self.prefix = prefix  # indentation, name and ' = '
+        self.name = name
+        self.value = value  # value text (e.g., '12:0:0' or '"summer\\sky.ini"')
+        self.suffix = suffix  # ';' and line end
+
+    def text(self):
+        return self.prefix + self.value + self.suffix
+
+
+class MissionBlock:
+    """ Named block of a mission file spanning lines[start:end] (name line, '{' line, items, '}' line) """
+    header_lines, closing_lines = 2, 1
+
+    def __init__(self, lines, start, end):
+        self.lines = lines
+        self.start, self.end = start, end
+        self.name = lines[start].strip() if self.header_lines else None
+        self._items = None  # parsed on first access
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = parse_items(self.lines, self.start + self.header_lines, self.end - self.closing_lines)
+        return self._items
+
+    def index(self, name):
+        """ Returns index in items of the first field or block named name (None if there is none) """
+        for i, item in enumerate(self.items):
+            if not isinstance(item, str) and item.name == name:
+                return i
+        return None
+
+    def field(self, name):
+        """ Returns first MissionField named name (None if there is none) """
+        i = self.index(name)
+        return self.items[i] if i is not None and isinstance(self.items[i], MissionField) else None
+
+    def block(self, name):
+        """ Returns first MissionBlock named name (None if there is none) """
+        i = self.index(name)
+        return self.items[i] if i is not None and isinstance(self.items[i], MissionBlock) else None
+
+    def set_body(self, text):
+        """ Replaces all items of the block with the items of text """
+        new_lines = split_lines(text)
+        self._items = parse_items(new_lines, 0, len(new_lines))
+
+    def replace_items(self, first_name, stop_name, text):
+        """ Replaces items from field/block first_name up to (not including) stop_name with the items of text """
+        first, stop = self.index(first_name), self.index(stop_name)
+        if first is None or stop is None or stop < first:
+            raise ValueError(f"Mission block '{self.name}' has no '{first_name}' ... '{stop_name}' items")
+        new_lines = split_lines(text)
+        self.items[first:stop] = parse_items(new_lines, 0, len(new_lines))
+
+    def text(self):
+        if self._items is None:
+            return ''.join(self.lines[self.start:self.end])
+        parts = self.lines[self.start:self.start + self.header_lines]
+        for item in self._items:
+            parts.append(item if isinstance(item, str) else item.text())
+        parts += self.lines[self.end - self.closing_lines:self.end]
+        return ''.join(parts)
+
+
+class MissionFile(MissionBlock):
+    """ Whole mission file; its items are the top level lines and blocks (e.g., Options) """
+    header_lines, closing_lines = 0, 0
+
+    def __init__(self, text):
+        lines = split_lines(text)
+        super().__init__(lines, 0, len(lines))
+
+
+class BriefingText:
+    """ Briefing text with values located by patterns ({key: regular expression}) that can be replaced """
+    def __init__(self, text, patterns):
+        self.original = text
+        self.spans = {}  # {key: list of (start, end) of all matches in original text}
+        for key, pattern in patterns.items():
+            self.spans[key] = [m.span() for m in re.finditer(pattern, text)]
+        self.values = {}  # {key: replacement value}
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def text(self):
+        if not self.values:
+            return self.original
+        replacements = sorted((start, end, self.values[key]) for key in self.values for start, end in self.spans[key])
+        parts, pos = [], 0
+        for start, end, value in replacements:
+            parts += [self.original[pos:start], value]
+            pos = end
+        parts.append(self.original[pos:])
+        return ''.join(parts)
@@ -1,9 +1,11 @@
 """"Environmental weather classes associated with IL-2 Mission files  """
 
-import re
 from collections import namedtuple
 import glob
 
+from mission_parser import MissionFile, BriefingText
+from file_staging import write_file
+
 
 class WindLayer:
     """Class to hold and process IL-2 mission file wind layer data associated with altitude, speed, and direction"""
@@ -77,33 +79,65 @@ class MissionEnvironment:
         self.get_cloud_data(cloud_filenames)
 
         #  IL-2 Mission and briefing files data
-        self.mission_data = None  # contents of IL-2 Mission File
-        self.briefing_data = None  # contents of the IL-2 Briefing file
+        self.mission = None  # parsed IL-2 Mission File (MissionFile)
+        self.options = None  # Options block of mission (MissionBlock) holding the environment fields
+        self.briefing = None  # IL-2 Briefing file (BriefingText)
+
+        # regular expressions of the environment values in the briefing file
+        self.briefing_patterns = {
+            'temperature': r"(?<=Temperature \(0m\):</b> )-*\d+(?= C)",
+            'time': r"(?<=Start [tT]ime:</b> )\d\d(?=\d\d hours)",
+            'turbulence': r"(?<=Turbulence:</b> )\d+[.]*[\d+]*(?= m/s)",
+            'pressure': r"(?<=Pressure \(0m\):</b> )-*\d+(?= mmHg)",
+            'haze': r"(?<=Haze:</b> )\d+(?=%)",
+            'clouds': r"(?<=Clouds:</b> )(.*?)(?=<br)",
+        }
+        for w in self.windalts:
+            self.briefing_patterns[f"wind{w}"] = r"(?<= " + str(w) + r"m</b>)\s+\d+ m/s @ \d+(?=°)"
 
         self.mission_environment_updated = False  # indicates whether mission file was updated
+        self.changed_settings = {}  # {setting name (e.g., 'clouds'): value} changed since mission file was opened
         self.console_msg = None  # message to send to the il-2 after processing command (string)
         # end init of class var
 
 
+    @property
+    def mission_data(self):
+        """ contents of IL-2 Mission File including any changes """
+        return self.mission.text()
+
+    @property
+    def briefing_data(self):
+        """ contents of the IL-2 Briefing file including any changes """
+        return self.briefing.text()
+
     def open_mission_file(self, filename):
-        """ Opens IL-2 text mission file and stores in mission_data """
+        """ Opens IL-2 text mission file and parses it; raises ValueError if it has no Options block """
         with open(filename, 'r', encoding="UTF-8") as file:
-            self.mission_data = file.read()
+            self.mission = MissionFile(file.read())
+        self.options = self.mission.block('Options')
+        if self.options is None:  # the environment settings are all fields of the Options block
+            raise ValueError(f"Mission file '{filename}' has no Options block.")
+        self.changed_settings = {}
 
     def write_mission_file(self, filename):
-        """ writes mission data to filename """
-        with open(filename, 'w', encoding="UTF-8") as file:
-            file.write(self.mission_data)
+        """ writes mission data to filename (replacing the file so its hard links are not changed) """
+        write_file(filename, self.mission.text(), encoding="UTF-8")
 
     def open_briefing_file(self, filename):
-        """ Opens IL-2 text briefing file and stores in briefing_data """
+        """ Opens IL-2 text briefing file and locates its environment values """
         with open(filename, 'r', encoding="utf16") as file:
-            self.briefing_data = file.read()
+            self.briefing = BriefingText(file.read(), self.briefing_patterns)
 
     def write_briefing_file(self, filename):
-        """ writes briefing data to filename """
-        with open(filename, 'w', encoding="utf16") as file:
-            file.write(self.briefing_data)
+        """ writes briefing data to filename (replacing the file so its hard links are not changed) """
+        write_file(filename, self.briefing.text(), encoding="utf16")
+
+    def set_option(self, name, value):
+        """ Sets value (string) of field name of the mission's Options block """
+        field = self.options.field(name)
+        if field is not None:
+            field.value = value
 
     def update_temperature(self, temperature_str):
         """ Updates temperature in mission file string """
@@ -121,9 +155,9 @@ class MissionEnvironment:
             else:
                 # self.temperature = temperature
                 self.console_msg = f"Temperature will be set to {temperature} °C at sea level."
-                self.mission_data = re.sub(r"(?<=Temperature = )-*\d+(?=;)", str(temperature), self.mission_data)
-                self.briefing_data = re.sub(r"(?<=Temperature \(0m\):</b> )-*\d+(?= C)", str(temperature),
-                                            self.briefing_data)
+                self.set_option('Temperature', str(temperature))
+                self.briefing.set('temperature', str(temperature))
+                self.changed_settings['temperature'] = temperature
                 self.mission_environment_updated = True
                 return True
 
@@ -144,9 +178,11 @@ class MissionEnvironment:
             else:
                 # self.time = time
                 self.console_msg = f"Mission time will be set to {time}:00 hours."
-                self.mission_data = re.sub(r"(?<=Time = )\d+(?=:)", str(time), self.mission_data)
-                self.briefing_data = re.sub(r"(?<=Start [tT]ime:</b> )\d\d(?=\d\d hours)", f"{time:02}",
-                                            self.briefing_data)
+                field = self.options.field('Time')  # e.g., 'Time = 12:0:0;' -- only hours are changed
+                if field is not None and ':' in field.value:
+                    field.value = str(time) + field.value[field.value.index(':'):]
+                self.briefing.set('time', f"{time:02}")
+                self.changed_settings['time'] = time
                 self.mission_environment_updated = True
                 return True
 
@@ -166,8 +202,9 @@ class MissionEnvironment:
             else:
                 # self.turbulence = turbulence
                 self.console_msg = f"Mission turbulence will be set to {turbulence} m/s."
-                self.mission_data = re.sub(r"(?<=Turbulence = )\d+[.]*[\d+]*(?=;)", f"{turbulence:.1f}", self.mission_data)
-                self.briefing_data = re.sub(r"(?<=Turbulence:</b> )\d+[.]*[\d+]*(?= m/s)", f"{turbulence:.1f}", self.briefing_data)
+                self.set_option('Turbulence', f"{turbulence:.1f}")
+                self.briefing.set('turbulence', f"{turbulence:.1f}")
+                self.changed_settings['turbulence'] = turbulence
                 self.mission_environment_updated = True
                 return True
 
@@ -186,8 +223,9 @@ class MissionEnvironment:
         else:
             # self.pressure = pressure
             self.console_msg = f"Pressure will be set to {pressure} mmHg."
-            self.mission_data = re.sub(r"(?<=Pressure = )-*\d+(?=;)", str(pressure), self.mission_data)
-            self.briefing_data = re.sub(r"(?<=Pressure \(0m\):</b> )-*\d+(?= mmHg)", str(pressure), self.briefing_data)
+            self.set_option('Pressure', str(pressure))
+            self.briefing.set('pressure', str(pressure))
+            self.changed_settings['pressure'] = pressure
             self.mission_environment_updated = True
             return True
 
@@ -206,8 +244,9 @@ class MissionEnvironment:
                 self.haze = haze
                 self.console_msg = f"Haze will be set to a value of {haze}%."
                 haze_proportion = haze / 100.0
-                self.mission_data = re.sub(r"(?<=Haze = )\d+[.]*[\d+]*(?=;)", f"{haze_proportion:.2f}", self.mission_data)
-                self.briefing_data = re.sub(r"(?<=Haze:</b> )\d+(?=%)", str(haze), self.briefing_data)
+                self.set_option('Haze', f"{haze_proportion:.2f}")
+                self.briefing.set('haze', str(haze))
+                self.changed_settings['haze'] = haze
                 self.mission_environment_updated = True
                 return True
 
@@ -253,25 +292,24 @@ class MissionEnvironment:
             self.windlayers[j].update_speed(speed)  # okay to ignore return value because direction and speed are previously validated
             self.windlayers[j].update_direction(direction)
 
-        # create replacement string for wind layer data
-        wind_replacement_str = "WindLayers\n  {\n"
+        # replace body of the Options' WindLayers block with the new wind layer data
+        wind_replacement_str = ""
         for w in self.windlayers:
             wind_replacement_str += f"     {w.altitude} :     {w.rep_direction}  :     {w.speed};\n"
-        wind_replacement_str += "  }"
-        # replace wind layer data using a regular expression search (text starting with 'Windlayers {' and ending with '}')
-        self.mission_data = re.sub(r"WindLayers\s+{([^}]+)}", wind_replacement_str, self.mission_data)
+        windlayers_block = self.options.block('WindLayers')
+        if windlayers_block is not None:
+            windlayers_block.set_body(wind_replacement_str)
 
         # replace wind layer data in briefing file
-        for i in range(0, self.num_windalts):
-            wind_replacement_str = f"  {self.windlayers[i].speed} m/s @ {self.windlayers[i].true_direction}"
-            regexp = r"(?<= " + str(self.windalts[i]) + r"m</b>)\s+\d+ m/s @ \d+(?=°)"
-            self.briefing_data = re.sub(regexp, wind_replacement_str, self.briefing_data)
+        for w in self.windlayers:
+            self.briefing.set(f"wind{w.altitude}", f"  {w.speed} m/s @ {w.true_direction}")
 
         # Create validated console message
         self.console_msg = "Winds will be set to:\n"
         for w in self.windlayers:
             self.console_msg = self.console_msg + f" {w.altitude:6}m: {w.speed:2}m/s @ {w.true_direction:3}°\n"
 
+        self.changed_settings['winds'] = tuple(inputed_winds)
         self.mission_environment_updated = True
         return True
 
@@ -307,12 +345,16 @@ class MissionEnvironment:
                                f" and {self.num_clouds - 1}"
             return False
         else:
+            # cloud data replaces the Options' fields from CloudLevel up to (not including) Turbulence
+            try:
+                self.options.replace_items('CloudLevel', 'Turbulence', self.clouds[index].data)
+            except ValueError:
+                self.console_msg = "Clouds cannot be set in this mission: its Options have no CloudLevel ..." \
+                                   " Turbulence settings."
+                return False
             self.console_msg = f"Clouds will be set to cloud configuration #{index}: {self.clouds[index].description}"
-            # cloud data contains backslashes which must be escaped with an additional backslash for the regular
-            #  expression substitute to work correctly below
-            tmp_str = self.clouds[index].data.replace("\\", "\\\\")
-            self.mission_data = re.sub(r"\s\sCloudLevel([\w\W]+)(?=\s\sTurb)", tmp_str, self.mission_data)
-            self.briefing_data = re.sub(r"(?<=Clouds:</b> )(.*?)(?=<br)", self.clouds[index].description, self.briefing_data)
+            self.briefing.set('clouds', self.clouds[index].description)
 
+            self.changed_settings['clouds'] = index
             self.mission_environment_updated = True
             return True
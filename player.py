@@ -1,9 +1,12 @@
 import time
 import re
 import pickle
+import threading
 
 """ player class and database functions """
 
+player_list_lock = threading.Lock()  # held while updating/writing the player list (shared by all server instances)
+
 
 class Player:
     """ Contains official player ID, and official alias (or profile) ID, a pilots current alias, and past aliasess """
@@ -11,13 +14,15 @@ class Player:
         self.name = player_name  # current pilot handle
         self.aliases = [player_name]  # previous handles associated with this pilot
         time.sleep(1)
-        rc.send("getplayerlist")  # determine if player is actually logged into DServe at this moment
-        if player_name not in rc.response_string:  # player is not actually logged in
-            print(f"server response in Player creation: {rc.response_string}")
+        with rc.lock:  # keep other threads' commands from replacing the response before it is read
+            rc.send("getplayerlist")  # determine if player is actually logged into DServe at this moment
+            response_string = rc.response_string
+        if player_name not in response_string:  # player is not actually logged in
+            print(f"server response in Player creation: {response_string}")
             raise ValueError(f"Player initialization: {player_name} not reported in 'getplayerlist' call.")
 
         regexp = r"(?<=" + player_name + r",)\w+-\w+-\w+-\w+-\w+,\w+-\w+-\w+-\w+-\w+"
-        match = re.search(regexp, rc.response_string)
+        match = re.search(regexp, response_string)
         match1 = match.group()
         ids = match1.split(',')
         if len(ids) != 2:
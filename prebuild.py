@@ -0,0 +1,159 @@
+"""
+    Idle time pre-building of popular weather presets.  Every resave of a mission whose only changes are clouds and/or
+    mission time is counted as a request of that preset (mission, clouds index, hour).  While no player has been
+    active for a while, the most requested presets which are not in the resaver cache are resaved in a small process
+    pool, each in its own build directory, and stored in the resaver cache.  A player later choosing the same preset
+    gets the mission restored from the cache instead of waiting on MissionResaver.exe.
+"""
+
+import os
+import pickle
+import shutil
+import subprocess
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import CLOUD_FILES_WILDCARD, PRESET_STATS_FILE, PREBUILD_DIR, PREBUILD_WORKERS, PREBUILD_PRESETS, \
+    PREBUILD_MIN_REQUESTS
+from missionenvironment import MissionEnvironment
+from resaver import ResaverCache, mission_key, resaver_command, resaver_succeeded
+
+PRESET_SETTINGS = ('clouds', 'time')  # environment settings a preset consists of
+
+
+def build_preset(key, mission_basename, mission_text, briefing_text, briefing_exts, build_dir, resaver_dir, base_dir,
+                 cache_dir, cache_exts):
+    """
+        Process pool task: resaves mission text in its own build directory and stores the outputs in the resaver
+        cache as entry key.  Returns (key, success, seconds, message).
+    """
+    start = time.time()
+    work_dir = os.path.join(build_dir, key)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    try:
+        os.makedirs(work_dir)
+        mission_filename = os.path.join(work_dir, mission_basename + '.Mission')
+        with open(mission_filename, 'w', encoding="UTF-8") as file:
+            file.write(mission_text)
+        for ext in briefing_exts:  # english briefing is copied to all languages
+            with open(os.path.join(work_dir, mission_basename + ext), 'w', encoding="utf16") as file:
+                file.write(briefing_text)
+        result = subprocess.run(resaver_command(resaver_dir, base_dir, mission_filename), cwd=resaver_dir,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        if not resaver_succeeded(result.stdout):
+            return key, False, time.time() - start, f"MissionResaver.exe failed: {result.stdout[-300:]} {result.stderr}"
+        ResaverCache(cache_exts, cache_dir).store(key, work_dir, mission_basename)
+        return key, True, time.time() - start, 'stored in resaver cache'
+    except OSError as e:
+        return key, False, time.time() - start, f"build error: {e}"
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class PresetPrebuilder:
+    """ Counts preset requests and pre-builds the most popular ones while the server is idle; owned by Mission """
+    def __init__(self, mission, stats_file=PRESET_STATS_FILE, build_dir=PREBUILD_DIR, workers=PREBUILD_WORKERS,
+                 num_presets=PREBUILD_PRESETS, min_requests=PREBUILD_MIN_REQUESTS):
+        self.mission = mission
+        self.stats_file = stats_file
+        self.build_dir = build_dir
+        self.workers = workers  # maximum number of resaver processes run at the same time
+        self.num_presets = num_presets
+        self.min_requests = min_requests
+        self.stats = self.load_stats()  # Counter of {(mission name, clouds index, hour): number of requests}
+        self.env = None  # MissionEnvironment used to create preset mission text (created when first needed)
+        self.executor = None  # ProcessPoolExecutor (created when first needed)
+        self.pending = {}  # {Future: preset} builds in progress
+        self.finished = set()  # presets found in the cache, built, or failed since the daemon started
+
+    def load_stats(self):
+        try:
+            with open(self.stats_file, 'rb') as f:
+                return Counter(pickle.load(f))
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError):
+            return Counter()
+
+    def save_stats(self):
+        try:
+            with open(self.stats_file, 'wb') as f:
+                pickle.dump(dict(self.stats), f)
+        except OSError as e:
+            print(f"Preset prebuilder error: unable to write '{self.stats_file}': {e}")
+
+    def record(self, mission_name, changed_settings):
+        """ Counts a resave of mission_name with changed_settings ({setting: value}) if it is a preset """
+        if not changed_settings or set(changed_settings) - set(PRESET_SETTINGS):
+            return
+        preset = (mission_name,) + tuple(changed_settings.get(s) for s in PRESET_SETTINGS)
+        self.stats[preset] += 1
+        self.save_stats()
+
+    def candidates(self):
+        """ Iterates most requested presets which have not been built (or found in the cache) yet """
+        building = set(self.pending.values())
+        for preset, count in self.stats.most_common(self.num_presets):
+            if count >= self.min_requests and preset not in self.finished and preset not in building:
+                yield preset
+
+    def preset_text(self, preset):
+        """ Returns (mission text, briefing text) of preset or None if its mission is no longer available (or has no
+            weather settings to change) """
+        mission_name, clouds, hour = preset
+        for m in self.mission.available_missions:
+            if os.path.basename(m.filename) == mission_name:
+                break
+        else:
+            return None
+        if self.env is None:
+            self.env = MissionEnvironment(CLOUD_FILES_WILDCARD)
+        try:
+            self.env.open_mission_file(m.filename + self.mission.mission_file_ext)
+        except ValueError as e:  # mission without an Options block has no weather to preset
+            print(f"\nNot pre-building {preset}: {e}")
+            return None
+        self.env.open_briefing_file(m.filename + self.mission.briefing_file_ext)
+        if clouds is not None and not self.env.update_clouds(str(clouds)):
+            return None
+        if hour is not None and not self.env.update_time(str(hour)):
+            return None
+        return self.env.mission_data, self.env.briefing_data
+
+    def collect(self):
+        """ Reports finished builds """
+        for future in [f for f in self.pending if f.done()]:
+            preset = self.pending.pop(future)
+            self.finished.add(preset)
+            try:
+                key, success, seconds, message = future.result()
+            except Exception as e:  # e.g., worker process died
+                success, seconds, message = False, 0, str(e)
+            print(f"\nPreset prebuilder: {preset} {'built' if success else 'failed'} in {seconds:.0f} s: {message}")
+
+    def poll(self, idle):
+        """ Called every main loop iteration; starts building popular presets while idle is True """
+        if self.workers <= 0:
+            return
+        self.collect()
+        if not idle:
+            return
+        m = self.mission
+        for preset in self.candidates():
+            if len(self.pending) >= self.workers:
+                break
+            texts = self.preset_text(preset)
+            if texts is None:
+                self.finished.add(preset)
+                continue
+            key = mission_key(m.mission_basename, *texts)
+            if m.resaver_cache.contains(key):
+                self.finished.add(preset)
+                continue
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            print(f"\nPreset prebuilder: building {preset} ({self.stats[preset]} requests)")
+            future = self.executor.submit(build_preset, key, m.mission_basename, *texts,
+                                          (m.briefing_file_ext,) + m.language_exts, self.build_dir,
+                                          m.il2_resaver_dir, m.base_dir, m.resaver_cache.cache_dir,
+                                          m.resaver_cache.exts)
+            self.pending[future] = preset
@@ -0,0 +1,202 @@
+"""
+    DServer.exe resource monitor.  Over sessions of days DServer.exe can slowly grow in memory or handles (or get
+    stuck burning CPU), which until now was only cured by the inactivity restart after RESET_TIME.  The monitor
+    samples the running DServer process's resident memory, CPU time and handle count every
+    DSERVER_MONITOR_INTERVAL seconds into a fixed size ring buffer, and once a threshold is crossed asks for a restart,
+    which the main loop does at the next moment the server is empty.
+
+    Memory and handle thresholds stay crossed once reached (leaks do not heal); the CPU threshold is an average over
+    DSERVER_CPU_WINDOW and only applies while it is exceeded.  Samples are read from /proc on Linux and with the
+    process API (kernel32) on Windows; elsewhere nothing is sampled and the monitor never asks for a restart.
+"""
+
+from array import array
+import os
+import sys
+import time
+
+from constants import DSERVER_MONITOR_INTERVAL, DSERVER_MONITOR_SAMPLES, DSERVER_MAX_RSS_MB, \
+    DSERVER_MAX_RSS_GROWTH_MB, DSERVER_MAX_HANDLES, DSERVER_MAX_CPU, DSERVER_CPU_WINDOW
+
+MB = 1024 * 1024
+
+
+def sample_proc(pid):
+    """ Returns (resident bytes, CPU seconds, open file descriptors) of process pid read from /proc """
+    with open(f"/proc/{pid}/stat") as file:
+        fields = file.read().rpartition(')')[2].split()  # fields after the command name (which may contain spaces)
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')  # utime + stime
+    with open(f"/proc/{pid}/statm") as file:
+        rss = int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    return rss, cpu_seconds, len(os.listdir(f"/proc/{pid}/fd"))
+
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        """ PROCESS_MEMORY_COUNTERS of GetProcessMemoryInfo() """
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _kernel32.OpenProcess.restype = wintypes.HANDLE
+    _kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    _kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    _kernel32.K32GetProcessMemoryInfo.argtypes = (wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters),
+                                                  wintypes.DWORD)
+    _kernel32.GetProcessTimes.argtypes = (wintypes.HANDLE,) + (ctypes.POINTER(ctypes.c_ulonglong),) * 4
+    _kernel32.GetProcessHandleCount.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    PROCESS_VM_READ = 0x0010
+
+    def sample_windows(pid):
+        """ Returns (working set bytes, CPU seconds, handle count) of process pid """
+        handle = _kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ, False, pid)
+        if not handle:
+            raise ctypes.WinError(ctypes.get_last_error())
+        try:
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            times = [ctypes.c_ulonglong() for _ in range(4)]  # creation, exit, kernel and user time (100 ns units)
+            handles = wintypes.DWORD()
+            if not (_kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+                    and _kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times])
+                    and _kernel32.GetProcessHandleCount(handle, ctypes.byref(handles))):
+                raise ctypes.WinError(ctypes.get_last_error())
+            return counters.WorkingSetSize, (times[2].value + times[3].value) / 1e7, handles.value
+        finally:
+            _kernel32.CloseHandle(handle)
+
+
+def sample_process(pid):
+    """ Returns (resident bytes, CPU seconds, handle count) of process pid; None if it cannot be sampled here """
+    try:
+        if sys.platform.startswith('linux'):
+            return sample_proc(pid)
+        if sys.platform == 'win32':
+            return sample_windows(pid)
+    except (OSError, ValueError, IndexError):  # process exited or is not accessible
+        pass
+    return None
+
+
+class SampleRing:
+    """ Fixed size ring buffer of samples stored in typed arrays (oldest samples are overwritten) """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.rss = array('q', bytes(8 * capacity))
+        self.cpu = array('d', bytes(8 * capacity))
+        self.handles = array('q', bytes(8 * capacity))
+        self.next = 0  # position the next sample is stored at
+        self.count = 0  # number of samples stored
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.next = self.count = 0
+
+    def append(self, t, rss, cpu, handles):
+        i = self.next
+        self.times[i], self.rss[i], self.cpu[i], self.handles[i] = t, rss, cpu, handles
+        self.next = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def get(self, age):
+        """ Returns (time, rss, cpu seconds, handles) of sample age (0: newest, len - 1: oldest) """
+        i = (self.next - 1 - age) % self.capacity
+        return self.times[i], self.rss[i], self.cpu[i], self.handles[i]
+
+    def cpu_percent(self, window):
+        """ Returns average CPU use (percent of one core) over the last window seconds; None if not yet sampled """
+        if self.count < 2:
+            return None
+        t, rss, cpu, handles = self.get(0)
+        for age in range(1, self.count):
+            t0, rss0, cpu0, handles0 = self.get(age)
+            if t - t0 >= window:
+                return 100 * (cpu - cpu0) / (t - t0)
+        return None
+
+
+class ProcessMonitor:
+    """ Samples the running DServer process and decides whether it needs a restart; call poll() from the main loop """
+    def __init__(self, interval=DSERVER_MONITOR_INTERVAL, capacity=DSERVER_MONITOR_SAMPLES,
+                 max_rss_mb=DSERVER_MAX_RSS_MB, max_rss_growth_mb=DSERVER_MAX_RSS_GROWTH_MB,
+                 max_handles=DSERVER_MAX_HANDLES, max_cpu=DSERVER_MAX_CPU, cpu_window=DSERVER_CPU_WINDOW,
+                 sampler=sample_process):
+        self.interval = interval  # seconds between samples (0 disables the monitor)
+        self.max_rss = max_rss_mb * MB  # thresholds (0 disables each)
+        self.max_rss_growth = max_rss_growth_mb * MB
+        self.max_handles = max_handles
+        self.max_cpu = max_cpu
+        self.cpu_window = cpu_window
+        self.sampler = sampler
+        self.samples = SampleRing(max(capacity, 2))
+        self.pid = None  # process being sampled
+        self.next_time = 0  # time of the next sample
+        self.min_rss = None  # lowest resident memory since the process started
+        self.leak_reason = None  # memory or handle threshold crossed (stays until the process is replaced)
+        self.cpu_reason = None  # CPU threshold exceeded in the latest sample
+
+    @property
+    def restart_reason(self):
+        """ Why DServer should be restarted at the next empty-server moment (None: no restart needed) """
+        return self.leak_reason or self.cpu_reason
+
+    def watch(self, pid):
+        """ Starts monitoring a new process (earlier samples are discarded) """
+        self.pid = pid
+        self.samples.clear()
+        self.next_time = 0
+        self.min_rss = self.leak_reason = self.cpu_reason = None
+
+    def poll(self, process, now=None):
+        """ Samples process (subprocess.Popen; None if unknown) if a sample is due and checks the thresholds """
+        if not self.interval or process is None:
+            return
+        if process.pid != self.pid:
+            self.watch(process.pid)
+        now = now if now is not None else time.time()
+        if now < self.next_time:
+            return
+        self.next_time = now + self.interval
+        sample = self.sampler(process.pid)
+        if sample is None:
+            return
+        rss, cpu_seconds, handles = sample
+        self.samples.append(now, rss, cpu_seconds, handles)
+        self.min_rss = rss if self.min_rss is None else min(self.min_rss, rss)
+
+        if self.leak_reason is None:
+            if self.max_rss and rss > self.max_rss:
+                self.leak_reason = f"memory use {rss / MB:.0f} MB exceeds {self.max_rss / MB:.0f} MB"
+            elif self.max_rss_growth and rss - self.min_rss > self.max_rss_growth:
+                self.leak_reason = f"memory use grew {(rss - self.min_rss) / MB:.0f} MB since start"
+            elif self.max_handles and handles > self.max_handles:
+                self.leak_reason = f"{handles} open handles exceed {self.max_handles}"
+            if self.leak_reason:
+                print(f"\nDServer monitor: {self.leak_reason}; restarting DServer when the server is empty.")
+
+        cpu = self.samples.cpu_percent(self.cpu_window)
+        self.cpu_reason = None
+        if self.max_cpu and cpu is not None and cpu > self.max_cpu:
+            self.cpu_reason = f"CPU use {cpu:.0f}% over the last {self.cpu_window // 60} minutes"
+
+    def status(self):
+        """ Returns summary string of the latest sample """
+        if not self.samples:
+            return "DServer monitor: no samples."
+        t, rss, cpu_seconds, handles = self.samples.get(0)
+        cpu = self.samples.cpu_percent(self.cpu_window)
+        status = f"DServer monitor: memory {rss / MB:.0f} MB (lowest {self.min_rss / MB:.0f} MB), {handles} handles, " \
+                 f"CPU {'-' if cpu is None else f'{cpu:.0f}%'}."
+        if self.restart_reason:
+            status += f"  Restart when the server is empty: {self.restart_reason}."
+        return status
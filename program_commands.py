@@ -44,6 +44,16 @@ def define_commands(mis):
                        "Resets the mission.",
                        f"Resets the current mission and also executes any pilot commands affecting the mission or server."
                        f" No arguments.\n"))
+    prog_cmds.append(
+        ProgramCommand(["score_status", "scores"], getattr(mis, "score_status"), "procedural",
+                       "Shows high score upload status",
+                       f"Shows whether the last arcade game results have been saved to the high scores database and"
+                       f" uploaded to the high scores webpage. No arguments.\n"))
+    prog_cmds.append(
+        ProgramCommand(["dserver_status", "ds"], getattr(mis, "dserver_status"), "procedural",
+                       "Shows server resource use",
+                       f"Shows the memory, handle and CPU use of the running DServer and whether it is due for a"
+                       f" restart once the server is empty. No arguments.\n"))
     prog_cmds.append(
         ProgramCommand(["command", "cmd", "c"], None, "server_command",
                        "Sends custom mission command.",
@@ -140,8 +150,8 @@ def is_cmd_in_program_commands(cmd_str, p_cmds):
 def process_user_commands(user_commands, r_con, mission, server_dict, prog_cmds,  help_str):
     """ Process pilot inputted commands queue """
     for command in user_commands:
-        # flush any remaining commands after reset initiated
-        if mission.load_new_mission_flag or mission.user_initiated_reset:
+        # flush any remaining commands after reset initiated (commands are still served while resaver.exe runs)
+        if (mission.load_new_mission_flag or mission.user_initiated_reset) and mission.resaver_job is None:
             print("reset ordered--breaking command processing")
             break
 
@@ -219,9 +229,24 @@ def process_user_commands(user_commands, r_con, mission, server_dict, prog_cmds,
     """
         Process three different types of mission resets (load_new mission, resaver.exe run, simple user initiated reset).
         Only send reset to mission running in Dserver if Dserver reboot is not required.
+        While resaver.exe runs in the background all resets wait for it; its mission reset is done once it completes.
     """
+    if mission.resaver_job is not None:  # 2 (continued)
+        success = mission.check_resaver(r_con)
+        if success is None:  # still running
+            return
+        if not success:
+            mission.user_initiated_reset = False  # reset cancelled; mission files were restored
+        elif not mission.restart_dserver:
+            mission.reset_mission(r_con)
+            mission.user_initiated_reset = False
+
     if mission.load_new_mission_flag:  # 1 -- note this will ignore/forget any environmental variables that were previously commanded
-        mission.load_new_mission()
+        try:
+            mission.load_new_mission()
+        except OSError as e:  # main mission files could not be staged (e.g., file in use); load flag stays set to retry
+            print(f"Loading mission failed: {e}.  Retrying....")
+            return
         if mission.arcade_game:  # check to see if dserver settings are set correctly for arcade game
             mission.restart_dserver = check_arcade_dserver_setting(server_dict)
         if not mission.restart_dserver:
@@ -235,8 +260,9 @@ def process_user_commands(user_commands, r_con, mission, server_dict, prog_cmds,
         mission.env.write_mission_file(mission.mission_filename)
         mission.env.write_briefing_file(mission.briefing_filename)
 
-        mission.resaver(r_con)
         mission.run_resaver = mission.env.mission_environment_updated = False
+        if not mission.resaver(r_con):  # resaver.exe started in background; reset mission when it completes
+            return
 
         if not mission.restart_dserver:
             mission.reset_mission(r_con)
@@ -245,6 +271,6 @@ def process_user_commands(user_commands, r_con, mission, server_dict, prog_cmds,
     elif mission.user_initiated_reset:  # 3
         if not mission.restart_dserver:
             r_con.send_msg("Resetting mission....")
-            mission.reset_mission(r_con)
-            mission.init_mission_arcade()
+            if mission.reset_mission(r_con):
+                mission.init_mission_arcade()
             mission.user_initiated_reset = False
@@ -3,6 +3,7 @@
 import socket
 import struct
 import re
+import threading
 import time
 from urllib.parse import unquote
 
@@ -34,6 +35,7 @@ class RemoteConsoleClient:
         self.response_string = ""
         self.comm_flag = None  # stores whether or not dserver communication was successful
         self.debug = debug  # used for debugging purpose...if true then remote console send messages are ignored
+        self.lock = threading.RLock()  # one command at a time on the connection; hold it to read response_string of a send()
 
         """ Il-2's remote console returned response dictionary """
         self.Dserver_response_dict = {
@@ -51,6 +53,10 @@ class RemoteConsoleClient:
 
     """ Connect to Dserver and provide login credentials.  """
     def connect(self):
+        with self.lock:
+            return self._connect()
+
+    def _connect(self):
         print("Trying to connect to DServer.exe...")
         try:
             self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -68,11 +74,15 @@ class RemoteConsoleClient:
 
     def send(self, msg, debug=False):
         """ Send message string to DServer string via TCP protocol.  Brute force send until it completes
-            --reestablishing connection if needed """
+            --reestablishing connection if needed.  Safe to call from several threads (see self.lock). """
 
         if debug:
             return
 
+        with self.lock:
+            self._send(msg)
+
+    def _send(self, msg):
         packet = pack_message(msg)
 
         completed = False  # whether or not message was transmitted correctly
@@ -128,6 +138,57 @@ class RemoteConsoleClient:
     def close(self):
         self.client.close()
 
+    def request(self, commands, timeout=2.0):
+        """
+            Sends commands (list of strings) once over a new, authorized connection without retrying or reconnecting.
+            Returns list of (return code, response string) of commands, or None if DServer did not answer.
+        """
+        try:
+            with socket.create_connection((self.host, self.port), timeout=timeout) as client:
+                results = []
+                for msg in [f"auth {self.login} {self.password}"] + list(commands):
+                    client.sendall(pack_message(msg))
+                    decoded_return_string = unpack_message(client.recv(4096))[1].decode()
+                    return_code = int(re.search(r'\d+', decoded_return_string).group())
+                    if return_code != 1 and not results:  # authorization failed
+                        return None
+                    results.append((return_code, unquote(unquote(decoded_return_string))))
+                return results[1:]
+        except (socket.error, ValueError, AttributeError, IndexError):
+            return None
+
+    def probe(self, timeout=2.0):
+        """ Returns whether DServer accepts connections, authorizes and answers commands """
+        results = self.request(["getplayerlist"], timeout)
+        return results is not None and results[0][0] == 1
+
+    def wait_until_ready(self, timeout, interval=1.0):
+        """ Probes DServer until it answers; returns seconds waited or None if it did not answer within timeout """
+        start = time.time()
+        while True:
+            if self.probe(min(interval * 2, timeout)):
+                return time.time() - start
+            if time.time() - start >= timeout:
+                return None
+            time.sleep(interval)
+
+    def player_count(self, timeout=2.0):
+        """ Returns number of players (with player and profile IDs) DServer reports; None if it did not answer """
+        results = self.request(["getplayerlist"], timeout)
+        if results is None or "playerList" not in results[0][1]:
+            return None
+        return len(re.findall(r"\w+-\w+-\w+-\w+-\w+,\w+-\w+-\w+-\w+-\w+", results[0][1]))
+
+    def wait_until_empty(self, timeout, interval=1.0):
+        """ Waits until DServer reports no players (or does not answer); returns seconds waited or None on timeout """
+        start = time.time()
+        while True:
+            if not self.player_count(min(interval * 2, timeout)):
+                return time.time() - start
+            if time.time() - start >= timeout:
+                return None
+            time.sleep(interval)
+
     def response_lookup(self, num):
         return self.Dserver_response_dict[num]
 
@@ -0,0 +1,161 @@
+"""
+    Cache of MissionResaver.exe outputs.  Running the resaver on a changed mission takes a long time, but players keep
+    choosing the same popular weather/cloud/time combinations.  The files the resaver creates (.msnbin, .list and the
+    localisation files) are stored in a directory named by the hash of the mission and briefing text they were made
+    from, so resaving the same text again only copies the stored files back.
+
+    Cache layout:  <cache dir>\\<hash>\\<mission basename>.<ext>
+    Entry files are hard linked to the mission files where possible (see file_staging.py).
+    Each entry directory's modification time is its last use; the least recently used entries are removed once there
+    are more than max_entries.  The cache directory can be shared by several daemons or server instances.
+"""
+
+import glob
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+from constants import RESAVER_CACHE_DIR, RESAVER_CACHE_ENTRIES
+from file_staging import stage_file
+
+RESAVER_EXE = 'MissionResaver.exe'
+RESAVER_DONE_STAGES = ("Saving localisation data DONE", "Saving binary data DONE", "Saving .list DONE")
+
+
+def resaver_command(resaver_dir, base_dir, mission_text_filename):
+    """ Returns MissionResaver.exe command line creating the binary mission of mission_text_filename """
+    return [os.path.join(resaver_dir, RESAVER_EXE), "-t", "-d", base_dir + "data", "-f", mission_text_filename]
+
+
+def resaver_succeeded(output):
+    """ Returns whether resaver output (stdout) reports all files as saved """
+    return all(stage in output for stage in RESAVER_DONE_STAGES)
+
+
+class ResaverJob:
+    """
+        MissionResaver.exe run in the background.  A reader thread streams its output line by line and reports each
+        completed stage (RESAVER_DONE_STAGES) as it appears, so the caller keeps running while the resaver works.
+    """
+    def __init__(self, command, cwd):
+        self.start_time = time.time()
+        self.output = []  # output lines read so far (stdout and stderr)
+        self.stages = queue.Queue()  # completed stages not yet taken by new_stages()
+        self.process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        universal_newlines=True)
+        self.reader = threading.Thread(target=self.read_output, name="resaver-output", daemon=True)
+        self.reader.start()
+
+    def read_output(self):
+        for line in self.process.stdout:
+            self.output.append(line)
+            for stage in RESAVER_DONE_STAGES:
+                if stage in line:
+                    self.stages.put(stage)
+        self.process.stdout.close()
+        self.process.wait()
+
+    def new_stages(self):
+        """ Returns list of stages completed since the last call """
+        stages = []
+        while True:
+            try:
+                stages.append(self.stages.get_nowait())
+            except queue.Empty:
+                return stages
+
+    def done(self):
+        """ Returns whether the resaver has exited and all of its output has been read """
+        return not self.reader.is_alive()
+
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def text(self):
+        return ''.join(self.output)
+
+    def succeeded(self):
+        return self.done() and resaver_succeeded(self.text())
+
+    def cancel(self):
+        """ Stops the resaver if it is still running """
+        if self.process.poll() is None:
+            self.process.kill()
+        self.reader.join(5)
+
+
+def mission_key(mission_basename, mission_text, briefing_text):
+    """ Returns content hash identifying the resaver output of the mission and briefing text """
+    digest = hashlib.sha1(mission_basename.encode())
+    digest.update(mission_text.encode("UTF-8"))
+    digest.update(briefing_text.encode("utf16"))
+    return digest.hexdigest()
+
+
+class ResaverCache:
+    """ Directory of resaver outputs keyed by mission_key() """
+    def __init__(self, exts, cache_dir=RESAVER_CACHE_DIR, max_entries=RESAVER_CACHE_ENTRIES):
+        self.exts = exts  # file extensions of resaver outputs (e.g., ('.msnbin', '.list', '.eng', ...))
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.abandoned_time = 60 * 60  # seconds after which a temporary entry directory is considered abandoned
+        self.hits = 0
+        self.misses = 0
+
+    def entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def contains(self, key):
+        return os.path.isdir(self.entry_dir(key))
+
+    def restore(self, key, mission_dir, mission_basename):
+        """ Copies cached resaver outputs of key to mission_dir; returns False if key is not cached """
+        entry = self.entry_dir(key)
+        try:
+            filenames = os.listdir(entry)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        for filename in filenames:
+            ext = os.path.splitext(filename)[1]
+            stage_file(os.path.join(entry, filename), os.path.join(mission_dir, mission_basename + ext))
+        os.utime(entry)  # mark entry as recently used
+        self.hits += 1
+        return True
+
+    def store(self, key, mission_dir, mission_basename):
+        """ Stores the resaver outputs in mission_dir as entry key """
+        if self.contains(key):
+            os.utime(self.entry_dir(key))
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = self.entry_dir(f"{key}.tmp{os.getpid()}.{threading.get_ident()}")  # fill a temporary directory and rename it when complete
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for ext in self.exts:
+            source = os.path.join(mission_dir, mission_basename + ext)
+            if os.path.exists(source):
+                stage_file(source, os.path.join(tmp_dir, mission_basename + ext))
+        try:
+            os.rename(tmp_dir, self.entry_dir(key))
+        except OSError:  # stored at the same time by someone else
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.prune()
+
+    def prune(self):
+        """ Removes least recently used entries (and abandoned temporary directories) beyond max_entries """
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, '*')):
+            if '.tmp' in os.path.basename(path):
+                # other processes (pre-build workers, other daemons) may be filling theirs; a store takes seconds
+                if time.time() - os.path.getmtime(path) > self.abandoned_time:
+                    shutil.rmtree(path, ignore_errors=True)
+                continue
+            entries.append((os.path.getmtime(path), path))
+        entries.sort()
+        for mtime, path in entries[:max(0, len(entries) - self.max_entries)]:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,71 @@
+"""
+    Timed mission rotation: every ROTATION_INTERVAL seconds the server loads the next mission of ROTATION_MISSIONS
+    (or of all available missions), as if a player had used the load mission command.  Players are warned before a
+    rotation and the next mission's files are pre-staged into dserver's next slot shortly before it, so the rotation
+    itself only needs a reset.  A rotation is postponed while an arcade game is being played, while resaver.exe runs,
+    or while another reset is pending.  Disabled unless ROTATION_ENABLED is set.
+"""
+
+import time
+
+from constants import ROTATION_ENABLED, ROTATION_INTERVAL, ROTATION_MISSIONS, ROTATION_PRESTAGE_TIME, \
+    ROTATION_WARNINGS
+
+
+class MissionRotation:
+    """ Rotation timer; call poll() every main loop iteration """
+    def __init__(self, enabled=ROTATION_ENABLED, interval=ROTATION_INTERVAL, missions=ROTATION_MISSIONS,
+                 prestage_time=ROTATION_PRESTAGE_TIME, warnings=ROTATION_WARNINGS, now=None):
+        self.enabled = enabled
+        self.interval = interval
+        self.missions = tuple(missions)  # mission indices rotated through (empty: all missions)
+        self.prestage_time = prestage_time
+        self.warnings = warnings
+        self.position = 0  # position in self.missions of the next mission
+        self.next_time = (now if now is not None else time.time()) + interval  # time of the next rotation
+        self.warned = set()  # warnings sent for the next rotation
+        self.prestaged = False  # whether the next mission was pre-staged
+
+    def next_index(self, mission):
+        """ Returns available missions index of the next mission """
+        if self.missions:
+            return self.missions[self.position % len(self.missions)] % mission.num_missions
+        if mission.mission_index is None:  # current mission was removed from the available missions
+            return 0
+        return (mission.mission_index + 1) % mission.num_missions
+
+    @staticmethod
+    def busy(mission):
+        """ Returns whether the rotation has to wait (arcade game played, resaver running or reset pending) """
+        arcade_played = mission.arcade is not None and mission.arcade.started and not mission.arcade.game_over
+        return arcade_played or mission.resaver_job is not None or mission.load_new_mission_flag \
+            or mission.user_initiated_reset
+
+    def poll(self, mission, rc, now=None):
+        """ Warns players, pre-stages and finally queues the load of the next mission as the rotation comes up """
+        if not self.enabled or mission.num_missions == 0:
+            return
+        now = now if now is not None else time.time()
+        remaining = self.next_time - now
+        index = self.next_index(mission)
+
+        for t in self.warnings:
+            if remaining <= 60 * t and t not in self.warned:
+                self.warned.add(t)
+                rc.send_msg(f"System: Mission rotates to scenario #{index} in {t} minute{'' if t == 1 else 's'}:"
+                            f" {mission.available_missions[index].description}")
+
+        if remaining <= self.prestage_time and not self.prestaged and not self.busy(mission):
+            self.prestaged = True
+            mission.prestage_dserver_slot(mission.available_missions[index].filename)
+
+        if remaining > 0 or self.busy(mission):
+            return
+        print(f"Rotating to mission #{index}.")
+        mission.user_load_mission(str(index))
+        rc.send_msg(f"System: Mission rotation. {mission.console_msg}")
+        self.position += 1
+        while self.next_time <= now:
+            self.next_time += self.interval
+        self.warned.clear()
+        self.prestaged = False
@@ -0,0 +1,123 @@
+"""
+    Background worker which stores finished arcade game results in the high scores database, rewrites the
+    high scores html page and JSON period leaderboards, and queues them for upload to Neocities so the daemon's main
+    loop never waits on disk or network.  Game results are handed over through a queue and each stage is retried
+    with increasing delays on failure.
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+
+from constants import SCORES_DB, HTML_FILE, SCORE_RETRY_DELAYS, LEADERBOARD_DIR
+from highscores import enter_score, html_write_scores
+from leaderboard_export import LeaderboardExporter
+from scores_page import ScoresPage
+from web_upload import UploadQueue
+
+
+class ScoreJob:
+    """ A finished game waiting to be persisted, rendered and uploaded """
+    def __init__(self, score, message, arcadeplayer, db_file, html_file):
+        self.score = score
+        self.message = message  # detailed scoring message from compute_score()
+        self.player = arcadeplayer  # ArcadePlayer object of the game
+        self.db_file = db_file
+        self.html_file = html_file
+        self.stage = 'queued'  # queued, saving, rendering, exporting, done, or failed
+        self.result_msg = ''  # description of last stage result (e.g., error message)
+        self.page_changed = False  # whether the high scores page changed and needs to be uploaded
+        self.finished_time = None
+
+
+class ScoreWorker:
+    """ Thread that processes ScoreJob objects in order received """
+    def __init__(self, retry_delays=SCORE_RETRY_DELAYS, uploader=None, leaderboard_dir=LEADERBOARD_DIR):
+        self.uploader = uploader if uploader is not None else UploadQueue()  # uploads changed pages in the background
+        self.exporter = LeaderboardExporter(leaderboard_dir, uploader=self.uploader)  # JSON period leaderboards
+        self.retry_delays = retry_delays  # seconds to wait before each retry of a failed stage
+        self.jobs = queue.Queue()
+        self.current_job = None  # job being processed
+        self.last_job = None  # last job finished (successfully or not)
+        self.num_failed = 0  # total number of jobs which failed after all retries
+        self.pages = {}  # {html filename: ScoresPage} cached html pages
+        self.thread = threading.Thread(target=self.run, name='score_worker', daemon=True)
+        self.thread.start()
+
+    def submit(self, score, message, arcadeplayer, db_file=SCORES_DB, html_file=HTML_FILE):
+        """ Queue a finished game for background processing; returns immediately """
+        self.jobs.put(ScoreJob(score, message, arcadeplayer, db_file, html_file))
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            self.current_job = job
+            try:
+                self.process(job)
+            except Exception as e:  # never let a bad job kill the worker thread
+                job.stage, job.result_msg = 'failed', f"Unexpected error: {e}"
+            if job.stage == 'failed':
+                self.num_failed += 1
+                print(f"\nScore worker: game result of {job.player.alias} ({job.score}) failed: {job.result_msg}")
+            job.finished_time = datetime.now()
+            self.last_job = job
+            self.current_job = None
+            self.jobs.task_done()
+
+    def retry(self, job, stage, function):
+        """ Run function (returns (success, message)) until it succeeds or retries run out; returns success """
+        job.stage = stage
+        for delay in (0,) + tuple(self.retry_delays):
+            time.sleep(delay)
+            try:
+                success, job.result_msg = function()
+            except OSError as e:
+                success, job.result_msg = False, f"{stage} error: {e}"
+            if success:
+                return True
+            print(f"\nScore worker: {job.result_msg}")
+        job.stage = 'failed'
+        return False
+
+    def process(self, job):
+        """ Save job's game result to database, rewrite html page and JSON leaderboards, and queue them for upload """
+        def save():
+            enter_score(job.score, job.message, job.player, db_file=job.db_file)
+            return True, 'saved'
+
+        def render():
+            if job.html_file not in self.pages:
+                self.pages[job.html_file] = ScoresPage(job.html_file)
+            job.page_changed = html_write_scores(db_file=job.db_file, html_file=job.html_file, unique=True,
+                                                 upload=False, page=self.pages[job.html_file])
+            return True, 'rendered'
+
+        def export():
+            return True, f"{self.exporter.export(job.db_file)} leaderboard file(s) updated"
+
+        if not self.retry(job, 'saving', save):
+            return
+        if not self.retry(job, 'rendering', render):
+            return
+        if job.page_changed:
+            self.uploader.request(job.html_file, 'index.html')
+        if not self.retry(job, 'exporting', export):
+            return
+        job.stage = 'done'
+
+    def status(self):
+        """ Returns string describing the state of high score processing """
+        status_str = f"High score processing: {self.jobs.qsize()} game(s) waiting"
+        job = self.current_job
+        if job is not None:
+            status_str += f"; {job.stage} game of {job.player.alias} ({job.score} points)"
+        status_str += '.\n'
+        job = self.last_job
+        if job is not None:
+            status_str += f"Last game: {job.player.alias} ({job.score} points) {job.stage} at" \
+                          f" {job.finished_time.strftime('%H:%M')}"
+            status_str += f" ({job.result_msg}).\n" if job.stage == 'failed' else ".\n"
+        if self.num_failed:
+            status_str += f"{self.num_failed} game(s) failed to be saved.\n"
+        return status_str + self.uploader.status()
@@ -0,0 +1,455 @@
+"""
+    SQLite high scores database (stdlib sqlite3 in WAL mode) holding arcade GameResult records.
+    Results are indexed by plane/score, score, player ID, and date so inserts and leaderboard queries do not need to
+    load and sort the whole score history.  An existing pickle high scores database is migrated on first open.
+
+    Unique player leaderboards are kept in two tables updated with every inserted result (one indexed upsert each):
+        best_scores  -- best result of each player (by IL-2 player ID) for each plane
+        last_players -- most recent result of each player
+    so leaderboard pages only read the top entries of an index.
+
+    Period leaderboards (best result of each player of the current day, week, month, and all time; for each plane and
+    for all planes combined) are kept in the period_best table, updated the same way.  Entries of past days, weeks and
+    months are pruned as new results arrive.
+
+    Each result's detailed scoring is stored as compact JSON scoring rows (see scoring.py) in the scoring column;
+    the detailed_scoring text column is only used by databases written before scoring rows existed and is emptied
+    once their results are converted.
+
+    Deleted results are moved to the deleted_results table (in numbered batches) so a delete can be undone.
+
+    Players may change their in game alias, so each player's latest alias is kept in the aliases table (keyed by
+    IL-2 player ID) and substituted for the alias stored with each result when results are read.  Stored results
+    are never rewritten.
+"""
+
+import os
+import pickle
+import sqlite3
+from datetime import datetime, timedelta
+
+from scoring import encode_scoring, decode_scoring, parse_scoring
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY,
+        alias TEXT NOT NULL,
+        player_id TEXT NOT NULL,
+        plane TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        detailed_scoring TEXT NOT NULL DEFAULT '',
+        timedate TEXT NOT NULL,
+        scoring TEXT
+    );
+    CREATE INDEX IF NOT EXISTS results_plane_score ON results (plane, score DESC, id);
+    CREATE INDEX IF NOT EXISTS results_score ON results (score DESC, id);
+    CREATE INDEX IF NOT EXISTS results_player_id ON results (player_id);
+    CREATE INDEX IF NOT EXISTS results_timedate ON results (timedate DESC, id DESC);
+    CREATE TABLE IF NOT EXISTS best_scores (
+        plane TEXT NOT NULL,
+        player_id TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        result_id INTEGER NOT NULL,
+        PRIMARY KEY (plane, player_id)
+    );
+    CREATE INDEX IF NOT EXISTS best_scores_rank ON best_scores (plane, score DESC, result_id);
+    CREATE TABLE IF NOT EXISTS last_players (
+        player_id TEXT PRIMARY KEY,
+        result_id INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS last_players_recent ON last_players (result_id DESC);
+    CREATE TABLE IF NOT EXISTS period_best (
+        period TEXT NOT NULL,
+        period_start TEXT NOT NULL,
+        plane TEXT NOT NULL,
+        player_id TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        result_id INTEGER NOT NULL,
+        PRIMARY KEY (period, period_start, plane, player_id)
+    );
+    CREATE INDEX IF NOT EXISTS period_best_rank ON period_best (period, period_start, plane, score DESC, result_id);
+    CREATE TABLE IF NOT EXISTS aliases (
+        player_id TEXT PRIMARY KEY,
+        alias TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS deleted_results (
+        id INTEGER PRIMARY KEY,
+        alias TEXT NOT NULL,
+        player_id TEXT NOT NULL,
+        plane TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        detailed_scoring TEXT NOT NULL DEFAULT '',
+        timedate TEXT NOT NULL,
+        scoring TEXT,
+        batch INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS deleted_results_batch ON deleted_results (batch);
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+PERIODS = ('daily', 'weekly', 'monthly', 'alltime')  # leaderboard periods of the period_best table
+ALL_PLANES = ''  # period_best plane of leaderboards of all planes combined
+
+RESULT_COLUMNS = "id, alias, player_id, plane, score, detailed_scoring, timedate, scoring"  # as stored
+
+# sort orders of search(): {name: columns}
+SORT_ORDERS = {'id': ('r.id',), 'date': ('r.timedate', 'r.id'), 'score': ('r.score', 'r.id'),
+               'alias': ('COALESCE(a.alias, r.alias)', 'r.id'), 'plane': ('r.plane', 'r.id'),
+               'player': ('r.player_id', 'r.id')}
+
+# results table columns as read -- the player's current alias replaces the alias stored with the result
+SELECT_COLUMNS = "r.id, COALESCE(a.alias, r.alias), r.player_id, r.plane, r.score, r.scoring, r.detailed_scoring," \
+                 " r.timedate"
+
+
+def period_start(period, timedate):
+    """ Returns first day (ISO date string) of the leaderboard period containing datetime timedate """
+    if period == 'daily':
+        return timedate.strftime('%Y-%m-%d')
+    if period == 'weekly':  # weeks start on Monday
+        return (timedate.date() - timedelta(days=timedate.weekday())).isoformat()
+    if period == 'monthly':
+        return timedate.strftime('%Y-%m-01')
+    return ''  # all time
+
+
+class ScoresDB:
+    """ Connection to the high scores database; use as a context manager so the connection is closed """
+    def __init__(self, filename, pickle_filename=None):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if not self.get_meta('scoring_converted'):  # database created before results had a scoring column
+            self.upgrade_results_table()
+        if pickle_filename:
+            self.migrate_pickle(pickle_filename)
+        if not self.get_meta('leaderboards_built'):  # database created before leaderboard tables existed
+            self.rebuild_leaderboards()
+        if not self.get_meta('aliases_built'):  # database created before aliases table existed
+            self.rebuild_aliases()
+        if not self.get_meta('periods_built'):  # database created before period_best table existed
+            self.rebuild_period_leaderboards()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def upgrade_results_table(self):
+        """ Adds scoring column to results table of older databases and converts their detailed scoring text """
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(results)")]
+        if 'scoring' not in columns:
+            self.conn.execute("ALTER TABLE results ADD COLUMN scoring TEXT")
+        rows = self.conn.execute("SELECT id, detailed_scoring FROM results WHERE scoring IS NULL").fetchall()
+        with self.conn:
+            self.conn.executemany("UPDATE results SET scoring = ?, detailed_scoring = '' WHERE id = ?",
+                                  [(encode_scoring(parse_scoring(text)), result_id) for result_id, text in rows])
+            self.set_meta('scoring_converted', '1')
+        if not rows:
+            return
+        self.conn.execute("VACUUM")  # give back the space of the detailed scoring text
+        print(f"High scores database: converted detailed scoring of {len(rows)} scores to scoring rows.")
+
+    def migrate_pickle(self, pickle_filename):
+        """ One time import of the GameResult list stored in the old pickle high scores database """
+        if self.get_meta('pickle_migrated') or not os.path.exists(pickle_filename):
+            return
+        with open(pickle_filename, 'rb') as f:
+            scores = pickle.load(f)
+        with self.conn:
+            for s in scores:
+                self.insert(s, commit=False)
+            self.set_meta('pickle_migrated', pickle_filename)
+        print(f"High scores database: migrated {len(scores)} scores from '{pickle_filename}'.")
+
+    def insert(self, game_result, commit=True):
+        """ Stores game_result (GameResult) and sets its result_id; returns the result id """
+        # ids of deleted results are not reused so a delete can be undone and cached tooltips stay valid
+        cursor = self.conn.execute(
+            "INSERT INTO results (id, alias, player_id, plane, score, detailed_scoring, scoring, timedate)"
+            " VALUES ((SELECT MAX(m) + 1 FROM (SELECT IFNULL(MAX(id), 0) AS m FROM results"
+            " UNION ALL SELECT MAX(id) FROM deleted_results)), ?, ?, ?, ?, '', ?, ?)",
+            (game_result.alias, game_result.player_id, game_result.plane, game_result.score,
+             encode_scoring(game_result.scoring), game_result.timedate.isoformat(sep=' ')))
+        game_result.result_id = cursor.lastrowid
+        self.update_alias(game_result.player_id, game_result.alias)
+        self.update_leaderboards(game_result.plane, game_result.player_id, game_result.score, game_result.result_id)
+        self.update_period_leaderboards(game_result.plane, game_result.player_id, game_result.score,
+                                        game_result.result_id, game_result.timedate)
+        if commit:
+            self.conn.commit()
+        return cursor.lastrowid
+
+    def update_leaderboards(self, plane, player_id, score, result_id):
+        """ Updates unique player leaderboard tables with a newly inserted result """
+        # a later result only replaces a player's best if strictly better (ties rank the earliest result first)
+        self.conn.execute(
+            "INSERT INTO best_scores (plane, player_id, score, result_id) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (plane, player_id) DO UPDATE SET score = excluded.score, result_id = excluded.result_id"
+            " WHERE excluded.score > best_scores.score",
+            (plane, player_id, score, result_id))
+        self.conn.execute("INSERT OR REPLACE INTO last_players (player_id, result_id) VALUES (?, ?)",
+                          (player_id, result_id))
+
+    def update_period_leaderboards(self, plane, player_id, score, result_id, timedate):
+        """ Updates period leaderboards with a newly inserted result and prunes entries of periods that are over """
+        for period in PERIODS:
+            start = period_start(period, timedate)
+            for p in (plane, ALL_PLANES):
+                self.conn.execute(
+                    "INSERT INTO period_best (period, period_start, plane, player_id, score, result_id)"
+                    " VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (period, period_start, plane, player_id)"
+                    " DO UPDATE SET score = excluded.score, result_id = excluded.result_id"
+                    " WHERE excluded.score > period_best.score",
+                    (period, start, p, player_id, score, result_id))
+            self.conn.execute("DELETE FROM period_best WHERE period = ? AND period_start < ?", (period, start))
+
+    def refresh_player_leaderboards(self, plane, player_id):
+        """ Recomputes leaderboard entries of player_id (and plane) from results, e.g., after a result is deleted """
+        self.conn.execute("DELETE FROM best_scores WHERE plane = ? AND player_id = ?", (plane, player_id))
+        self.conn.execute(
+            "INSERT INTO best_scores (plane, player_id, score, result_id)"
+            " SELECT plane, player_id, score, id FROM results WHERE plane = ? AND player_id = ?"
+            " ORDER BY score DESC, id LIMIT 1", (plane, player_id))
+        self.conn.execute("DELETE FROM last_players WHERE player_id = ?", (player_id,))
+        self.conn.execute(
+            "INSERT INTO last_players (player_id, result_id)"
+            " SELECT player_id, MAX(id) FROM results WHERE player_id = ? GROUP BY player_id", (player_id,))
+        self.conn.execute("DELETE FROM period_best WHERE player_id = ?", (player_id,))
+        for plane_, score, result_id, timedate in self.conn.execute(
+                "SELECT plane, score, id, timedate FROM results WHERE player_id = ? ORDER BY id",
+                (player_id,)).fetchall():
+            self.update_period_leaderboards(plane_, player_id, score, result_id, datetime.fromisoformat(timedate))
+
+    def rebuild_leaderboards(self):
+        """ Recomputes leaderboard tables from all results """
+        with self.conn:
+            self.conn.execute("DELETE FROM best_scores")
+            self.conn.execute("DELETE FROM last_players")
+            for plane, player_id, score, result_id in self.conn.execute(
+                    "SELECT plane, player_id, score, id FROM results ORDER BY id").fetchall():
+                self.update_leaderboards(plane, player_id, score, result_id)
+            self.set_meta('leaderboards_built', '1')
+
+    def rebuild_period_leaderboards(self):
+        """ Recomputes period leaderboards from all results """
+        with self.conn:
+            self.conn.execute("DELETE FROM period_best")
+            for plane, player_id, score, result_id, timedate in self.conn.execute(
+                    "SELECT plane, player_id, score, id, timedate FROM results ORDER BY id").fetchall():
+                self.update_period_leaderboards(plane, player_id, score, result_id, datetime.fromisoformat(timedate))
+            self.set_meta('periods_built', '1')
+
+    def update_alias(self, player_id, alias):
+        """
+            Sets the alias shown for all results of player_id.  Prevents people from changing their in game alias and
+            showing different names on the leaderboard when in fact it is the exact same person--it is impossible to
+            spoof the pilot id.
+        """
+        self.conn.execute("INSERT OR REPLACE INTO aliases (player_id, alias) VALUES (?, ?)", (player_id, alias))
+
+    def rebuild_aliases(self):
+        """ Sets each player's alias to the alias of the player's latest result """
+        with self.conn:
+            self.conn.execute("DELETE FROM aliases")
+            self.conn.execute("INSERT INTO aliases (player_id, alias)"
+                              " SELECT player_id, alias FROM results WHERE id IN"
+                              " (SELECT MAX(id) FROM results GROUP BY player_id)")
+            self.set_meta('aliases_built', '1')
+
+    def delete(self, result_ids):
+        """ Deletes results of result_ids (list of ints) as one batch which undo_delete() restores; returns count """
+        with self.conn:
+            batch = self.conn.execute("SELECT IFNULL(MAX(batch), 0) + 1 FROM deleted_results").fetchone()[0]
+            players = set()
+            for result_id in result_ids:
+                row = self.conn.execute("SELECT plane, player_id FROM results WHERE id = ?", (result_id,)).fetchone()
+                if row is None:
+                    continue
+                self.conn.execute(f"INSERT INTO deleted_results ({RESULT_COLUMNS}, batch)"
+                                  f" SELECT {RESULT_COLUMNS}, ? FROM results WHERE id = ?", (batch, result_id))
+                self.conn.execute("DELETE FROM results WHERE id = ?", (result_id,))
+                players.add(row)
+            for plane, player_id in players:
+                self.refresh_player_leaderboards(plane, player_id)
+            return self.conn.execute("SELECT COUNT(*) FROM deleted_results WHERE batch = ?", (batch,)).fetchone()[0]
+
+    def undo_delete(self):
+        """ Restores the results of the last delete(); returns number of results restored """
+        with self.conn:
+            batch = self.conn.execute("SELECT MAX(batch) FROM deleted_results").fetchone()[0]
+            if batch is None:
+                return 0
+            players = self.conn.execute("SELECT DISTINCT plane, player_id FROM deleted_results WHERE batch = ?",
+                                        (batch,)).fetchall()
+            count = self.conn.execute(f"INSERT INTO results ({RESULT_COLUMNS}) SELECT {RESULT_COLUMNS}"
+                                      f" FROM deleted_results WHERE batch = ? ORDER BY id", (batch,)).rowcount
+            self.conn.execute("DELETE FROM deleted_results WHERE batch = ?", (batch,))
+            for plane, player_id in players:
+                self.refresh_player_leaderboards(plane, player_id)
+            return count
+
+    def last_result_id(self):
+        row = self.conn.execute("SELECT MAX(id) FROM results").fetchone()
+        return row[0]
+
+    def replace_all(self, scores):
+        """ Replaces the entire contents of the database with scores (list of GameResult) """
+        with self.conn:
+            self.conn.execute("DELETE FROM results")
+            self.conn.execute("DELETE FROM deleted_results")
+            self.conn.execute("DELETE FROM best_scores")
+            self.conn.execute("DELETE FROM last_players")
+            self.conn.execute("DELETE FROM period_best")
+            self.conn.execute("DELETE FROM aliases")
+            for s in scores:
+                self.insert(s, commit=False)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @staticmethod
+    def to_game_result(row):
+        """ Create GameResult object from a results table row """
+        from highscores import GameResult
+        result_id, alias, player_id, plane, score, scoring, detailed_scoring, timedate = row
+        scoring = decode_scoring(scoring) if scoring is not None else detailed_scoring
+        game_result = GameResult(alias, player_id, plane, score, scoring, timedate=datetime.fromisoformat(timedate))
+        game_result.result_id = result_id
+        return game_result
+
+    def query(self, where='', params=(), order='id', limit=None, join=''):
+        """ Iterates GameResults of rows matching where clause in order """
+        sql = f"SELECT {SELECT_COLUMNS} FROM results r LEFT JOIN aliases a ON a.player_id = r.player_id{join}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        for row in self.conn.execute(sql, params):
+            yield self.to_game_result(row)
+
+    def search(self, player_id=None, alias=None, plane=None, min_score=None, max_score=None, since=None, until=None,
+               sort='id', descending=False, limit=None, current_alias=True):
+        """
+            Returns list of GameResults matching all given filters sorted by sort (see SORT_ORDERS).
+            alias matches (case insensitive) part of a player's current or stored alias (only the alias stored with
+            each result if not current_alias, e.g., to delete only the results entered under an alias); since and
+            until are datetimes; min_score, max_score, since and until are inclusive.
+        """
+        clauses, params = [], []
+        if player_id is not None:
+            clauses.append("r.player_id = ?")
+            params.append(player_id)
+        if alias is not None and current_alias:
+            clauses.append("(COALESCE(a.alias, r.alias) LIKE ? OR r.alias LIKE ?)")
+            params += [f"%{alias}%"] * 2
+        elif alias is not None:
+            clauses.append("r.alias LIKE ?")
+            params.append(f"%{alias}%")
+        if plane is not None:
+            clauses.append("r.plane = ?")
+            params.append(plane)
+        if min_score is not None:
+            clauses.append("r.score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("r.score <= ?")
+            params.append(max_score)
+        if since is not None:
+            clauses.append("r.timedate >= ?")
+            params.append(since.isoformat(sep=' '))
+        if until is not None:
+            clauses.append("r.timedate <= ?")
+            params.append(until.isoformat(sep=' '))
+        direction = ' DESC' if descending else ''
+        order = ', '.join(column + direction for column in SORT_ORDERS[sort])
+        return list(self.query(' AND '.join(clauses), tuple(params), order=order, limit=limit))
+
+    def all_scores(self):
+        """ Returns list of all GameResults in order entered """
+        return list(self.query())
+
+    def high_scores(self, num, plane=None, minimum=None):
+        """ Returns num highest scores (optionally only of plane and larger than minimum) """
+        where, params = self.plane_filter(plane, minimum)
+        return list(self.query(where, params, order='score DESC, id', limit=num))
+
+    def best_players(self, num, plane, minimum=None):
+        """ Returns best result of each player for plane (larger than minimum); highest num scores first """
+        where, params = "b.plane = ?", (plane,)
+        if minimum is not None:
+            where, params = where + " AND b.score > ?", params + (minimum,)
+        return list(self.query(where, params, order='b.score DESC, b.result_id', limit=num,
+                               join=' JOIN best_scores b ON b.result_id = r.id'))
+
+    def recent_players(self, num):
+        """ Returns most recent result of each of the last num players """
+        return list(self.query(order='l.result_id DESC', limit=num,
+                               join=' JOIN last_players l ON l.result_id = r.id'))
+
+    def period_leaderboard(self, period, num, plane=None, minimum=None, now=None):
+        """
+            Returns best result of each player in the current period ('daily', 'weekly', 'monthly' or 'alltime') of
+            plane (or of all planes if None) larger than minimum; highest num scores first
+        """
+        start = period_start(period, now if now else datetime.now())
+        where = "p.period = ? AND p.period_start = ? AND p.plane = ?"
+        params = (period, start, plane if plane is not None else ALL_PLANES)
+        if minimum is not None:
+            where, params = where + " AND p.score > ?", params + (minimum,)
+        return list(self.query(where, params, order='p.score DESC, p.result_id', limit=num,
+                               join=' JOIN period_best p ON p.result_id = r.id'))
+
+    def unique_scores(self, num, sortkey='timedate', plane=None, minimum=None):
+        """
+            Returns the first num scores with unique players (IL-2 player IDs) ordered by sortkey ('timedate' or 'score').
+            Uses the leaderboard tables if possible; otherwise rows are streamed in index order so only as many rows
+            as needed to find num unique players are read.
+        """
+        if sortkey == 'timedate' and plane is None and minimum is None:
+            return self.recent_players(num)
+        if sortkey == 'score' and plane is not None:
+            return self.best_players(num, plane, minimum)
+
+        order = 'timedate DESC, id DESC' if sortkey == 'timedate' else 'score DESC, id'
+        where, params = self.plane_filter(plane, minimum)
+        unique_scores = []
+        player_ids = set()
+        for s in self.query(where, params, order=order):
+            if s.player_id in player_ids:
+                continue
+            player_ids.add(s.player_id)
+            unique_scores.append(s)
+            if len(unique_scores) >= num:
+                break
+        return unique_scores
+
+    @staticmethod
+    def plane_filter(plane, minimum):
+        """ Returns where clause and parameters selecting plane and scores larger than minimum """
+        clauses, params = [], []
+        if plane is not None:
+            clauses.append("plane = ?")
+            params.append(plane)
+        if minimum is not None:
+            clauses.append("score > ?")
+            params.append(minimum)
+        return ' AND '.join(clauses), tuple(params)
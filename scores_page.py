@@ -0,0 +1,136 @@
+"""
+    High scores html page renderer.  The page template (index.html) is split once at its table anchors
+    (e.g., 'id="table0">' ... '    </div> <!--table0-->') into static text and table segments, so updating a table only
+    replaces its segment.  The html of each GameResult's detailed scoring tooltip never changes once written and is
+    cached by result id, and tables whose rows did not change are not re-rendered.
+"""
+
+import os
+
+from scoring import scoring_lines
+
+# create multiple indentation levels of 'indent_width'
+indent_width = 4
+ind = [' ' * x * indent_width for x in range(10)]
+
+
+def popup_tooltip(scoring):
+    """ Write html popup tooltip that contains detailed scoring information (tuple of scoring rows) """
+    first = True
+    html_txt = ind[6] + '<span class="tooltiptext">\n'
+    html_txt += ind[7] + '<table  class="t1">\n'
+    for left, right, text in scoring_lines(scoring):
+        if not right and first:  # row is a header type so insert a blank line beforehand if not first
+            first = False
+        elif not right:
+            html_txt += ind[8] + '<tr><td>&nbsp</td><td>&nbsp</td></tr>\n'
+        html_txt += ind[8] + '<tr>'
+        html_txt += f"<td>{left}</td><td>{right}</td>"
+        html_txt += '</tr>\n'
+
+    html_txt += ind[7] + '</table>\n'
+    html_txt += ind[6] + '</span>\n' + ind[5] + '</div>\n'
+    return html_txt
+
+
+def header():
+    return f"{ind[2]}<table>\n{ind[3]}<tr><th></th><th>Name</th><th>Score</th><th>Date</th></tr>\n"
+
+
+class ScoresPage:
+    """ Cached high scores html page; keep one instance alive between updates to benefit from caching """
+    def __init__(self, html_file, max_cached_tooltips=2000):
+        self.html_file = html_file
+        self.max_cached_tooltips = max_cached_tooltips
+        self.tooltips = {}  # {result id: tooltip html}
+        self.segments = []  # page text split into [static, table0, static, table1, ..., static]
+        self.table_segment = {}  # {table number: index of table's segment in segments}
+        self.table_keys = {}  # {table number: key of rows last rendered into table}
+        self.file_mtime = None  # modification time of html_file when last read or written
+        self.changed = False  # whether segments changed since last write
+
+    def load_template(self):
+        """ (Re)reads html file and splits it at its table anchors if the file was changed by someone else """
+        try:
+            mtime = os.stat(self.html_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self.segments and mtime == self.file_mtime:
+            return
+
+        with open(self.html_file, 'r') as f:
+            html_str = f.read()
+        self.segments, self.table_segment, self.table_keys = [], {}, {}
+        pos = 0
+        i = 0
+        while True:
+            start_tag = f'id="table{i}">\n'
+            start = html_str.find(start_tag, pos)
+            if start < 0:
+                break
+            start += len(start_tag)
+            end = html_str.find(f'    </div> <!--table{i}-->', start + 1)
+            if end < 0:
+                break
+            self.segments.append(html_str[pos:start])
+            self.table_segment[i] = len(self.segments)
+            self.segments.append(html_str[start:end])
+            pos = end
+            i += 1
+        self.segments.append(html_str[pos:])
+        self.file_mtime = mtime
+
+    def tooltip(self, sc):
+        """ Returns (cached) tooltip html of GameResult sc """
+        if sc.result_id is None:
+            return popup_tooltip(sc.scoring)
+        try:
+            return self.tooltips[sc.result_id]
+        except KeyError:
+            html_txt = popup_tooltip(sc.scoring)
+            if len(self.tooltips) >= self.max_cached_tooltips:
+                del self.tooltips[next(iter(self.tooltips))]  # discard oldest entry
+            self.tooltips[sc.result_id] = html_txt
+            return html_txt
+
+    def row(self, sc, num_str):
+        return f"{ind[3]}<tr><td>{num_str}</td><td>{sc.alias}</td>\n{ind[4]}" \
+               f"<td>\n{ind[5]}<div class=\"tooltip\">{sc.score}" \
+               f"\n{self.tooltip(sc)}{ind[4]}</td>\n" \
+               f"{ind[4]}<td>{sc.date_str}</td></tr>\n"
+
+    def update_table(self, table_num, scores_, numbered):
+        """ Replaces html table table_num with list of scores_; returns whether the table changed """
+        self.load_template()
+        if table_num not in self.table_segment:  # template has no such table
+            return False
+        key = (numbered,) + tuple((s.result_id, s.alias, s.score) for s in scores_)
+        if self.table_keys.get(table_num) == key:
+            return False
+
+        table_str = header()
+        for i, s in enumerate(scores_):
+            if numbered:
+                num_str = f"#{i+1}"
+            else:
+                num_str = "&nbsp&nbsp&nbsp&nbsp"
+            table_str += self.row(s, num_str)
+        table_str += ind[2] + '</table>\n'
+
+        segment = self.table_segment[table_num]
+        self.table_keys[table_num] = key
+        if self.segments[segment] == table_str:  # e.g., first update after reading an up to date html file
+            return False
+        self.segments[segment] = table_str
+        self.changed = True
+        return True
+
+    def write(self):
+        """ Writes html file if any table changed; returns whether the file was written """
+        if not self.changed:
+            return False
+        with open(self.html_file, 'w') as f:
+            f.write(''.join(self.segments))
+        self.file_mtime = os.stat(self.html_file).st_mtime_ns
+        self.changed = False
+        return True
@@ -0,0 +1,130 @@
+"""
+    Structured detailed scoring of an arcade game result.  The scoring breakdown is kept as a tuple of rows
+        (kind, name, count_id, damage, points)
+    e.g., ('kill', 'Pz.Kpfw.III Ausf.L', 3, None, 400) or ('injured', None, None, 45, -100) where damage is in
+    percent, instead of the multi-line text shown to players.  Rows are stored in the high scores database as compact
+    JSON and formatted back to text (or html tooltip lines) when needed.  Text written by older versions is parsed into
+    rows; lines that are not recognized are kept verbatim as 'line' rows.
+"""
+
+import json
+import re
+import sys
+
+# section headers implied by the first row of their kind
+SECTIONS = {'kill': 'Vehicles Killed', 'dmg': 'Vehicles Damaged'}
+
+# (kind, regular expression of stripped text line, names of row fields in matched groups)
+ROW_PATTERNS = [
+    ('player', re.compile(r'Player Damage:'), ()),  # header of player damage rows; listed even without player damage
+    ('none_kill', re.compile(r'No vehicles destroyed:\s*(-?\d+) points'), ('points',)),
+    ('none_dmg', re.compile(r'No vehicles damaged:\s*(-?\d+) points'), ('points',)),
+    ('dmg', re.compile(r'(.+) \(#(\d+)\) (\d+)%:\s*(-?\d+) points'), ('name', 'count_id', 'damage', 'points')),
+    ('kill', re.compile(r'(.+) \(#(\d+)\):\s*(-?\d+) points'), ('name', 'count_id', 'points')),
+    ('died', re.compile(r'Pilot died:\s*(-?\d+) points'), ('points',)),
+    ('eject', re.compile(r'Pilot ejected:\s*(-?\d+) points'), ('points',)),
+    ('injured', re.compile(r'Pilot injured:\s*\(\s*(\d+)%\):\s*(-?\d+) points'), ('damage', 'points')),
+    ('plane_lost', re.compile(r'(.+) destroyed:\s*(-?\d+) points'), ('name', 'points')),
+    ('plane_dmg', re.compile(r'(.+) (\d+)%:\s*(-?\d+) points'), ('name', 'damage', 'points')),
+]
+ROW_FIELDS = {kind: fields for kind, pattern, fields in ROW_PATTERNS}  # fields (besides kind) used by each kind
+ROW_FIELDS['line'] = ('name',)  # unrecognized text line
+
+
+def scoring_row(kind, name=None, count_id=None, damage=None, points=None):
+    # kinds and vehicle/plane names repeat across results, so share one string object of each
+    return sys.intern(kind), sys.intern(name) if name is not None else None, count_id, damage, points
+
+
+def parse_scoring(text):
+    """ Returns tuple of scoring rows parsed from detailed scoring text (as written by compute_score) """
+    rows = []
+    header = None  # section header line which is implied if the next row is of its section
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line in (f"{s}:" for s in SECTIONS.values()):
+            header = line
+            continue
+        for kind, pattern, fields in ROW_PATTERNS:
+            match = pattern.fullmatch(line)
+            if match:
+                values = dict(zip(fields, match.groups()))
+                row = scoring_row(kind, values.get('name'),
+                                  *(int(values[f]) if f in values else None for f in ('count_id', 'damage', 'points')))
+                break
+        else:
+            row = scoring_row('line', line)
+        if header is not None and f"{SECTIONS.get(row[0])}:" != header:  # header not implied by row so keep it
+            rows.append(scoring_row('line', header))
+        header = None
+        rows.append(row)
+    if header is not None:
+        rows.append(scoring_row('line', header))
+    return tuple(rows)
+
+
+def row_parts(row):
+    """ Returns (left, right, width) of scoring row; its text line is left + ':' right aligned to width, then right """
+    kind, name, count_id, damage, points = row
+    points_str = f"{points} points"
+    if kind == 'kill':
+        return f"{name} (#{count_id:0>2})", points_str, 26
+    if kind == 'dmg':
+        return f"{name} (#{count_id:0>2}) {damage:>02}%", points_str, 26
+    if kind == 'died':
+        return 'Pilot died', points_str, 25
+    if kind == 'eject':
+        return 'Pilot ejected', points_str, 25
+    if kind == 'injured':
+        return 'Pilot injured', f"({damage:>2}%): {points_str}", 25
+    if kind == 'plane_lost':
+        return f"{name} destroyed", points_str, 25
+    if kind == 'plane_dmg':
+        return f"{name} {damage}%", points_str, 25
+    if kind == 'none_kill':
+        return 'No vehicles destroyed', points_str, 0
+    if kind == 'none_dmg':
+        return 'No vehicles damaged', points_str, 0
+    if kind == 'player':
+        return 'Player Damage', '', 0
+    raise ValueError(f"Unknown scoring row kind '{kind}'")
+
+
+def scoring_lines(rows):
+    """
+        Returns list of (left, right, text) of rows including section headers, where text is the line as shown to
+        players and left/right are its parts before/after the first ':' (right is '' for headers)
+    """
+    lines = []
+    section = None
+    for row in rows:
+        row_section = SECTIONS.get(row[0])
+        if row_section is not None and row_section != section:
+            lines.append((row_section, '', f"{row_section}:"))
+        section = row_section
+        if row[0] == 'line':
+            left, sep, right = row[1].partition(':')
+            lines.append((left.strip(), right.strip(), row[1]))
+        else:
+            left, right, width = row_parts(row)
+            lines.append((left, right, f"{left + ':':>{width}} {right}".rstrip()))
+    return lines
+
+
+def format_scoring(rows):
+    """ Returns detailed scoring text of rows (as shown to players) """
+    return '\n'.join(text for left, right, text in scoring_lines(rows))
+
+
+def encode_scoring(rows):
+    """ Returns compact JSON string of rows; only the fields used by each row's kind are stored """
+    field_index = {'name': 1, 'count_id': 2, 'damage': 3, 'points': 4}
+    return json.dumps([[row[0]] + [row[field_index[f]] for f in ROW_FIELDS[row[0]]] for row in rows],
+                      separators=(',', ':'))
+
+
+def decode_scoring(json_str):
+    """ Returns tuple of rows of JSON string written by encode_scoring() """
+    return tuple(scoring_row(row[0], **dict(zip(ROW_FIELDS[row[0]], row[1:]))) for row in json.loads(json_str))
@@ -0,0 +1,104 @@
+"""
+    DServer.exe sds config file model.  The file is parsed once into its lines, and every 'key = value' line is
+    indexed by key so any setting (not only the toggleable ones) can be read or changed without re-scanning the
+    file.  Section headers ([KEY = system], [rotation], ...), comments, blank lines, indentation and the order of all
+    lines are kept as they are, so the file written back differs from the one read only in the values changed.
+    write() only writes the file if the text differs from what was last read or written.
+"""
+
+from file_staging import write_file, write_if_changed
+
+
+def parse_line(line):
+    """ Returns (key, value) of a 'key = value' sds line, or None for section headers, comments and blank lines """
+    stripped = line.strip()
+    if not stripped or stripped.startswith(('[', '/', '#', ';')):
+        return None
+    key, sep, value = stripped.partition('=')
+    if not sep or not key.strip():
+        return None
+    return key.strip(), value.strip()
+
+
+class SdsConfig:
+    """ Lines of an sds config file with the 'key = value' lines indexed by key """
+    def __init__(self, text='', filename=None):
+        self.filename = filename  # file the config was read from (default file of write())
+        self.lines = text.split('\n')
+        self.saved_text = text if filename is not None else None  # text of filename when last read or written
+        self.index = {}  # {key: line numbers of its 'key = value' lines in file order}
+        self.values = {}  # {line number: value string}
+        for i, line in enumerate(self.lines):
+            parsed = parse_line(line)
+            if parsed is not None:
+                self.index.setdefault(parsed[0], []).append(i)
+                self.values[i] = parsed[1]
+
+    def copy(self):
+        config = SdsConfig(self.text(), self.filename)
+        config.saved_text = self.saved_text
+        return config
+
+    def text(self):
+        return '\n'.join(self.lines)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def get(self, key, default=None):
+        """ Returns value string of the (first) setting key; default if key is not in the file """
+        if key not in self.index:
+            return default
+        return self.values[self.index[key][0]]
+
+    def get_all(self, key):
+        """ Returns value strings of every setting key (e.g., the rotation's 'file' lines) """
+        return [self.values[i] for i in self.index.get(key, ())]
+
+    def get_bool(self, key):
+        """ Returns boolean value of setting key; raises KeyError if key is not in the file """
+        if key not in self.index:
+            raise KeyError(f"{key} not found in sds config file.")
+        return self.get(key).lower() == 'true'
+
+    def get_int(self, key, default=None):
+        """ Returns integer value of setting key (default if key is not in the file); raises ValueError if not a number """
+        value = self.get(key)
+        return default if value is None else int(value)
+
+    def set(self, key, value):
+        """
+            Sets the (first) setting key to value (bool: true/false, other values as str()) keeping the line's
+            indentation; returns whether the value changed.  Raises KeyError if key is not in the file.
+        """
+        if key not in self.index:
+            raise KeyError(f"{key} not found in sds config file.")
+        value = ('true' if value else 'false') if isinstance(value, bool) else str(value)
+        i = self.index[key][0]
+        if self.values[i] == value:
+            return False
+        line = self.lines[i]
+        indent = line[:len(line) - len(line.lstrip())]
+        self.lines[i] = f"{indent}{key} = {value}"
+        self.values[i] = value
+        return True
+
+    def changed(self):
+        """ Returns whether the config differs from its file as last read or written """
+        return self.text() != self.saved_text
+
+    def write(self, filename=None):
+        """ Writes the config to filename (default: the file it was read from) if changed; returns whether written """
+        if filename is not None and filename != self.filename:  # e.g., a config derived from another file
+            return write_if_changed(filename, self.text(), encoding="UTF-8")
+        if not self.changed():
+            return False
+        write_file(self.filename, self.text(), encoding="UTF-8")
+        self.saved_text = self.text()
+        return True
+
+
+def read_sds_config(filename):
+    """ Returns SdsConfig of sds file filename """
+    with open(filename, 'r', encoding="UTF-8") as file:
+        return SdsConfig(file.read(), filename)
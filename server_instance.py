@@ -0,0 +1,388 @@
+"""
+    Server instances: one daemon process can drive several DServer.exe instances, each with its own IL-2
+    installation (DServer.exe writes its chat and mission logs into the installation it runs from), mission directory,
+    sds config files and ports.  Each instance has its own remote console, Mission, rotation timer and hot standby;
+    the player database and the high scores worker are shared.
+
+    The daemon's main loop is split into subsystems (chat and user commands, arcade game, DServer restarts,
+    housekeeping) which run as asyncio tasks with their own cadence (CHAT_INTERVAL, ARCADE_INTERVAL, ...) instead of
+    one after another every SLEEP_TIME: chat commands and arcade events are picked up within a second or so, and the
+    slower periodic work (restart checks, hot standby, rotation, pre-building) no longer adds to every cycle.  The
+    steps themselves are blocking code and run in a small thread pool per instance.  The instance lock is only held
+    while a step changes mission or server state (user commands, arcade events, stopping and starting DServer, the
+    hot standby); reading chat logs, warning players, waiting for a rebooting server to empty and resource probes run
+    without it.  While DServer is being restarted the chat and arcade steps skip their turn instead of waiting for it.
+    An error in a step is printed and the step runs again at its next turn; an instance that fails to start is
+    printed and ends without ending the other instances.
+
+    Instances are configured in constants.SERVER_INSTANCES.  A setting left out of an instance's dict defaults to
+    its constant, with paths inside IL2_MISSION_DIR or IL2_BASE_DIR moved to the instance's mission_dir or
+    il2_base_dir, so the default instance ({}) is exactly the single server the constants describe.
+    Shared by all instances: the player list file, the resaver cache, the cloud files and the high scores files.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import sys
+import threading
+import time
+import traceback
+
+from constants import *
+from remote_console import RemoteConsoleClient  # handles DServer.exe TCP/IP communication
+from mission import Mission  # handles processing of mission files and arcades
+from rotation import MissionRotation  # timed mission rotation
+from process_monitor import ProcessMonitor  # DServer.exe memory, CPU and handle use
+from dserver_standby import StandbyDServer  # hot-standby DServer.exe
+from program_commands import define_commands, process_user_commands  # program commands user can call
+from help import contruct_help_message  # help related functions
+from chatlogs import process_chatlogs, remove_chat_logs  # functions to process chat logs
+from arcade_stuka import process_arcade_game, delete_multiple_logs_files
+from dserver_run_functions import start_dserver, stop_dserver, copy_sds_config_base_to_working, write_sds_file, \
+    read_sds_file, check_arcade_dserver_setting, PreviousDServer
+from arcade_journal import read_arcade_journal  # arcade game recovery after daemon restart
+
+
+def rebase(path, old_dir, new_dir):
+    """ Returns path moved from directory old_dir to new_dir (path unchanged if it is not inside old_dir) """
+    return new_dir + path[len(old_dir):] if path.startswith(old_dir) else path
+
+
+class ServerConfig:
+    """ Directories, files and ports of one server instance """
+    def __init__(self, name='scg', il2_base_dir=IL2_BASE_DIR, mission_dir=None, **settings):
+        self.name = name  # printed in front of the instance's loop counter
+        self.il2_base_dir = il2_base_dir  # IL-2 installation DServer.exe runs from
+        self.mission_dir = mission_dir if mission_dir is not None else rebase(IL2_MISSION_DIR, IL2_BASE_DIR, il2_base_dir)
+
+        defaults = {
+            'mission_basename': MISSION_BASENAME,
+            'base_mission_num': BASE_MISSION_NUM,
+            'dserver_dir': IL2_DSERVER_DIR,
+            'working_config': IL2_DSERVER_WORKING_CONFIG,
+            'base_config': IL2_DSERVER_BASE_CONFIG,
+            'standby_config': IL2_DSERVER_STANDBY_CONFIG,
+            'dserver_ip': DSERVER_IP,
+            'rcon_port': DSERVER_PORT,
+            'rcon_user': DSERVER_USERNAME,
+            'rcon_password': DSERVER_PASSWORD,
+            'port_settings': DSERVER_PORT_SETTINGS,
+            'chatlog_wildcard': CHATLOG_FILES_WILDCARD,
+            'chatlog_backup_dir': CHATLOG_DIR_BACKUP,
+            'pilot_log_file': MY_LOG_FILE,
+            'mission_logs_wildcard': MISSION_LOGS_WILDCARD,
+            'mission_log_backup_dir': MISSION_LOG_BACKUP_DIR,
+            'mission_cache_file': MISSION_CACHE_FILE,
+            'mission_catalog_file': MISSION_CATALOG_FILE,
+            'arcade_journal_file': ARCADE_JOURNAL_FILE,
+            'preset_stats_file': PRESET_STATS_FILE,
+            'prebuild_dir': PREBUILD_DIR,
+        }
+        unknown = set(settings) - set(defaults)
+        if unknown:
+            raise ValueError(f"Server instance {name}: unknown settings {sorted(unknown)}.")
+        for key, value in defaults.items():
+            if isinstance(value, str) and value.startswith(IL2_MISSION_DIR):
+                value = rebase(value, IL2_MISSION_DIR, self.mission_dir)
+            elif isinstance(value, str):
+                value = rebase(value, IL2_BASE_DIR, il2_base_dir)
+            setattr(self, key, settings.get(key, value))
+
+
+def check_configs(configs):
+    """ Raises ValueError if server instances would share a name, DServer files, logs or ports """
+    for attribute in ('name', 'working_config', 'chatlog_wildcard', 'mission_logs_wildcard', 'rcon_port'):
+        values = [getattr(c, attribute) for c in configs]
+        if len(set(values)) != len(values):
+            raise ValueError(f"Server instances must not share {attribute}: {values}")
+    ports = [port for c in configs for key, pair in c.port_settings.items() for port in pair]
+    if len(set(ports)) != len(ports):
+        raise ValueError(f"Server instances must not share DServer ports (port_settings): {ports}")
+
+
+class ServerInstance:
+    """ One DServer.exe and the daemon state driving it; call run() (blocks) or await run_async() """
+    def __init__(self, config, player_list, score_worker=None, label=''):
+        self.config = config
+        self.player_list = player_list  # player database (shared by all instances)
+        self.label = label  # printed in front of the loop counter (e.g., instance name when several run)
+
+        """ initialize remote console -- TCP/IP routines which communicate with DServer.exe  """
+        self.r_con = RemoteConsoleClient(config.dserver_ip, config.rcon_port, config.rcon_user, config.rcon_password)
+
+        """ initialize mission class variable -- mission class contains (almost all) data/routines for handling mission data """
+        self.mission = Mission(config.il2_base_dir, config.mission_dir, config.mission_basename,
+                               cache_file=config.mission_cache_file, catalog_file=config.mission_catalog_file,
+                               journal_file=config.arcade_journal_file, preset_stats_file=config.preset_stats_file,
+                               prebuild_dir=config.prebuild_dir, score_worker=score_worker)
+
+        """ define user program commands and console help information """
+        self.program_cmds = define_commands(self.mission)
+        self.help_str = contruct_help_message(self.program_cmds)  # go ahead and generate main help message string now
+
+        """ misc init """
+        self.rotation = MissionRotation()  # timed mission rotation (disabled unless ROTATION_ENABLED)
+        self.standby = StandbyDServer(self.r_con, config.standby_config, config.port_settings,
+                                      config.mission_basename, config.dserver_dir)  # hot-standby DServer (if STANDBY_DSERVER)
+        self.server_settings_dict, self.sds_config = None, None  # toggleable settings and SdsConfig of working sds file (read by start())
+        self.dserver_proc = None  # running DServer.exe process
+        self.monitor = ProcessMonitor()  # restarts a leaking DServer when the server is empty
+        self.mission.dserver_monitor = self.monitor  # for the dserver_status command
+        self.iteration = 0  # number of times the main loop has run
+        self.lock = threading.RLock()  # held by steps while they change mission or server state
+        self.restarting = threading.Event()  # set while DServer is being restarted (chat and arcade steps pause)
+        self.executor = None  # threads the blocking steps run in (see run_async())
+        self.step_threads = {}  # {step name: id of the thread running it} (see print_step_stack())
+        self.stop_event = threading.Event()  # set to end run()
+
+    def print_time(self):
+        """ Small helper function to print time and runtime iteration count """
+        current_time = datetime.now().strftime("%H:%M")
+        print(f"{self.label}#{self.iteration}({current_time})/ ", end='', flush=True)
+
+    def start_dserver(self):
+        process = start_dserver(self.config.working_config, self.r_con, dserver_dir=self.config.dserver_dir)
+        self.mission.journal.set_dserver_pid(process.pid)  # a recovered daemon stops only this instance's DServer
+        return process
+
+    def restart_dserver(self):
+        """ Stops DServer.exe and starts it again with the current mission (in slot 0) and server settings """
+        stop_dserver(self.dserver_proc)
+        self.mission.dserver_write_index = 0
+        self.mission.copy_mission_to_dserver_files()
+        write_sds_file(self.config.working_config, self.server_settings_dict, self.sds_config)  # update server config file if a setting changed (settings are now the running ones)
+        self.dserver_proc = self.start_dserver()
+
+    def start(self):
+        """ Loads the base mission (or recovers an arcade game in progress), starts DServer.exe and connects to it """
+        config, r_con, mission = self.config, self.r_con, self.mission
+
+        """ If an arcade game was in progress when this daemon last stopped and DServer.exe is still running it,
+            recover the game from the arcade journal instead of restarting DServer with the base mission """
+        journal = read_arcade_journal(config.arcade_journal_file)
+        recovering = journal is not None and r_con.connect() and mission.recover_arcade(*journal)
+        if not recovering:
+            mission.init_new_mission(config.base_mission_num)  # set up mission files for processing using mission index number (usually 0 for base mission)
+            copy_sds_config_base_to_working(config.base_config, config.working_config)  # copy base sds config file to working one
+
+        """ Initialize dserver server settings  """
+        self.server_settings_dict, self.sds_config = read_sds_file(config.working_config)  # read config file (SdsConfig) and create server settings dict
+        self.print_time()
+
+        """ Start Dserver.exe """
+        if recovering:  # DServer.exe was started by previous run of this daemon
+            self.dserver_proc = PreviousDServer(journal[2]) if journal[2] is not None else None
+        else:
+            # check to see if dserver settings are set correctly for arcade  game
+            if mission.arcade_game and check_arcade_dserver_setting(self.server_settings_dict):  # updates current dserver settings to correspond with arcade's dserver settings
+                write_sds_file(config.working_config, self.server_settings_dict, self.sds_config)  # update server config file (settings are now the running ones)
+            self.dserver_proc = self.start_dserver()
+
+        """ Establish connection to DServer and flush chat logs so any previous commands are not processed """
+        while not recovering and not r_con.connect():  # until connect (recovery has already connected)
+            time.sleep(4)
+        r_con.send(f"cutchatlog")  # tell Dserver to dump chat log files
+        time.sleep(2)  # give some time to remove permissions on any previous chat log files for flush in next line
+        remove_chat_logs(config.chatlog_wildcard, config.chatlog_backup_dir)
+
+    def chat_step(self):
+        """ Read and process chat log files and user inputted commands """
+        config, mission = self.config, self.mission
+        if self.restarting.is_set():  # chat logs are read once DServer is back
+            return
+        user_commands = process_chatlogs(config.chatlog_wildcard, self.r_con, mission, self.player_list,
+                                         config.chatlog_backup_dir, config.pilot_log_file)  # gets user commands as list of strings
+        with self.lock:
+            process_user_commands(user_commands, self.r_con, mission, self.server_settings_dict, self.program_cmds,
+                                  self.help_str)
+
+    def arcade_step(self):
+        """ process arcade game """
+        config, mission = self.config, self.mission
+        if self.restarting.is_set():
+            return
+        with self.lock:  # commands may replace the arcade game (and its journal)
+            if mission.arcade_game:
+                process_arcade_game(mission.arcade, config.mission_logs_wildcard, r_con=self.r_con,
+                                    copy_log_files=COPY_MISSION_LOGFILES, backup_dir=config.mission_log_backup_dir,
+                                    score_worker=mission.score_worker)
+            else:
+                delete_multiple_logs_files(False, config.mission_logs_wildcard, config.mission_log_backup_dir)  # do not examine or keep mission logs for non-arcade games
+
+    def user_restart_due(self):
+        """ Returns whether a user initiated DServer restart is pending and ready (background resaver.exe done) """
+        mission = self.mission
+        return mission.restart_dserver and (mission.user_initiated_reset or mission.load_new_mission_flag) \
+            and mission.resaver_job is None
+
+    def server_step(self):
+        """ DServer restarts: pending server settings, resource monitor, player inactivity and lost communication """
+        config, r_con, mission, standby = self.config, self.r_con, self.mission, self.standby
+
+        """ Sample DServer's resource use and check for players (remote console round trip); a pending settings
+            restart is left to the user's reset (restarting now would apply the settings without one) """
+        self.monitor.poll(self.dserver_proc)
+        empty = self.monitor.restart_reason and not mission.restart_dserver and not (self.iteration % 10) \
+            and r_con.player_count() == 0
+
+        """ See if user initiated Dserver restart is required and process """
+        if self.user_restart_due():
+            self.restarting.set()
+            try:
+                with self.lock:
+                    if self.user_restart_due() and standby.process is not None:  # switch to hot-standby DServer
+                        r_con.send_msg("WARNING: The server is switching to a restarted server, and you will be kicked."
+                                       "  Please rejoin the server.")
+                        new_proc = standby.switch_over(self.dserver_proc, self.server_settings_dict, self.sds_config,
+                                                       mission, config.working_config)
+                        if new_proc is not None:
+                            self.dserver_proc = new_proc
+                            mission.journal.set_dserver_pid(new_proc.pid)
+                            self.server_settings_dict, self.sds_config = read_sds_file(config.working_config)  # settings now running
+                            mission.restart_dserver = mission.user_initiated_reset = mission.load_new_mission_flag = False
+
+                if self.user_restart_due():
+                    r_con.send_msg("WARNING: The server will now reboot, and you will be kicked.  Please rejoin the server.")
+                    time.sleep(.5)
+                    r_con.send(f"serverinput reboot", debug=False)
+                    r_con.wait_until_empty(DSERVER_REBOOT_TIMEOUT, DSERVER_PROBE_INTERVAL)  # players are kicked by the reboot
+                    with self.lock:
+                        self.restart_dserver()
+                        mission.restart_dserver = mission.user_initiated_reset = mission.load_new_mission_flag = False
+            finally:
+                self.restarting.clear()
+
+        """ print to console number of iterations of this loop """
+        self.iteration += 1
+        if not (self.iteration % 50):
+            self.print_time()
+        if not (self.iteration % 400):  # newline
+            print('')
+
+        """ Check if mission should be reset to base mission due to player inactivity
+            and/or print warning messages to user that mission is about to reset. """
+        inactivity_flag = mission.check_reset_to_base_mission(r_con, RESET_TIME, SERVER_CHECK_INTERVAL)
+
+        """ Restart DServer if it leaks memory or handles (or burns CPU), once nobody is on the server """
+        if empty and self.monitor.restart_reason and not mission.restart_dserver and not MissionRotation.busy(mission):
+            print(f"\nRestarting DServer on the empty server: {self.monitor.restart_reason}.")
+            self.restarting.set()
+            try:
+                with self.lock:
+                    standby.discard()
+                    self.restart_dserver()
+            finally:
+                self.restarting.clear()
+
+        """ Initiate dserver restart if too much player inactivity or dserver communication has failed for too long """
+        if inactivity_flag or (not r_con.comm_flag):
+            print("Restarting Dserver....")
+            self.restarting.set()
+            try:
+                with self.lock:
+                    standby.discard()
+                    stop_dserver(self.dserver_proc)
+                    copy_sds_config_base_to_working(config.base_config, config.working_config)  # restore base sds file
+                    self.server_settings_dict, self.sds_config = read_sds_file(config.working_config)  # and its settings
+                    mission.init_new_mission(config.base_mission_num)  # initialize mission files from one of the available missions
+                    self.dserver_proc = self.start_dserver()  # start dserver
+            finally:
+                self.restarting.clear()
+
+    def housekeeping_step(self):
+        """ Hot standby, timed mission rotation and idle time pre-building """
+        mission, standby = self.mission, self.standby
+        with self.lock:
+            """ Start a hot-standby DServer with pending server settings (or stop it if they were toggled back) """
+            if STANDBY_DSERVER and mission.restart_dserver and not mission.arcade_game:
+                standby.prepare(self.server_settings_dict, self.sds_config, mission)
+            elif standby.process is not None and not mission.restart_dserver:
+                standby.discard()
+
+            """ Timed mission rotation (queues a mission load like the load mission command) """
+            self.rotation.poll(mission, self.r_con)
+
+            """ Pre-build popular weather presets while no player is active """
+            mission.prebuilder.poll(idle=time.time() - mission.old_time > PREBUILD_IDLE_TIME)
+
+    def run_step(self, name, step):
+        """ Runs step in an executor thread; an exception is printed and only ends this run of the step """
+        self.step_threads[name] = threading.get_ident()
+        try:
+            step()
+        except Exception:
+            print(f"\nError in {self.config.name} {name} step (the step runs again next time):")
+            traceback.print_exc()
+        finally:
+            self.step_threads.pop(name, None)
+
+    def print_step_stack(self, name):
+        """ Prints where the running step name is (e.g., blocked on the remote console or a file) """
+        frame = sys._current_frames().get(self.step_threads.get(name))
+        if frame is not None:
+            print(''.join(traceback.format_stack(frame)), end='')
+
+    async def repeat(self, name, step, interval, timeout=TASK_TIMEOUT):
+        """
+            Runs blocking step in the instance's threads every interval seconds until stop().  A step that raises is
+            logged and run again at its next turn; a step running over timeout seconds cannot be interrupted, so
+            where it is stuck is printed every timeout seconds until it returns.
+        """
+        loop = asyncio.get_running_loop()
+        while not self.stop_event.is_set():
+            start = loop.time()
+            future = loop.run_in_executor(self.executor, self.run_step, name, step)
+            while True:
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), timeout)
+                    break
+                except asyncio.TimeoutError:
+                    print(f"\nWarning: {self.config.name} {name} step has been running for"
+                          f" {loop.time() - start:.0f} secs:")
+                    self.print_step_stack(name)
+            await asyncio.sleep(max(0.0, interval - (loop.time() - start)))
+
+    async def run_async(self):
+        """
+            Starts the instance and then runs its subsystems as independent tasks, each on its own cadence, until
+            stop().  Steps block (files, remote console, DServer.exe starts), so each runs in a thread of its own;
+            self.lock serializes steps only while they change mission and server state.  Errors of a step do not end
+            the other steps (see repeat()); an error starting the instance does end it.
+        """
+        loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix=self.config.name)
+        try:
+            await loop.run_in_executor(self.executor, self.start)
+            await asyncio.gather(self.repeat('chat', self.chat_step, CHAT_INTERVAL),
+                                 self.repeat('arcade', self.arcade_step, ARCADE_INTERVAL),
+                                 self.repeat('server', self.server_step, SERVER_CHECK_INTERVAL),
+                                 self.repeat('housekeeping', self.housekeeping_step, HOUSEKEEPING_INTERVAL))
+        except BaseException:  # e.g., cancelled: do not wait for steps that may never return
+            self.executor.shutdown(wait=False)
+            raise
+        await loop.run_in_executor(None, self.executor.shutdown, True)  # stopped: let running steps finish
+
+    def run(self):
+        """ Starts the instance and runs it until stop() """
+        asyncio.run(self.run_async())
+
+    def stop(self):
+        """ Ends run() once the running steps are done (DServer.exe keeps running) """
+        self.stop_event.set()
+
+
+async def supervise(instance):
+    """ Runs instance until it ends; an error ending it is printed instead of ending the other instances too """
+    try:
+        await instance.run_async()
+    except Exception:
+        print(f"\nServer instance {instance.config.name} stopped by an error (other instances keep running):")
+        traceback.print_exc()
+
+
+def run_instances(instances):
+    """ Runs all instances concurrently in one event loop until they have all ended """
+    async def run_all():
+        await asyncio.gather(*[supervise(instance) for instance in instances])
+    asyncio.run(run_all())
@@ -0,0 +1,34 @@
+"""
+    Arcade journal records: mission name, the slot DServer runs and its process id survive a daemon restart.
+"""
+
+from arcade_journal import ArcadeJournal, read_arcade_journal
+
+
+def test_journal_records_slot_and_pid(tmp_path):
+    filename = str(tmp_path / "arcade.journal")
+    journal = ArcadeJournal(filename)
+    journal.set_dserver_pid(1234)  # not journaled while no game is
+    assert read_arcade_journal(filename) is None
+
+    journal.start("kuban main", 1)
+    journal.append(["T:10 AType:12 ID:500\n"])
+    assert read_arcade_journal(filename) == ("kuban main", 1, 1234, ["#pid 1234\n", "T:10 AType:12 ID:500\n"])
+
+    journal.append(["#slot 0"])  # staged to the other slot for a reset or restart
+    journal.set_dserver_pid(5678)
+    mission_name, slot, pid, entries = read_arcade_journal(filename)
+    assert (mission_name, slot, pid) == ("kuban main", 0, 5678)
+
+
+def test_journal_ignores_partial_last_line_and_cleared_journal(tmp_path):
+    filename = str(tmp_path / "arcade.journal")
+    journal = ArcadeJournal(filename)
+    journal.start("base", 0)
+    with open(filename, 'a', encoding="UTF-8") as file:
+        file.write("T:11 ATy")  # crash while writing
+    assert read_arcade_journal(filename) == ("base", 0, None, [])
+
+    journal.clear()
+    journal.set_dserver_pid(1)
+    assert read_arcade_journal(filename) is None
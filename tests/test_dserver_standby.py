@@ -0,0 +1,148 @@
+"""
+    DServer starts, readiness and empty-server waits and hot-standby switchovers against utilities/fake_dserver.py.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import types
+
+import pytest
+
+import dserver_run_functions
+from constants import DSERVER_USERNAME, DSERVER_PASSWORD
+from dserver_run_functions import start_dserver, stop_dserver, read_sds_file, PreviousDServer
+from dserver_standby import StandbyDServer
+from remote_console import RemoteConsoleClient
+from sds_config import read_sds_config
+
+FAKE_DSERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'utilities',
+                            'fake_dserver.py')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def write_config(filename, rcon_port, port, aim=False):
+    with open(filename, 'w', encoding="UTF-8") as file:
+        file.write(f"[KEY = system]\n\tport = {port}\n\trconPort = {rcon_port}\n"
+                   f"aimingHelp = {'true' if aim else 'false'}\nobjectIcons = true\nunlimitAmmo = false\n"
+                   f"invulnerability = false\n[rotation]\n\tfile = \"Multiplayer/scg_training0\"\n"
+                   f"\tfile = \"Multiplayer/scg_training1\"\n[end]\n")
+    return str(filename)
+
+
+def r_con(port):
+    return RemoteConsoleClient('127.0.0.1', port, DSERVER_USERNAME, DSERVER_PASSWORD)
+
+
+@pytest.fixture
+def fake_exe(monkeypatch):
+    """ Makes start_dserver() run the fake DServer (as documented: IL2_DSERVER_EXE set to its path) """
+    monkeypatch.setattr(dserver_run_functions, 'IL2_DSERVER_EXE', FAKE_DSERVER)
+
+
+@pytest.fixture
+def processes():
+    """ Fake DServer processes started by a test; stopped at its end """
+    started = []
+    yield started
+    for p in started:
+        if p.poll() is None:
+            p.kill()
+            p.wait()
+
+
+def test_start_dserver_runs_fake_from_dserver_dir(tmp_path, fake_exe, processes):
+    rcon_port = free_port()
+    config = write_config(tmp_path / "work.sds", rcon_port, free_port())
+    rc = r_con(1)
+    process = start_dserver(config, rc, timeout=20, dserver_dir=str(tmp_path))
+    processes.append(process)
+    assert rc.port == rcon_port
+    assert process.poll() is None
+    assert rc.probe()
+    stop_dserver(process)
+    assert process.poll() is not None
+
+
+def test_wait_until_ready(tmp_path, processes):
+    rcon_port = free_port()
+    config = write_config(tmp_path / "work.sds", rcon_port, free_port())
+    rc = r_con(rcon_port)
+    assert rc.wait_until_ready(0.5, 0.1) is None  # nothing listening yet
+
+    processes.append(subprocess.Popen([sys.executable, FAKE_DSERVER, config, '--start-delay', '1'],
+                                      cwd=str(tmp_path)))
+    seconds = rc.wait_until_ready(20, 0.2)
+    assert seconds is not None and seconds >= 0.5
+
+
+def test_wait_until_empty(tmp_path, processes):
+    rcon_port = free_port()
+    config = write_config(tmp_path / "work.sds", rcon_port, free_port())
+    processes.append(subprocess.Popen([sys.executable, FAKE_DSERVER, config, '--start-delay', '0',
+                                       '--players', '2'], cwd=str(tmp_path)))
+    rc = r_con(rcon_port)
+    assert rc.wait_until_ready(20, 0.2) is not None
+    assert rc.player_count() == 2
+    assert rc.wait_until_empty(0.5, 0.1) is None  # players stay until the reboot kicks them
+
+    assert rc.request(["serverinput reboot"])[0][0] == 1
+    assert rc.wait_until_empty(5, 0.1) is not None
+    assert rc.player_count() == 0
+
+
+def test_switch_over_to_standby(tmp_path, fake_exe, processes):
+    rcon_ports, ports = (free_port(), free_port()), (free_port(), free_port())
+    working = write_config(tmp_path / "work.sds", rcon_ports[0], ports[0])
+    rc = r_con(1)
+    active = start_dserver(working, rc, timeout=20, dserver_dir=str(tmp_path))
+    processes.append(active)
+
+    server_vars, sds_config = read_sds_file(working)
+    server_vars['aim'].toggle_bool()  # pending setting which needs a restart
+    resets = []
+    mission = types.SimpleNamespace(dserver_write_index=1, standby_slot=None, wait_for_prestage=lambda: None,
+                                    stage_dserver_slot=lambda slot: 0, slot_matches=lambda slot: False,
+                                    reset_mission=lambda rc_: resets.append(rc_.port), prestage_dserver_slot=lambda: None)
+    standby = StandbyDServer(rc, str(tmp_path / "standby.sds"), {'rconPort': rcon_ports, 'port': ports},
+                             'scg_training', str(tmp_path))
+    standby.prepare(server_vars, sds_config, mission)
+    processes.append(standby.process)
+    assert mission.standby_slot == 1
+    standby_config = read_sds_config(str(tmp_path / "standby.sds"))
+    assert standby_config.get_int('rconPort') == rcon_ports[1] and standby_config.get_int('port') == ports[1]
+    assert standby_config.get_bool('aimingHelp')
+    assert 'scg_training1' in standby_config.get_all('file')[0]  # standby starts with the slot it loaded
+
+    new_process = standby.switch_over(active, server_vars, sds_config, mission, working)
+    assert new_process is not None and new_process.poll() is None
+    assert active.poll() is not None  # old DServer was stopped
+    assert rc.port == rcon_ports[1] and rc.probe()
+    assert mission.dserver_write_index == 0 and mission.standby_slot is None
+    assert resets == [rcon_ports[1]]  # mission changed since the standby started: reset on the new DServer
+    assert standby.process is None
+    working_config = read_sds_config(working)
+    assert working_config.get_int('rconPort') == rcon_ports[1] and working_config.get_bool('aimingHelp')
+
+
+def test_switch_over_without_standby(tmp_path):
+    rc = r_con(free_port())
+    standby = StandbyDServer(rc, str(tmp_path / "standby.sds"), {'rconPort': (1, 2)}, 'scg_training', str(tmp_path))
+    assert standby.switch_over(None, {}, None, None, None) is None  # no standby: normal restart
+
+
+def test_stop_previous_dserver_stops_only_its_process(tmp_path, processes):
+    configs = [write_config(tmp_path / f"work{i}.sds", free_port(), free_port()) for i in range(2)]
+    for config in configs:
+        processes.append(subprocess.Popen([sys.executable, FAKE_DSERVER, config, '--start-delay', '0'],
+                                          cwd=str(tmp_path)))
+    stop_dserver(PreviousDServer(processes[0].pid))  # e.g., DServer of a recovered arcade game
+    assert processes[0].wait(10) is not None
+    assert processes[1].poll() is None  # other server instance's DServer keeps running
+    assert stop_dserver(None) is None  # no process known: nothing is stopped
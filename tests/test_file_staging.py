@@ -0,0 +1,78 @@
+"""
+    Mission file staging: unchanged files are skipped, files are replaced in one step (never rewritten in place, so
+    the other names of a hard linked file keep their content) and slots can be kept free of hard links.
+"""
+
+import os
+
+import file_staging
+from file_staging import stage_file, write_file, write_if_changed, unshare_file, same_content
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_stage_file_skips_unchanged_and_links(tmp_path):
+    source = write(tmp_path / "kuban.msnbin", "binary")
+    destination = str(tmp_path / "scg_training.msnbin")
+    assert stage_file(source, destination)
+    assert os.path.samefile(source, destination)  # hard link
+    assert not stage_file(source, destination)
+
+    copy = write(tmp_path / "copy.msnbin", "binary")  # same content, other file
+    assert not stage_file(copy, destination)
+    write(tmp_path / "copy.msnbin", "changed")
+    assert stage_file(copy, destination) and open(destination).read() == "changed"
+    assert open(source).read() == "binary"  # replacing the link left the source alone
+
+
+def test_stage_file_without_link_replaces_an_existing_link(tmp_path):
+    source = write(tmp_path / "kuban.msnbin", "binary")
+    slot = str(tmp_path / "scg_training0.msnbin")
+    os.link(source, slot)
+    assert stage_file(source, slot, link=False)
+    assert not os.path.samefile(source, slot) and open(slot).read() == "binary"
+    assert not stage_file(source, slot, link=False)  # a copy with the same content is unchanged
+
+
+def test_staging_replaces_files_in_one_step(tmp_path, monkeypatch):
+    source = write(tmp_path / "kuban.eng", "new")
+    destination = write(tmp_path / "scg_training.eng", "old")
+    linked = str(tmp_path / "available.eng")
+    os.link(destination, linked)  # e.g., an available missions file linked into the mission directory
+    inode = os.stat(destination).st_ino
+
+    replaced = []
+    os_replace = os.replace
+    monkeypatch.setattr(file_staging.os, 'replace', lambda src, dst: replaced.append(dst) or os_replace(src, dst))
+    assert stage_file(source, destination, link=False)
+    write_file(destination, "written")
+    assert write_if_changed(destination, "written again")
+    assert replaced == [destination] * 3
+    assert os.stat(destination).st_ino != inode
+    assert open(linked).read() == "old"  # never changed through its other name
+    assert not [name for name in os.listdir(tmp_path) if '.tmp' in name]  # no temporary files left behind
+
+
+def test_write_if_changed(tmp_path):
+    filename = str(tmp_path / "scg_training.list")
+    assert write_if_changed(filename, "scg_training.eng\n")
+    mtime = os.stat(filename).st_mtime_ns
+    assert not write_if_changed(filename, "scg_training.eng\n")
+    assert os.stat(filename).st_mtime_ns == mtime
+    assert write_if_changed(filename, "text", encoding="utf16") and open(filename, encoding="utf16").read() == "text"
+
+
+def test_unshare_file(tmp_path):
+    source = write(tmp_path / "cache.msnbin", "cached")
+    filename = str(tmp_path / "scg_training.msnbin")
+    assert not unshare_file(filename)  # missing
+    os.link(source, filename)
+    assert unshare_file(filename)
+    assert not os.path.samefile(source, filename) and same_content(source, filename)
+    assert not unshare_file(filename)  # already private
+    with open(filename, 'w') as f:  # may now be written in place (e.g., by MissionResaver.exe)
+        f.write("resaved")
+    assert open(source).read() == "cached"
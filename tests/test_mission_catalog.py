@@ -0,0 +1,70 @@
+"""
+    MissionCatalog picking up added, changed and removed missions and reusing its pickle between runs.
+"""
+
+import os
+
+import mission_catalog
+from mission_catalog import MissionCatalog
+
+
+def add_mission(mission_dir, name, sort_key, description):
+    (mission_dir / f"{name}.Mission").write_text("Options\n{\n}\n")
+    (mission_dir / f"{name}.txt").write_text(f"{sort_key}\n{description}")
+    return str(mission_dir / name)
+
+
+def names(catalog):
+    return [os.path.basename(m.filename) for m in catalog.missions]
+
+
+def test_refresh_and_find(tmp_path):
+    mission_dir = tmp_path / "available missions"
+    mission_dir.mkdir()
+    kuban = add_mission(mission_dir, 'kuban', '2', "Kuban")
+    stuka = add_mission(mission_dir, 'stuka', '1', "Arcade Game: Stuka attack")
+    catalog = MissionCatalog(str(mission_dir), str(tmp_path / "catalog.pickle"))
+    assert catalog.refresh()
+    assert names(catalog) == ['stuka', 'kuban']  # sorted by sort key
+    assert [m.arcade for m in catalog.missions] == [True, False] and catalog.missions[1].description == "Kuban"
+    assert catalog.find(kuban) == 1 and catalog.find(str(mission_dir / 'gone')) is None
+    assert not catalog.refresh()
+
+    with open(kuban + ".txt", 'a') as f:
+        f.write(" in summer")
+    os.utime(kuban + ".txt", ns=(0, os.stat(kuban + ".txt").st_mtime_ns + 10 ** 9))
+    assert catalog.refresh() and catalog.missions[1].description == "Kuban in summer"
+
+    os.remove(stuka + ".Mission")
+    add_mission(mission_dir, 'moscow', '3', "Moscow")
+    os.utime(mission_dir, ns=(0, os.stat(mission_dir).st_mtime_ns + 10 ** 9))  # directory changed
+    assert catalog.refresh()
+    assert names(catalog) == ['kuban', 'moscow'] and catalog.find(stuka) is None and catalog.find(kuban) == 0
+
+
+def test_description_files_are_only_read_when_changed(tmp_path, monkeypatch):
+    mission_dir = tmp_path / "available missions"
+    mission_dir.mkdir()
+    add_mission(mission_dir, 'kuban', '1', "Kuban")
+    add_mission(mission_dir, 'stuka', '2', "Stuka")
+    MissionCatalog(str(mission_dir), str(tmp_path / "catalog.pickle")).refresh()
+
+    read = []
+    read_description = mission_catalog.read_description
+    monkeypatch.setattr(mission_catalog, 'read_description', lambda f: read.append(f) or read_description(f))
+    catalog = MissionCatalog(str(mission_dir), str(tmp_path / "catalog.pickle"))  # e.g., daemon restarted
+    assert not catalog.refresh() and names(catalog) == ['kuban', 'stuka']
+    assert read == []
+
+    (mission_dir / "stuka.txt").write_text("0\nStuka attack")
+    assert catalog.refresh() and names(catalog) == ['stuka', 'kuban']
+    assert read == [str(mission_dir / "stuka.txt")]
+
+
+def test_unreadable_catalog_file_starts_empty(tmp_path):
+    mission_dir = tmp_path / "available missions"
+    mission_dir.mkdir()
+    add_mission(mission_dir, 'kuban', '1', "Kuban")
+    (tmp_path / "catalog.pickle").write_bytes(b"not a pickle")
+    catalog = MissionCatalog(str(mission_dir), str(tmp_path / "catalog.pickle"))
+    assert catalog.refresh() and names(catalog) == ['kuban']
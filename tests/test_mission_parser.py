@@ -0,0 +1,85 @@
+"""
+    Mission file parsing round trips and the environment edits (time, winds, clouds) of MissionEnvironment.
+"""
+
+import pytest
+
+from mission_parser import MissionFile
+from missionenvironment import MissionEnvironment
+
+MISSION = ("# Mission File Version = 1.0;\n\n"
+           "Options\n{\n  LCName = 0;\n  Time = 12:0:0;\n  CloudLevel = 1000;\n  CloudHeight = 500;\n"
+           "  CloudConfig = \"summer\\\\00_Clear_00\\\\sky.ini\";\n  Turbulence = 1;\n"
+           "  WindLayers\n  {\n     0 :     180 :     2;\n     500 :     180 :     3;\n  }\n"
+           "  Countries\n  {\n    0 : 0;\n  }\n}\n\n"
+           "Block\n{\n  Name = \"Block\";\n  Time = 99;\n}\n")
+BRIEFING = "<b>Start time:</b> 1200 hours<br><b>Clouds:</b> Clear<br>"
+CLOUDS = ("Heavy overcast\n  CloudLevel = 800;\n  CloudHeight = 900;\n"
+          "  CloudConfig = \"summer\\\\08_Overcast_01\\\\sky.ini\";\n")
+
+
+@pytest.fixture
+def env(tmp_path):
+    """ MissionEnvironment with one cloud file and MISSION and BRIEFING opened """
+    (tmp_path / "clouds00.txt").write_text(CLOUDS)
+    (tmp_path / "m.Mission").write_bytes(MISSION.encode("UTF-8"))
+    (tmp_path / "m.eng").write_text(BRIEFING, encoding="utf16")
+    environment = MissionEnvironment(str(tmp_path / "clouds*.txt"))
+    environment.open_mission_file(str(tmp_path / "m.Mission"))
+    environment.open_briefing_file(str(tmp_path / "m.eng"))
+    return environment
+
+
+@pytest.mark.parametrize('text', [MISSION, MISSION.replace('\n', '\r\n'), MISSION.rstrip(), ''])
+def test_round_trip(text):
+    mission = MissionFile(text)
+    assert mission.text() == text
+    if text:
+        assert mission.block('Options').block('WindLayers').field('Time') is None  # blocks are parsed on access
+    assert mission.text() == text  # and output unchanged
+
+
+def test_written_file_round_trips_byte_for_byte(env, tmp_path):
+    env.write_mission_file(str(tmp_path / "out.Mission"))
+    assert (tmp_path / "out.Mission").read_bytes() == MISSION.encode("UTF-8")
+
+
+def test_update_time(env):
+    assert env.update_time("7")
+    assert "  Time = 7:0:0;\n" in env.mission_data
+    assert "  Time = 99;\n" in env.mission_data  # same name in another block is left alone
+    assert "<b>Start time:</b> 0700 hours" in env.briefing_data
+    assert not env.update_time("24") and "between" in env.console_msg
+
+
+def test_update_wind(env):
+    assert env.update_wind("4@90 10@270")
+    options = MissionFile(env.mission_data).block('Options')
+    layers = [line.rstrip(';').split(':') for line in options.block('WindLayers').text().splitlines()[2:-1]]
+    assert [[int(v) for v in layer] for layer in layers] == [[0, 270, 4], [500, 90, 10], [1000, 90, 10],
+                                                             [2000, 90, 10], [5000, 90, 10]]
+    assert options.block('Countries').text() == "  Countries\n  {\n    0 : 0;\n  }\n"  # next block unchanged
+    assert not env.update_wind("4@400")
+
+
+def test_update_clouds(env):
+    assert env.update_clouds("0")
+    options = MissionFile(env.mission_data).block('Options')
+    assert options.field('CloudLevel').value == '800' and options.field('CloudHeight').value == '900'
+    assert options.field('CloudConfig').value == '"summer\\\\08_Overcast_01\\\\sky.ini"'
+    assert options.field('Turbulence').value == '1' and options.field('Time').value == '12:0:0'
+    assert "<b>Clouds:</b> Heavy overcast<br>" in env.briefing_data
+    assert not env.update_clouds("1")
+
+
+def test_update_clouds_without_cloud_fields(env, tmp_path):
+    (tmp_path / "m.Mission").write_text("Options\n{\n  Time = 12:0:0;\n}\n", encoding="UTF-8")
+    env.open_mission_file(str(tmp_path / "m.Mission"))
+    assert not env.update_clouds("0") and "CloudLevel" in env.console_msg
+    assert env.mission_data == "Options\n{\n  Time = 12:0:0;\n}\n"  # mission is left unchanged
+
+
+def test_mission_without_options(env, tmp_path):
+    (tmp_path / "m.Mission").write_text("Block\n{\n  Time = 12:0:0;\n}\n", encoding="UTF-8")
+    with pytest.raises(ValueError, match="no Options block"):
+        env.open_mission_file(str(tmp_path / "m.Mission"))
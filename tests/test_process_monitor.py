@@ -0,0 +1,41 @@
+"""
+    DServer resource monitor thresholds and status with a scripted sampler instead of a real process.
+"""
+
+import types
+
+from process_monitor import ProcessMonitor, MB
+
+
+def scripted(samples):
+    """ Returns sampler answering (rss MB, cpu seconds, handles) samples in turn """
+    samples = iter(samples)
+    return lambda pid: (lambda rss, cpu, handles: (rss * MB, cpu, handles))(*next(samples))
+
+
+def test_memory_growth_asks_for_restart_until_process_replaced():
+    monitor = ProcessMonitor(interval=60, max_rss_mb=0, max_rss_growth_mb=100, max_handles=0, max_cpu=0,
+                             sampler=scripted([(500, 0, 10), (550, 1, 10), (650, 2, 10), (100, 0, 10)]))
+    process = types.SimpleNamespace(pid=1)
+    monitor.poll(process, now=0)
+    monitor.poll(process, now=30)  # not due yet
+    monitor.poll(process, now=60)
+    assert monitor.restart_reason is None
+    monitor.poll(process, now=120)
+    assert "grew 150 MB" in monitor.restart_reason
+    assert "Restart when the server is empty" in monitor.status()
+
+    monitor.poll(types.SimpleNamespace(pid=2), now=180)  # restarted DServer
+    assert monitor.restart_reason is None
+    assert monitor.status().startswith("DServer monitor: memory 100 MB")
+
+
+def test_cpu_threshold_applies_only_while_exceeded():
+    monitor = ProcessMonitor(interval=60, max_rss_mb=0, max_rss_growth_mb=0, max_handles=0, max_cpu=90,
+                             cpu_window=120, sampler=scripted([(10, 0, 1), (10, 60, 1), (10, 120, 1), (10, 121, 1)]))
+    process = types.SimpleNamespace(pid=1)
+    for now in (0, 60, 120):
+        monitor.poll(process, now=now)
+    assert "CPU use 100%" in monitor.restart_reason
+    monitor.poll(process, now=180)
+    assert monitor.restart_reason is None
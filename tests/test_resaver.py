@@ -0,0 +1,63 @@
+"""
+    ResaverCache storing, restoring and pruning resaver outputs.
+"""
+
+import os
+import time
+
+from file_staging import unshare_file
+from resaver import ResaverCache, mission_key
+
+EXTS = ('.msnbin', '.list', '.eng')
+
+
+def write_outputs(mission_dir, text, exts=EXTS):
+    """ Writes resaver outputs of mission scg_training with content text (in place, like MissionResaver.exe) """
+    for ext in exts:
+        filename = mission_dir / f"scg_training{ext}"
+        unshare_file(str(filename))  # as done before running the resaver (outputs may be linked into the cache)
+        filename.write_text(f"{text}{ext}")
+
+
+def test_store_and_restore(tmp_path):
+    mission_dir, other_dir = tmp_path / "mission", tmp_path / "other"
+    mission_dir.mkdir()
+    other_dir.mkdir()
+    cache = ResaverCache(EXTS, cache_dir=str(tmp_path / "cache"))
+    key = mission_key('scg_training', "mission text", "briefing")
+    assert key != mission_key('scg_training', "mission text", "other briefing")
+    assert not cache.restore(key, str(other_dir), 'scg_training') and cache.misses == 1
+
+    write_outputs(mission_dir, "resaved", exts=('.msnbin', '.eng'))  # e.g., no .list file
+    cache.store(key, str(mission_dir), 'scg_training')
+    assert cache.contains(key) and sorted(os.listdir(cache.entry_dir(key))) == ['scg_training.eng',
+                                                                                'scg_training.msnbin']
+    write_outputs(mission_dir, "changed")  # later resaves do not change the cached entry
+    assert cache.restore(key, str(other_dir), 'scg_training') and cache.hits == 1
+    assert (other_dir / "scg_training.msnbin").read_text() == "resaved.msnbin"
+    assert (other_dir / "scg_training.eng").read_text() == "resaved.eng"
+    assert not (other_dir / "scg_training.list").exists()
+
+
+def test_prune_removes_least_recently_used_entries(tmp_path):
+    mission_dir = tmp_path / "mission"
+    mission_dir.mkdir()
+    cache = ResaverCache(EXTS, cache_dir=str(tmp_path / "cache"), max_entries=2)
+    keys = []
+    for i in range(3):
+        write_outputs(mission_dir, f"mission {i}")
+        keys.append(mission_key('scg_training', f"mission {i}", ""))
+        cache.store(keys[-1], str(mission_dir), 'scg_training')
+        os.utime(cache.entry_dir(keys[-1]), (time.time() - 100 + i, time.time() - 100 + i))
+        if i == 1:
+            assert cache.restore(keys[0], str(mission_dir), 'scg_training')  # entry 0 used again: entry 1 is older
+    assert [cache.contains(key) for key in keys] == [True, False, True]
+
+    abandoned = cache.entry_dir(f"{keys[0]}.tmp1.2")
+    in_progress = cache.entry_dir(f"{keys[1]}.tmp3.4")
+    os.makedirs(abandoned)
+    os.makedirs(in_progress)
+    os.utime(abandoned, (time.time() - 2 * cache.abandoned_time,) * 2)
+    cache.prune()
+    assert not os.path.exists(abandoned) and os.path.exists(in_progress)  # others may still be filling theirs
+    assert [cache.contains(key) for key in keys] == [True, False, True]
@@ -0,0 +1,122 @@
+"""
+    High scores database: results, leaderboards, aliases, period leaderboards, one-time migrations and the
+    highscores.py delete command.
+"""
+
+import sqlite3
+from datetime import datetime
+
+import highscores
+from highscores import GameResult
+from scores_db import ScoresDB
+
+
+def add_unconverted_result(filename, result_id):
+    """ Adds a result as stored by databases older than the scoring column (scoring NULL) """
+    with sqlite3.connect(filename) as conn:
+        conn.execute("INSERT INTO results (id, alias, player_id, plane, score, detailed_scoring, scoring, timedate)"
+                     " VALUES (?, 'Limbo', 'a-b', 'Ju 87 D-3', 100, '', NULL, '2026-01-01 12:00:00')", (result_id,))
+
+
+def scoring_of(filename, result_id):
+    with sqlite3.connect(filename) as conn:
+        return conn.execute("SELECT scoring FROM results WHERE id = ?", (result_id,)).fetchone()[0]
+
+
+def test_scoring_conversion_runs_once(tmp_path):
+    filename = str(tmp_path / "scores.sqlite")
+    ScoresDB(filename).close()
+    add_unconverted_result(filename, 1)
+    with sqlite3.connect(filename) as conn:
+        conn.execute("DELETE FROM meta WHERE key = 'scoring_converted'")  # database from before the conversion
+
+    with ScoresDB(filename) as db:
+        assert db.get_meta('scoring_converted') == '1'
+    assert scoring_of(filename, 1) is not None
+
+    add_unconverted_result(filename, 2)
+    ScoresDB(filename).close()
+    assert scoring_of(filename, 2) is None  # results table is not scanned again on later opens
+
+
+def result(alias, player_id, score, timedate=datetime(2026, 1, 5, 12), plane='Ju 87 D-3'):
+    return GameResult(alias, player_id, plane, score, '', timedate=timedate)
+
+
+def test_delete_by_alias_deletes_only_scores_entered_under_it(tmp_path, capsys):
+    filename = str(tmp_path / "scores.sqlite")
+    with ScoresDB(filename) as db:
+        for r in (result('Bob', 'p1', 10), result('Robert', 'p1', 20), result('Bob', 'p2', 30)):
+            db.insert(r)
+
+    highscores.main(['--db', filename, 'delete', '--alias', 'Rob'])  # lists the matches only
+    assert "Nothing deleted" in capsys.readouterr().out
+    with ScoresDB(filename) as db:
+        assert db.count() == 3
+        assert len(db.search(alias='Rob')) == 2  # both scores of p1 show its current alias
+
+    highscores.main(['--db', filename, 'delete', '--alias', 'Rob', '--yes'])
+    with ScoresDB(filename) as db:
+        assert sorted(s.score for s in db.all_scores()) == [10, 30]  # p1's score entered as Bob is kept
+
+
+def test_insert_and_search(tmp_path):
+    with ScoresDB(str(tmp_path / "scores.sqlite")) as db:
+        ids = [db.insert(r) for r in (result('Bob', 'p1', 10), result('Ann', 'p2', 30, plane='Bf 109 F-4'),
+                                      result('Bob', 'p1', 20, timedate=datetime(2026, 1, 6, 12)))]
+        assert ids == [1, 2, 3] and db.count() == 3 and db.last_result_id() == 3
+        assert [s.score for s in db.high_scores(2)] == [30, 20]
+        assert [s.score for s in db.high_scores(5, plane='Ju 87 D-3')] == [20, 10]
+        assert [s.result_id for s in db.search(since=datetime(2026, 1, 6), sort='score', descending=True)] == [3]
+        assert [s.result_id for s in db.search(player_id='p1', min_score=15)] == [3]
+
+
+def test_leaderboards_follow_inserts_deletes_and_undo(tmp_path):
+    with ScoresDB(str(tmp_path / "scores.sqlite")) as db:
+        for r in (result('Bob', 'p1', 10), result('Ann', 'p2', 30), result('Bob', 'p1', 50), result('Bob', 'p1', 40)):
+            db.insert(r)
+        assert [(s.player_id, s.score) for s in db.best_players(5, 'Ju 87 D-3')] == [('p1', 50), ('p2', 30)]
+        assert [(s.player_id, s.result_id) for s in db.recent_players(5)] == [('p1', 4), ('p2', 2)]
+
+        assert db.delete([3, 4]) == 2
+        assert [(s.player_id, s.score) for s in db.best_players(5, 'Ju 87 D-3')] == [('p2', 30), ('p1', 10)]
+        assert [s.result_id for s in db.recent_players(5)] == [2, 1]
+        assert [s.score for s in db.period_leaderboard('alltime', 5)] == [30, 10]
+
+        assert db.undo_delete() == 2
+        assert [(s.player_id, s.score) for s in db.best_players(5, 'Ju 87 D-3')] == [('p1', 50), ('p2', 30)]
+        assert [s.result_id for s in db.recent_players(5)] == [4, 2]
+        assert [s.score for s in db.period_leaderboard('alltime', 5)] == [50, 30]
+        assert db.undo_delete() == 0
+        assert db.insert(result('Cy', 'p3', 5)) == 5  # ids of deleted results are not reused
+
+
+def test_new_alias_is_shown_for_all_scores_of_player(tmp_path):
+    with ScoresDB(str(tmp_path / "scores.sqlite")) as db:
+        db.insert(result('Bob', 'p1', 10))
+        db.insert(result('Ann', 'p2', 30))
+        db.insert(result('Robert', 'p1', 20))
+        assert {s.score: s.alias for s in db.all_scores()} == {10: 'Robert', 20: 'Robert', 30: 'Ann'}
+        assert [s.alias for s in db.best_players(5, 'Ju 87 D-3')] == ['Ann', 'Robert']
+        assert [s.score for s in db.search(alias='bob')] == [10]  # stored alias still matches
+        assert db.conn.execute("SELECT alias FROM results WHERE id = 1").fetchone()[0] == 'Bob'  # not rewritten
+
+        db.rebuild_aliases()
+        assert db.all_scores()[0].alias == 'Robert'
+
+
+def test_period_leaderboards_prune_past_periods(tmp_path):
+    monday, tuesday, next_month = datetime(2026, 1, 5, 12), datetime(2026, 1, 6, 12), datetime(2026, 2, 2, 12)
+    with ScoresDB(str(tmp_path / "scores.sqlite")) as db:
+        db.insert(result('Bob', 'p1', 50, timedate=monday))
+        db.insert(result('Ann', 'p2', 20, timedate=tuesday))
+        assert [s.score for s in db.period_leaderboard('daily', 5, now=tuesday)] == [20]
+        assert [s.score for s in db.period_leaderboard('weekly', 5, now=tuesday)] == [50, 20]
+        assert [s.score for s in db.period_leaderboard('daily', 5, now=monday)] == []  # pruned by Tuesday's result
+
+        db.insert(result('Cy', 'p3', 10, timedate=next_month, plane='Bf 109 F-4'))
+        periods = dict(db.conn.execute("SELECT period, COUNT(DISTINCT period_start) FROM period_best GROUP BY period"))
+        assert periods == {'daily': 1, 'weekly': 1, 'monthly': 1, 'alltime': 1}
+        assert [s.score for s in db.period_leaderboard('monthly', 5, now=next_month)] == [10]
+        assert [s.score for s in db.period_leaderboard('alltime', 5, plane='Ju 87 D-3')] == [50, 20]
+        assert [s.score for s in db.period_leaderboard('alltime', 5)] == [50, 20, 10]
@@ -0,0 +1,82 @@
+"""
+    ScoresPage table segments, tooltip cache and writes of the high scores html page.
+"""
+
+import os
+from datetime import datetime
+
+import scores_page
+from highscores import GameResult
+from scores_page import ScoresPage
+
+TEMPLATE = ("<html>\n<div id=\"table0\">\n        <table>\n        </table>\n    </div> <!--table0-->\n<p>static</p>\n"
+            "<div id=\"table1\">\n        <table>\n        </table>\n    </div> <!--table1-->\n</html>\n")
+
+
+def result(result_id, alias, score):
+    game_result = GameResult(alias, f"p{result_id}", 'Ju 87 D-3', score, '', timedate=datetime(2026, 1, 5))
+    game_result.result_id = result_id
+    return game_result
+
+
+def write_template(tmp_path):
+    filename = tmp_path / "index.html"
+    filename.write_text(TEMPLATE)
+    return str(filename)
+
+
+def test_tables_are_rendered_into_their_segments(tmp_path):
+    filename = write_template(tmp_path)
+    page = ScoresPage(filename)
+    assert page.update_table(0, [result(1, 'Bob', 50), result(2, 'Ann', 30)], numbered=True)
+    assert page.update_table(1, [result(2, 'Ann', 30)], numbered=False)
+    assert not page.update_table(5, [], numbered=True)  # template has no table5
+    assert page.write() and not page.write()  # nothing changed since
+
+    html = open(filename).read()
+    assert html.startswith("<html>\n<div id=\"table0\">\n") and "<p>static</p>" in html
+    table0 = html[:html.index('<!--table0-->')]
+    assert table0.index('#1</td><td>Bob') < table0.index('#2</td><td>Ann')
+    assert html.count('<td>Ann</td>') == 2
+
+
+def test_unchanged_table_is_not_rendered(tmp_path, monkeypatch):
+    page = ScoresPage(write_template(tmp_path))
+    scores = [result(1, 'Bob', 50)]
+    assert page.update_table(0, scores, numbered=True)
+    monkeypatch.setattr(scores_page, 'header', lambda: 1 / 0)  # a render would fail
+    assert not page.update_table(0, [result(1, 'Bob', 50)], numbered=True)
+    monkeypatch.undo()
+    assert page.update_table(0, [result(1, 'Robert', 50)], numbered=True)  # new alias is rendered
+
+
+def test_tooltips_are_cached_by_result_id(tmp_path, monkeypatch):
+    rendered = []
+    popup_tooltip = scores_page.popup_tooltip
+    monkeypatch.setattr(scores_page, 'popup_tooltip',
+                        lambda scoring: rendered.append(scoring) or popup_tooltip(scoring))
+    page = ScoresPage(write_template(tmp_path), max_cached_tooltips=2)
+    page.update_table(0, [result(1, 'Bob', 50), result(2, 'Ann', 30)], numbered=True)
+    page.update_table(1, [result(2, 'Ann', 30), result(1, 'Bob', 50)], numbered=False)
+    assert len(rendered) == 2  # each result's tooltip is rendered once
+
+    page.update_table(0, [result(3, 'Cy', 10)], numbered=True)
+    assert len(rendered) == 3 and sorted(page.tooltips) == [2, 3]  # oldest tooltip was discarded
+    unsaved = result(None, 'Dee', 5)
+    page.update_table(1, [unsaved], numbered=False)
+    assert len(rendered) == 4 and None not in page.tooltips  # results not yet stored are not cached
+
+
+def test_template_changed_by_someone_else_is_read_again(tmp_path):
+    filename = write_template(tmp_path)
+    page = ScoresPage(filename)
+    page.update_table(0, [result(1, 'Bob', 50)], numbered=True)
+    page.write()
+    with open(filename, 'w') as f:
+        f.write(TEMPLATE.replace('static', 'edited'))
+    os.utime(filename, ns=(0, page.file_mtime + 1))  # modification time differs even on coarse clocks
+
+    page.update_table(0, [result(1, 'Bob', 50)], numbered=True)
+    page.write()
+    html = open(filename).read()
+    assert '<p>edited</p>' in html and '<td>Bob</td>' in html
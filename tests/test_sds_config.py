@@ -0,0 +1,71 @@
+"""
+    SdsConfig reading and changing settings of DServer.exe sds files and writing only files that changed.
+"""
+
+import os
+
+import pytest
+
+from dserver_run_functions import read_sds_file, write_sds_file
+from sds_config import SdsConfig, read_sds_config
+from constants import DSERVER_AIM
+
+SDS = ("// DServer config\n[KEY = system]\n\tport = 28000\n\trconPort = 8991\n\tname = \"SCG = server\"\n"
+       "aimingHelp = false\nobjectIcons = true\nunlimitAmmo = false\ninvulnerability = false\n"
+       "[rotation]\n\tfile = \"Multiplayer/scg_training0\"\n\tfile = \"Multiplayer/scg_training1\"\n[end]\n")
+
+
+@pytest.fixture
+def sds_file(tmp_path):
+    filename = tmp_path / "work.sds"
+    filename.write_text(SDS, encoding="UTF-8")
+    return str(filename)
+
+
+def test_get():
+    config = SdsConfig(SDS)
+    assert config.get_int('rconPort') == 8991 and config.get_int('missing', 5) == 5
+    assert config.get('name') == '"SCG = server"'  # value may contain '='
+    assert config.get_bool('objectIcons') and not config.get_bool('unlimitAmmo')
+    assert config.get_all('file') == ['"Multiplayer/scg_training0"', '"Multiplayer/scg_training1"']
+    assert 'port' in config and 'KEY' not in config and config.get('missing') is None
+    with pytest.raises(KeyError):
+        config.get_bool('missing')
+    with pytest.raises(ValueError):
+        config.get_int('name')
+
+
+def test_set_keeps_the_rest_of_the_file():
+    config = SdsConfig(SDS)
+    assert not config.set('aimingHelp', False)
+    assert config.set('aimingHelp', True) and config.set('rconPort', 8992)
+    assert config.text() == SDS.replace("aimingHelp = false", "aimingHelp = true").replace("8991", "8992")
+    with pytest.raises(KeyError):
+        config.set('missing', 1)
+
+
+def test_unchanged_file_is_not_rewritten(sds_file):
+    config = read_sds_config(sds_file)
+    inode = os.stat(sds_file).st_ino
+    assert not config.write()
+    config.set('objectIcons', True)  # same value
+    assert not config.write() and os.stat(sds_file).st_ino == inode
+
+    config.set('objectIcons', False)
+    assert config.write() and not config.write()
+    assert read_sds_config(sds_file).text() == SDS.replace("objectIcons = true", "objectIcons = false")
+
+    other = os.path.join(os.path.dirname(sds_file), "standby.sds")
+    assert config.write(other) and not config.write(other)  # e.g., standby config derived from working config
+
+
+def test_server_settings_are_only_written_when_toggled(sds_file):
+    server_vars, config = read_sds_file(sds_file)
+    inode = os.stat(sds_file).st_ino
+    assert not write_sds_file(sds_file, server_vars, config) and os.stat(sds_file).st_ino == inode
+
+    server_vars[DSERVER_AIM].toggle_bool()
+    assert write_sds_file(sds_file, server_vars, config)
+    server_vars, config = read_sds_file(sds_file)
+    assert server_vars[DSERVER_AIM].bool_value and config.get_bool('aimingHelp')
+    assert config.text() == SDS.replace("aimingHelp = false", "aimingHelp = true")
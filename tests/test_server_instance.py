@@ -0,0 +1,140 @@
+"""
+    Two server instances run in one event loop against utilities/fake_dserver.py: an error in a step of one instance
+    neither stops its other steps nor the other instance, and stop() ends run_async().
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+import dserver_run_functions
+import server_instance
+from score_worker import ScoreWorker
+from server_instance import ServerConfig, ServerInstance, run_instances
+from web_upload import UploadQueue
+from test_dserver_standby import FAKE_DSERVER, free_port, write_config
+
+MISSION = "# Mission File Version = 1.0;\n\nOptions\n{\n  LCName = 0;\n  Time = 12:0:0;\n}\n"
+
+
+def make_config(root, name):
+    """ ServerConfig of an instance with its own mission directory, sds files, logs and ports in root """
+    mission_dir = str(root / name) + os.sep
+    available_dir = mission_dir + "available missions" "\\"  # Mission appends the directory with a backslash
+    os.makedirs(available_dir)
+    source = os.path.join(available_dir, "base")
+    with open(source + ".Mission", 'w', encoding="UTF-8") as f:
+        f.write(MISSION)
+    with open(source + ".txt", 'w') as f:
+        f.write("0\nBase mission\n")
+    with open(source + ".eng", 'w', encoding="utf16") as f:
+        f.write("<b>Start time:</b> 1200 hours<br>")
+    with open(source + ".list", 'w') as f:
+        f.write("base.eng\nbase.msnbin\n")
+    with open(source + ".msnbin", 'wb') as f:
+        f.write(b'\0' * 16)
+
+    rcon_port = free_port()
+    base_config = write_config(root / f"{name}_base.sds", rcon_port, free_port())
+    return ServerConfig(name, il2_base_dir=str(root) + os.sep, mission_dir=mission_dir, mission_basename='scg_training',
+                        base_mission_num=0, dserver_dir=str(root), working_config=str(root / f"{name}_work.sds"),
+                        base_config=base_config, standby_config=str(root / f"{name}_standby.sds"),
+                        dserver_ip='127.0.0.1', rcon_port=rcon_port,
+                        port_settings={'rconPort': (rcon_port, free_port())},
+                        chatlog_wildcard=mission_dir + "chat*.txt", chatlog_backup_dir=mission_dir,
+                        pilot_log_file=mission_dir + "pilots.txt",
+                        mission_logs_wildcard=mission_dir + "missionReport*.txt", mission_log_backup_dir=mission_dir,
+                        mission_cache_file=mission_dir + "cache.pickle",
+                        mission_catalog_file=mission_dir + "catalog.pickle",
+                        arcade_journal_file=mission_dir + "journal.txt", preset_stats_file=mission_dir + "stats.pickle",
+                        prebuild_dir=mission_dir + "prebuild" + os.sep)
+
+
+@pytest.fixture
+def instances(tmp_path, monkeypatch):
+    """ Two server instances running the fake DServer; their DServers are stopped at the end of the test """
+    monkeypatch.setattr(dserver_run_functions, 'IL2_DSERVER_EXE', FAKE_DSERVER)
+    for interval in ('CHAT_INTERVAL', 'ARCADE_INTERVAL', 'SERVER_CHECK_INTERVAL', 'HOUSEKEEPING_INTERVAL'):
+        monkeypatch.setattr(server_instance, interval, 0.1)
+    uploader = UploadQueue(client=object(), hashes_file=str(tmp_path / "hashes.pickle"))
+    score_worker = ScoreWorker(uploader=uploader, leaderboard_dir=str(tmp_path))
+    started = [ServerInstance(make_config(tmp_path, name), {}, score_worker) for name in ('a', 'b')]
+    yield started
+    for instance in started:
+        instance.stop()
+        if instance.dserver_proc is not None and instance.dserver_proc.poll() is None:
+            instance.dserver_proc.kill()
+            instance.dserver_proc.wait()
+
+
+def count_calls(instance, name, raises=False):
+    """ Wraps step name of instance to count its runs (raising RuntimeError after each run if raises) """
+    calls = []
+    step = getattr(instance, name)
+
+    def counted():
+        step()
+        calls.append(time.monotonic())
+        if raises:
+            raise RuntimeError(f"{name} failed")
+    setattr(instance, name, counted)
+    return calls
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_step_error_does_not_stop_instances(instances):
+    a, b = instances
+    a_chat = count_calls(a, 'chat_step', raises=True)
+    a_server = count_calls(a, 'server_step')
+    b_chat = count_calls(b, 'chat_step')
+    runner = threading.Thread(target=run_instances, args=(instances,))
+    runner.start()
+    try:
+        wait_for(lambda: len(a_chat) >= 3 and len(a_server) >= 3 and len(b_chat) >= 3)
+        assert runner.is_alive()
+        for instance in instances:
+            assert instance.r_con.probe() and instance.dserver_proc.poll() is None
+    finally:
+        for instance in instances:
+            instance.stop()
+        runner.join(30)
+    assert not runner.is_alive()  # stop() ended run_async() of both instances
+    assert a.executor._shutdown and b.executor._shutdown
+
+
+def test_start_error_does_not_stop_other_instance(instances):
+    a, b = instances
+    a.start = lambda: 1 / 0
+    b_chat = count_calls(b, 'chat_step')
+    runner = threading.Thread(target=run_instances, args=(instances,))
+    runner.start()
+    try:
+        wait_for(lambda: len(b_chat) >= 3)
+        assert runner.is_alive()
+    finally:
+        b.stop()
+        runner.join(30)
+    assert not runner.is_alive()
+
+
+def test_stop_ends_run_async(instances):
+    a = instances[0]
+
+    async def run_and_stop():
+        task = asyncio.create_task(a.run_async())
+        while a.dserver_proc is None or not a.iteration:  # started and its steps are running
+            await asyncio.sleep(0.05)
+        a.stop()
+        await asyncio.wait_for(task, 30)
+
+    asyncio.run(run_and_stop())
+    assert a.stop_event.is_set() and a.dserver_proc.poll() is None  # DServer keeps running
@@ -0,0 +1,124 @@
+"""
+    UploadQueue merging bursts of requests, skipping unchanged files and retrying failed uploads (against
+    utilities/neocities_standin.py).
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from test_dserver_standby import free_port
+from web_upload import UploadQueue, NeocitiesClient, NeocitiesError
+
+NEOCITIES_STANDIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'utilities',
+                                 'neocities_standin.py')
+
+
+class FakeClient:
+    """ Records uploads; fails the uploads listed in failures (by number of upload, counting from 1) """
+    def __init__(self, failures=()):
+        self.uploads = []  # (destination, data) of each upload call
+        self.failures = failures
+
+    def upload(self, destination, data):
+        self.uploads.append((destination, data))
+        if len(self.uploads) in self.failures:
+            raise NeocitiesError("Simulated server error.")
+        return 'ok'
+
+
+def wait_for(condition, timeout=20):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def write(filename, text):
+    with open(filename, 'w') as f:
+        f.write(text)
+    return str(filename)
+
+
+def test_burst_of_requests_is_one_upload_per_file(tmp_path):
+    client = FakeClient()
+    queue = UploadQueue(client, debounce=0.3, max_delay=5, retry_delays=(), hashes_file=str(tmp_path / "h.pickle"))
+    page = tmp_path / "page.html"
+    for i in range(3):  # e.g., three games finishing within a few seconds
+        queue.request(write(page, f"version {i}"), 'index.html')
+        queue.request(write(tmp_path / "daily.json", "[]"), 'daily.json')
+    time.sleep(0.1)
+    assert client.uploads == []  # waits for the burst to end
+    wait_for(lambda: queue.num_uploaded == 2)
+    assert sorted(client.uploads) == [('daily.json', b'[]'), ('index.html', b'version 2')]
+    assert queue.num_requests == 6
+
+
+def test_unchanged_file_is_not_uploaded_again(tmp_path):
+    client = FakeClient()
+    hashes_file = str(tmp_path / "h.pickle")
+    queue = UploadQueue(client, debounce=0, max_delay=0, retry_delays=(), hashes_file=hashes_file)
+    page = write(tmp_path / "page.html", "scores")
+    queue.request(page, 'index.html')
+    wait_for(lambda: queue.num_uploaded == 1)
+    queue.request(page, 'index.html')
+    wait_for(lambda: queue.num_skipped == 1)
+
+    restarted = UploadQueue(client, debounce=0, max_delay=0, retry_delays=(), hashes_file=hashes_file)
+    restarted.request(page, 'index.html')  # hashes of the last uploads survive a restart
+    wait_for(lambda: restarted.num_skipped == 1)
+    write(page, "new scores")
+    restarted.request(page, 'index.html')
+    wait_for(lambda: restarted.num_uploaded == 1)
+    assert [data for destination, data in client.uploads] == [b'scores', b'new scores']
+
+
+def test_failed_upload_is_retried(tmp_path):
+    client = FakeClient(failures=(1, 2))
+    queue = UploadQueue(client, debounce=0, max_delay=0, retry_delays=(0.05, 0.05),
+                        hashes_file=str(tmp_path / "h.pickle"))
+    queue.request(write(tmp_path / "page.html", "scores"), 'index.html')
+    wait_for(lambda: queue.num_uploaded == 1)
+    assert len(client.uploads) == 3 and queue.num_failed == 0
+
+    client.failures = (4, 5, 6)  # every try fails
+    queue.request(write(tmp_path / "page.html", "more scores"), 'index.html')
+    wait_for(lambda: queue.num_failed == 1)
+    assert len(client.uploads) == 6 and "failed" in queue.last_result
+
+
+@pytest.fixture
+def standin(tmp_path):
+    """ (api url, site directory) of a Neocities stand-in failing every second upload """
+    port = free_port()
+    site = tmp_path / "site"
+    process = subprocess.Popen([sys.executable, NEOCITIES_STANDIN, '--port', str(port), '--dir', str(site),
+                                '--fail-every', '2'])
+    deadline = time.monotonic() + 20
+    while True:
+        try:
+            socket.create_connection(('localhost', port), timeout=1).close()
+            break
+        except OSError:
+            assert time.monotonic() < deadline and process.poll() is None, "stand-in did not start"
+            time.sleep(0.1)
+    yield f"http://localhost:{port}/api", site
+    process.kill()
+    process.wait()
+
+
+def test_upload_to_standin_is_retried(tmp_path, standin):
+    api_url, site = standin
+    queue = UploadQueue(NeocitiesClient(api_url=api_url, timeout=10), debounce=0, max_delay=0,
+                        retry_delays=(0.1,), hashes_file=str(tmp_path / "h.pickle"))
+    page = write(tmp_path / "page.html", "scores")
+    queue.request(page, 'index.html')
+    wait_for(lambda: queue.num_uploaded == 1)
+    write(page, "new scores")
+    queue.request(page, 'index.html')  # second upload gets a server error and is retried
+    wait_for(lambda: queue.num_uploaded == 2)
+    assert (site / "index.html").read_text() == "new scores" and queue.num_failed == 0
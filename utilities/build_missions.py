@@ -0,0 +1,125 @@
+"""
+    Mission build pipeline: runs every step of deploying a changed mission for a list of missions in parallel (one
+    process per mission, up to --workers at a time):
+        1. substitute planes into all airfields (substitute_planes.py)
+        2. copy english briefing (.eng) over the other language briefings
+        3. run MissionResaver.exe to create the mission binary (.msnbin), .list and localisation files
+        4. stage the mission files into the server's "available missions" directory (copy_scenario.py)
+    A mission is only staged if all of its earlier steps succeeded.  A timing breakdown of each mission is printed at
+    the end.
+
+    Usage: python build_missions.py [--no-planes] [--workers N] kuban_main levelbombing ...
+    (without mission names the missions listed in substitute_planes.py are built)
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # daemon's modules (run from anywhere)
+from resaver import resaver_command, resaver_succeeded
+from file_staging import stage_file
+from substitute_planes import read_planes, substitute_mission_planes, plane_sourcefile, base_dir, mission_ext, \
+    mission_names
+
+il2_dir = r'J:\SteamLibrary\steamapps\common\IL-2 Sturmovik Battle of Stalingrad' + '\\'  # IL-2 install running the resaver
+dest_dir = r"\\JUNEKIN\il2\data\Multiplayer\Dogfight\scg multiplayer server\available missions" + '\\'
+language_exts = (".chs", ".fra", ".ger", ".pol", ".rus", ".spa")  # foreign language briefing extensions
+
+STAGES = ('planes', 'languages', 'resaver', 'staging')
+
+
+def build_mission(mission_name, source_dir, planes_str, il2_base_dir, il2_resaver_dir):
+    """
+        Process pool task: runs plane substitution, language briefing duplication and the resaver for one mission.
+        Returns (mission name, {stage: seconds}, error message or None).
+    """
+    timings = {}
+    mission_filename = source_dir + mission_name + mission_ext
+    try:
+        start = time.time()
+        if planes_str is not None:
+            substitute_mission_planes(mission_filename, planes_str)
+            timings['planes'] = time.time() - start
+
+        start = time.time()
+        eng_file = source_dir + mission_name + ".eng"
+        for ext in language_exts:
+            shutil.copy(eng_file, source_dir + mission_name + ext)
+        timings['languages'] = time.time() - start
+
+        start = time.time()
+        result = subprocess.run(resaver_command(il2_resaver_dir, il2_base_dir, mission_filename), cwd=il2_resaver_dir,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        timings['resaver'] = time.time() - start
+        if not resaver_succeeded(result.stdout):
+            return mission_name, timings, f"MissionResaver.exe failed: {result.stdout[-300:]}"
+    except (OSError, AttributeError) as e:  # AttributeError: airfield without StartInAir/Altitude in substitution
+        return mission_name, timings, f"{type(e).__name__}: {e}"
+    return mission_name, timings, None
+
+
+def stage_mission(mission_name, source_dir, destination_dir):
+    """
+        copies all of the mission's files to destination_dir; returns number of files copied (unchanged files are
+        skipped).  Files are replaced in one step, never rewritten in place, as the daemon may be using them.
+    """
+    filenames = glob.glob(source_dir + mission_name + ".*")
+    return sum(stage_file(f, os.path.join(destination_dir, os.path.basename(f)), link=False) for f in filenames)
+
+
+def print_report(results, total_time):
+    """ prints timing breakdown (seconds) of each mission built """
+    print(f"\n{'mission':<24}" + ''.join(f"{s:>11}" for s in STAGES) + f"{'total':>11}  result")
+    for mission_name, timings, error in results:
+        row = ''.join(f"{timings[s]:>11.1f}" if s in timings else f"{'-':>11}" for s in STAGES)
+        print(f"{mission_name:<24}{row}{sum(timings.values()):>11.1f}  {error if error else 'ok'}")
+    print(f"{len(results)} missions built in {total_time:.1f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Builds and stages IL-2 missions in parallel.")
+    parser.add_argument('missions', nargs='*', default=list(mission_names), help="mission names (without extension)")
+    parser.add_argument('--source-dir', default=base_dir, help="directory of the mission files being built")
+    parser.add_argument('--dest-dir', default=dest_dir, help="server's available missions directory")
+    parser.add_argument('--il2-dir', default=il2_dir, help="IL-2 directory of the resaver and game data")
+    parser.add_argument('--planes', default=plane_sourcefile, help="plane source text file")
+    parser.add_argument('--no-planes', action='store_true', help="skip plane substitution")
+    parser.add_argument('--no-staging', action='store_true', help="do not copy built missions to --dest-dir")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="number of missions built at a time")
+    args = parser.parse_args(argv)
+
+    source_dir = os.path.join(args.source_dir, '')
+    il2_base_dir = os.path.join(args.il2_dir, '')
+    il2_resaver_dir = il2_base_dir + r'bin\resaver' + '\\'
+    planes_str = None if args.no_planes else read_planes(args.planes)
+    start = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(args.missions)))) as executor:
+        futures = [executor.submit(build_mission, name, source_dir, planes_str, il2_base_dir, il2_resaver_dir)
+                   for name in args.missions]
+        for future in as_completed(futures):
+            mission_name, timings, error = future.result()
+            if error is None and not args.no_staging:  # stage each mission as soon as it is built
+                stage_start = time.time()
+                try:
+                    num_files = stage_mission(mission_name, source_dir, os.path.join(args.dest_dir, ''))
+                    print(f"{mission_name}: staged {num_files} files (others unchanged)")
+                except OSError as e:
+                    error = f"staging failed: {e}"
+                timings['staging'] = time.time() - stage_start
+            print(f"{mission_name}: {error if error else 'built'}")
+            results.append((mission_name, timings, error))
+
+    results.sort(key=lambda r: args.missions.index(r[0]))
+    print_report(results, time.time() - start)
+    return 0 if all(error is None for name, timings, error in results) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -2,9 +2,14 @@
     over other foreign language briefings (.chs, .fra, etc.) """
 
 import glob
+import os
 import shutil
+import sys
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # daemon's modules (run from anywhere)
+from file_staging import stage_file
+
 mission_names = [
     'kuban_main',
     # 'kuban_convoy_attack',
@@ -34,7 +39,8 @@ for scenario_name in mission_names:
     sourcefiles = source_dir + f"\\{scenario_name}.*"
     filenames = glob.glob(sourcefiles)
     for f in filenames:
-        x = shutil.copy(f, dest_dir)
+        x = os.path.join(dest_dir, os.path.basename(f))
+        stage_file(f, x, link=False)  # replaces (never rewrites) files the daemon may be using
         print(f"{f} -> {x}")
 
 current_time = time.strftime("%H:%M:%S")
@@ -0,0 +1,84 @@
+"""
+    Stand-in for DServer.exe so DServer starts, stops, reboots and standby switchovers can be tested without IL-2.
+    Reads the sds config file DServer.exe would be given and answers the remote console on its port (rconPort) with
+    the same packet format and return codes as DServer.exe.  Every command received is printed.
+    Set IL2_DSERVER_EXE in constants.py to this file's path to use it (start_dserver runs .py files with python).
+
+    Usage: python fake_dserver.py config.sds [--start-delay seconds] [--players N]
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # daemon's modules (run from anywhere)
+from constants import DSERVER_PORT, DSERVER_RCON_PORT_KEY, DSERVER_USERNAME, DSERVER_PASSWORD
+from sds_config import read_sds_config
+from remote_console import pack_message, unpack_message
+
+
+class FakeDServer:
+    """ Remote console of a DServer.exe with a fixed list of players """
+    def __init__(self, port, login, password, num_players=0):
+        self.port = port
+        self.login = login
+        self.password = password
+        self.players = [f"{i + 1},Pilot{i + 1},{i:08x}-0000-0000-0000-000000000000,{i:08x}-1111-1111-1111-111111111111"
+                        for i in range(num_players)]
+
+    def answer(self, command, authorized):
+        """ Returns (DServer response string, authorized) to command """
+        words = command.split(' ')
+        if words[0] == 'auth':
+            authorized = words[1:] == [self.login, self.password]
+            return f"STATUS={1 if authorized else 6}", authorized
+        if not authorized:
+            return "STATUS=6", authorized
+        if words[0] == 'getplayerlist':
+            return "STATUS=1&playerList=" + '%7c'.join(['cId%2cnickName%2cplayerId%2cprofileId'] + self.players), True
+        if words[0] == 'serverinput' and words[1:] == ['reboot']:
+            self.players = []  # reboot trigger kicks everybody
+        return "STATUS=1", True
+
+    def handle(self, client):
+        authorized = False
+        with client:
+            while True:
+                try:
+                    data = client.recv(4096)
+                    if not data:
+                        return
+                    command = unpack_message(data)[1].decode()
+                except (OSError, ValueError):
+                    return
+                response, authorized = self.answer(command, authorized)
+                print(f"{time.strftime('%H:%M:%S')} port {self.port}: '{command}' -> {response}", flush=True)
+                client.sendall(pack_message(response))
+
+    def serve(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+            server.bind(('', self.port))
+            server.listen()
+            print(f"Fake DServer remote console listening on port {self.port}", flush=True)
+            while True:
+                client, address = server.accept()
+                threading.Thread(target=self.handle, args=(client,), daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake DServer.exe remote console for testing.")
+    parser.add_argument('config', help="sds config file")
+    parser.add_argument('--start-delay', type=float, default=3, help="seconds before the remote console answers")
+    parser.add_argument('--players', type=int, default=0, help="number of players reported")
+    args = parser.parse_args()
+
+    port = read_sds_config(args.config).get_int(DSERVER_RCON_PORT_KEY, DSERVER_PORT)
+    time.sleep(args.start_delay)  # DServer.exe takes a while to start
+    FakeDServer(port, DSERVER_USERNAME, DSERVER_PASSWORD, args.players).serve()
+
+
+if __name__ == '__main__':
+    main()
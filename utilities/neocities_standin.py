@@ -0,0 +1,97 @@
+"""
+    Local stand-in for the Neocities API so high score uploads can be tested offline.
+    Accepts POST /api/upload (basic authentication, multipart form with one field per file named by its destination
+    path) like neocities.org and stores uploaded files in a local directory, which is also served for viewing.
+    Set NEOCITIES_API_URL in constants.py to 'http://localhost:8080/api' to use it.
+
+    Usage: python neocities_standin.py [--port 8080] [--dir site] [--fail-every N] [--delay seconds]
+"""
+
+import argparse
+import base64
+import email.parser
+import email.policy
+import hashlib
+import json
+import os
+import sys
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # daemon's modules (run from anywhere)
+from constants import NEOCITIES_USER, NEOCITIES_PASSWORD
+
+
+class NeocitiesHandler(SimpleHTTPRequestHandler):
+    """ Serves uploaded files (GET) and the Neocities upload API call (POST /api/upload) """
+    options = None  # parsed command line arguments
+    num_requests = 0
+
+    def send_json(self, status, result):
+        body = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, error_type, message):
+        self.send_json(status, {'result': 'error', 'error_type': error_type, 'message': message})
+
+    def authorized(self):
+        expected = base64.b64encode(f"{self.options.user}:{self.options.password}".encode()).decode()
+        return self.headers.get('Authorization', '') == f"Basic {expected}"
+
+    def do_POST(self):
+        NeocitiesHandler.num_requests += 1
+        time.sleep(self.options.delay)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        if self.path.rstrip('/') != '/api/upload':
+            return self.send_error_json(404, 'not_found', f"Unknown API call '{self.path}'")
+        if not self.authorized():
+            return self.send_error_json(401, 'invalid_auth', 'Invalid auth, please try again.')
+        if self.options.fail_every and NeocitiesHandler.num_requests % self.options.fail_every == 0:
+            return self.send_error_json(500, 'server_error', 'Simulated server error.')
+
+        # parse multipart form data with the email parser (form data is a MIME multipart message)
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode() + body)
+        if not message.is_multipart():
+            return self.send_error_json(400, 'missing_files', 'You must provide files to upload.')
+
+        for part in message.iter_parts():
+            destination = part.get_param('name', header='content-disposition')
+            data = part.get_payload(decode=True) or b''
+            path = os.path.normpath(os.path.join(self.options.dir, destination.lstrip('/')))
+            if not path.startswith(os.path.abspath(self.options.dir)):
+                return self.send_error_json(400, 'invalid_file_path', f"Invalid file path '{destination}'.")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            print(f"Uploaded '{destination}': {len(data)} bytes, sha1 {hashlib.sha1(data).hexdigest()}")
+        self.send_json(200, {'result': 'success', 'message': 'your file(s) have been successfully uploaded'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Neocities upload API')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--dir', default='neocities_site', help='directory uploaded files are stored in')
+    parser.add_argument('--user', default=NEOCITIES_USER)
+    parser.add_argument('--password', default=NEOCITIES_PASSWORD)
+    parser.add_argument('--fail-every', type=int, default=0, help='fail every Nth upload with a server error')
+    parser.add_argument('--delay', type=float, default=0, help='seconds to wait before responding to an upload')
+    options = parser.parse_args()
+    options.dir = os.path.abspath(options.dir)
+    os.makedirs(options.dir, exist_ok=True)
+
+    NeocitiesHandler.options = options
+    server = ThreadingHTTPServer(('localhost', options.port), partial(NeocitiesHandler, directory=options.dir))
+    print(f"Neocities stand-in serving '{options.dir}' at http://localhost:{options.port}/api")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
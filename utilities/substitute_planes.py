@@ -10,6 +10,7 @@
     3. run this script after plane!
     4. Run resaver.exe batch file in the (il2/bin directory) for all of the affected missions as defined by mission_names.
     5. copy mission files to server destination using copy_scenario.py script
+    (build_missions.py runs steps 3 to 5 for a list of missions in parallel)
 
 
 """
@@ -24,24 +25,18 @@ mission_names = ('kuban_main',
                  'stalingrad_tanks1',
                  'air_test')
 
-# read plane source file
-with open(plane_sourcefile, encoding="UTF-8") as file_object:
-    planes_str = file_object.read()
+planes_regexp = r'Planes\n\s+\{[\s\S]+?\}\n\s+\}'  # regular expression to match all "Planes" definitions listed in mission file
 
 
-for mission_name in mission_names:
-    mission_filename = base_dir + mission_name + mission_ext  # IL-2 Mission File
-    write_filename = None  # replace mission sourcefile
-    # write_filename = base_dir + 'yyy.mission'  # output file
+def read_planes(filename=plane_sourcefile):
+    """ returns plane source text (see step 2 above) """
+    with open(filename, encoding="UTF-8") as file_object:
+        return file_object.read()
 
-    # read mission file
-    with open(mission_filename, encoding="UTF-8") as file_object:
-        mission_str = file_object.read()
-
-    planes_regexp = r'Planes\n\s+\{[\s\S]+?\}\n\s+\}'  # regular expression to match all "Planes" definitions listed in mission file
 
+def substitute_planes(mission_str, planes_str):
+    """ returns mission_str with every airfield's planes replaced by planes_str and the number of airfields updated """
     num_planes = len(re.findall(planes_regexp, mission_str))  # determine # of airfieds that need to be updated
-    print('total number of planes objects: ', num_planes)
 
     for i in range(num_planes):
         # print(i, ":")
@@ -83,9 +78,19 @@ for mission_name in mission_names:
 
         # do regular expression substitution
         p = p.replace("\\", "\\\\")  # substitution string needs to have backslashes preceded by an additional one for the re.sub function to work correctly below  -- quirk of python re libary
-        x_str = re.sub(planes_regexp, p, mission_str[start:end])
         mission_str = mission_str[:start] + re.sub(planes_regexp, p, mission_str[start:end]) + mission_str[end + 1:]
 
+    return mission_str, num_planes
+
+
+def substitute_mission_planes(mission_filename, planes_str, write_filename=None):
+    """ substitutes planes_str into all airfields of mission file; writes to write_filename (default: mission file) """
+    # read mission file
+    with open(mission_filename, encoding="UTF-8") as file_object:
+        mission_str = file_object.read()
+
+    mission_str, num_planes = substitute_planes(mission_str, planes_str)
+    print('total number of planes objects: ', num_planes)
 
     # write file
     if not write_filename:
@@ -93,3 +98,19 @@ for mission_name in mission_names:
     with open(write_filename, "w", encoding="UTF-8") as file_object:
         file_object.write(mission_str)
     print("New plane written to mission file ", write_filename)
+    return num_planes
+
+
+def main():
+    # read plane source file
+    planes_str = read_planes(plane_sourcefile)
+
+    for mission_name in mission_names:
+        mission_filename = base_dir + mission_name + mission_ext  # IL-2 Mission File
+        write_filename = None  # replace mission sourcefile
+        # write_filename = base_dir + 'yyy.mission'  # output file
+        substitute_mission_planes(mission_filename, planes_str, write_filename)
+
+
+if __name__ == '__main__':
+    main()
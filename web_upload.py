@@ -0,0 +1,173 @@
+"""
+    Neocities web site uploads.  NeocitiesClient is a minimal client of the Neocities API upload call
+    (POST <api url>/upload, basic authentication, one multipart field per file named by its destination path)
+    which keeps one HTTP session (and its connection) open between uploads.
+
+    UploadQueue uploads files in a background thread.  Upload requests arriving in a burst (e.g., several games
+    finishing within a few seconds) are merged into one upload of each destination file, and a file is not uploaded
+    if its content hash matches the last successful upload of the same destination.  Failed uploads are retried with
+    increasing delays.  Use utilities/neocities_standin.py (and NEOCITIES_API_URL) to test without neocities.org.
+"""
+
+import hashlib
+import pickle
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from constants import NEOCITIES_API_URL, NEOCITIES_USER, NEOCITIES_PASSWORD, UPLOAD_DEBOUNCE, UPLOAD_MAX_DELAY, \
+    UPLOAD_RETRY_DELAYS, UPLOAD_TIMEOUT, UPLOAD_HASHES_FILE
+
+
+class NeocitiesError(Exception):
+    """ Upload failed; message describes why """
+
+
+class NeocitiesClient:
+    """ Neocities API client reusing one requests session """
+    def __init__(self, user=NEOCITIES_USER, password=NEOCITIES_PASSWORD, api_url=NEOCITIES_API_URL,
+                 timeout=UPLOAD_TIMEOUT):
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = (user, password)
+
+    def upload(self, destination, data):
+        """ Uploads data (bytes) to Neocities file destination (e.g., 'index.html'); returns Neocities' message """
+        try:
+            response = self.session.post(f"{self.api_url}/upload", files={destination: (destination, data)},
+                                         timeout=self.timeout)
+        except requests.exceptions.ConnectTimeout:
+            raise NeocitiesError(f"Timeout error connecting to {self.api_url}.")
+        except requests.exceptions.RequestException as e:
+            raise NeocitiesError(f"Error connecting to {self.api_url}: {e}")
+
+        try:
+            result = response.json()
+        except ValueError:
+            raise NeocitiesError(f"Unexpected response from {self.api_url} (HTTP status {response.status_code}).")
+        if result.get('result') != 'success':
+            raise NeocitiesError(f"Failed to upload '{destination}': {result.get('message', response.status_code)}")
+        return result.get('message', '')
+
+    def close(self):
+        self.session.close()
+
+
+class UploadQueue:
+    """ Thread uploading requested files, merging bursts of requests and skipping unchanged files """
+    def __init__(self, client=None, debounce=UPLOAD_DEBOUNCE, max_delay=UPLOAD_MAX_DELAY,
+                 retry_delays=UPLOAD_RETRY_DELAYS, hashes_file=UPLOAD_HASHES_FILE):
+        self.client = client if client is not None else NeocitiesClient()
+        self.debounce = debounce  # seconds without new requests before pending uploads are sent
+        self.max_delay = max_delay  # seconds after first pending request when uploads are sent regardless
+        self.retry_delays = retry_delays  # seconds to wait before each retry of a failed upload
+        self.hashes_file = hashes_file
+        self.condition = threading.Condition()
+        self.pending = {}  # {destination: source filename} requested but not yet uploaded
+        self.first_request = None  # time.monotonic() of the first and last pending requests
+        self.last_request = None
+        self.uploaded = self.load_hashes()  # {destination: content hash of last successful upload}
+        self.uploading = None  # destination being uploaded
+        self.num_requests = 0
+        self.num_uploaded = 0
+        self.num_skipped = 0  # uploads skipped because content did not change
+        self.num_failed = 0  # uploads which failed after all retries
+        self.last_result = ''  # description of last upload result
+        self.thread = threading.Thread(target=self.run, name='upload_queue', daemon=True)
+        self.thread.start()
+
+    def load_hashes(self):
+        try:
+            with open(self.hashes_file, 'rb') as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError):
+            return {}
+
+    def save_hashes(self):
+        try:
+            with open(self.hashes_file, 'wb') as f:
+                pickle.dump(self.uploaded, f)
+        except OSError as e:
+            print(f"Upload queue error: unable to write '{self.hashes_file}': {e}")
+
+    def request(self, source, destination):
+        """ Queue upload of local file source to destination; returns immediately """
+        with self.condition:
+            self.pending[destination] = source
+            now = time.monotonic()
+            if self.first_request is None:
+                self.first_request = now
+            self.last_request = now
+            self.num_requests += 1
+            self.condition.notify()
+
+    def wait_for_batch(self):
+        """ Waits until no request arrived for debounce seconds (or max_delay passed); returns the pending uploads """
+        with self.condition:
+            while True:
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                due = min(self.last_request + self.debounce, self.first_request + self.max_delay)
+                now = time.monotonic()
+                if now >= due:
+                    break
+                self.condition.wait(due - now)
+            batch, self.pending = self.pending, {}
+            self.first_request = self.last_request = None
+            return batch
+
+    def run(self):
+        while True:
+            for destination, source in self.wait_for_batch().items():
+                self.uploading = destination
+                try:
+                    self.upload(source, destination)
+                except Exception as e:  # never let a bad upload kill the upload thread
+                    self.num_failed += 1
+                    self.last_result = f"Upload of '{destination}' failed: unexpected error: {e}"
+                    print(f"\n{self.last_result}")
+                self.uploading = None
+
+    def upload(self, source, destination):
+        """ Uploads source to destination unless unchanged since last upload, retrying with increasing delays """
+        for delay in (0,) + tuple(self.retry_delays):
+            time.sleep(delay)
+            with self.condition:
+                if destination in self.pending:  # requested again while waiting; the newer request uploads it
+                    return
+            try:
+                with open(source, 'rb') as f:
+                    data = f.read()
+                digest = hashlib.sha1(data).hexdigest()
+                if self.uploaded.get(destination) == digest:
+                    self.num_skipped += 1
+                    self.last_result = f"'{destination}' unchanged since last upload"
+                    return
+                message = self.client.upload(destination, data)
+            except (OSError, NeocitiesError) as e:
+                self.last_result = f"Upload of '{destination}' failed: {e}"
+                print(f"\n{self.last_result}")
+                continue
+            self.uploaded[destination] = digest
+            self.save_hashes()
+            self.num_uploaded += 1
+            self.last_result = f"'{destination}' uploaded at {datetime.now().strftime('%H:%M')}: {message}"
+            print(f"\nNeocities upload result: {message}")
+            return
+        self.num_failed += 1
+
+    def status(self):
+        """ Returns string describing the state of uploads """
+        with self.condition:
+            status_str = f"Web uploads: {len(self.pending)} waiting"
+        if self.uploading is not None:
+            status_str += f"; uploading '{self.uploading}'"
+        status_str += f". {self.num_uploaded} uploaded, {self.num_skipped} unchanged, {self.num_failed} failed" \
+                      f" of {self.num_requests} requests.\n"
+        if self.last_result:
+            status_str += f"Last upload: {self.last_result}.\n"
+        return status_str